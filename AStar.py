@@ -0,0 +1,145 @@
+import timeit
+from BoardEncoding import codec_for, get_codec
+from PermutationRank import get_ranker
+from OpenList import make_open_list
+from Heuristics import get_heuristic
+from Checkpoint import read_snapshot, pack_codes, unpack_codes, pack_numbers, unpack_numbers, pack_table, unpack_table
+
+# ======= A* ENGINE ======= #
+#
+# A* với open list chọn được, xoá lười theo bảng g (ranker.new_g_table) và mảng hướng đi.
+# checkpoint: Checkpointer tuỳ chọn, lưu open list + bảng g + mảng hướng đi định kỳ theo số nút
+# mở rộng / thời gian; AStar.resume(path) dựng lại đúng trạng thái đó và solve() chạy tiếp.
+# generated / duplicates (nút con không cải thiện g) / peak_frontier (kể cả mục cũ chờ xoá lười)
+# được đếm bằng biến cục bộ và ghi lại khi kết thúc.
+
+INFINITY = float('inf')
+
+
+class AStar:
+    def __init__(self, start_state, open_list="bucket", tie_break="high_g", heuristic="manhattan", checkpoint=None):
+        if checkpoint is not None and not isinstance(heuristic, str):
+            raise ValueError("Checkpoint cần heuristic theo tên để chạy tiếp được")
+        self.codec = codec_for(start_state)
+        self.ranker = get_ranker(self.codec)
+        self.h = get_heuristic(heuristic, self.codec)
+        self.heuristic = heuristic
+        self.open_kind, self.tie_break = open_list, tie_break
+        self.start = self.codec.encode(start_state)
+        self.checkpoint = checkpoint
+        self.expanded = self.generated = self.duplicates = self.peak_frontier = 0
+        self.queue = None
+
+    def begin(self):
+        ranker = self.ranker
+        self.parent_moves = ranker.new_parent_moves()
+        self.best_g = ranker.new_g_table()
+        self.best_g[ranker.index(self.start)] = 0
+        self.queue = make_open_list(self.open_kind, self.tie_break)
+        self.queue.push(self.h(self.start), 0, self.start)
+
+    def solve(self):
+        if self.queue is None:
+            self.begin()
+        codec, ranker, h = self.codec, self.ranker, self.h
+        parent_moves, best_g, queue = self.parent_moves, self.best_g, self.queue
+        checkpoint = self.checkpoint
+        if checkpoint:
+            checkpoint.start(self.expanded)
+        next_at = checkpoint.next_at if checkpoint else INFINITY
+        expanded, generated, duplicates, peak = self.expanded, self.generated, self.duplicates, self.peak_frontier
+        # Kích thước open list = đã push - đã pop (tính bằng biến cục bộ, không gọi len)
+        size = len(queue)
+        while queue:
+            if size > peak:
+                peak = size
+            if expanded >= next_at:
+                self.expanded, self.generated, self.duplicates, self.peak_frontier = expanded, generated, duplicates, peak
+                if checkpoint.poll(expanded):
+                    checkpoint.save("astar", self.snapshot, expanded)
+                next_at = checkpoint.next_at
+            f, g, current = queue.pop()
+            size -= 1
+            # Xoá lười: bỏ qua phần tử đã có g tốt hơn
+            if g != best_g[ranker.index(current)]:
+                continue
+            if current == codec.goal:
+                self.expanded, self.generated, self.duplicates, self.peak_frontier = expanded, generated, duplicates, peak
+                return ranker.path_from_moves(parent_moves, self.start, current)
+            expanded += 1
+            # h của nút con tính tăng dần từ h của nút cha (f - g)
+            key = f - g if h.key_is_h else h.evaluate(current)[1]
+            cost = g + 1
+            children = codec.successors(current)
+            generated += len(children)
+            for direction, neighbor in children:
+                r = ranker.index(neighbor)
+                if cost < best_g[r]:
+                    best_g[r] = cost
+                    parent_moves[r] = direction + 1
+                    queue.push(cost + h.update(key, current, neighbor)[0], cost, neighbor)
+                    size += 1
+                else:
+                    duplicates += 1
+        self.expanded, self.generated, self.duplicates, self.peak_frontier = expanded, generated, duplicates, peak
+        return []
+
+    def snapshot(self):
+        entries = list(self.queue.entries())
+        meta = {"rows": self.codec.rows, "cols": self.codec.cols, "start": self.start, "heuristic": self.heuristic,
+                "open_list": self.open_kind, "tie_break": self.tie_break, "expanded": self.expanded,
+                "generated": self.generated, "duplicates": self.duplicates, "peak_frontier": self.peak_frontier}
+        sections = {"open": pack_codes([code for _, _, code in entries]),
+                    "open.f": pack_numbers([f for f, _, _ in entries], 'I'), "open.g": pack_numbers([g for _, g, _ in entries], 'I'),
+                    "open.type": b"I"}
+        sections.update(pack_table(self.best_g, "best_g", 'I'))
+        sections.update(pack_table(self.parent_moves, "parent_moves"))
+        return meta, sections
+
+    @classmethod
+    def resume(cls, path, checkpoint=None):
+        meta, sections = read_snapshot(path, "astar")
+        codec = get_codec(meta["rows"], meta["cols"])
+        search = cls(codec.decode(meta["start"]), meta["open_list"], meta["tie_break"], meta["heuristic"], checkpoint)
+        search.expanded, search.generated = meta["expanded"], meta["generated"]
+        search.duplicates, search.peak_frontier = meta["duplicates"], meta["peak_frontier"]
+        search.best_g = unpack_table(sections, "best_g", INFINITY)
+        search.parent_moves = unpack_table(sections, "parent_moves", 0)
+        search.queue = make_open_list(search.open_kind, search.tie_break)
+        # Checkpoint cũ ghi f, g dạng uint16
+        typecode = sections.get("open.type", b"H").decode()
+        fs, gs = unpack_numbers(sections["open.f"], typecode), unpack_numbers(sections["open.g"], typecode)
+        for f, g, code in zip(fs, gs, unpack_codes(sections["open"])):
+            search.queue.push(f, g, code)
+        return search
+
+
+if __name__ == "__main__":
+    import os, tempfile
+    from Checkpoint import Checkpointer
+    from FifteenPuzzle import random_instances
+
+    initial_state = random_instances(1, walk=80, seed=2)[0]
+    start_time = timeit.default_timer()
+    search = AStar(initial_state)
+    path = search.solve()
+    baseline = timeit.default_timer() - start_time
+    print(f"astar: số bước = {len(path) - 1}, mở rộng = {search.expanded}, thời gian = {baseline:.5f} giây")
+
+    path_file = os.path.join(tempfile.gettempdir(), "astar.ckpt")
+    for every_nodes, every_seconds in [(50000, None), (None, 0.5)]:
+        checkpoint = Checkpointer(path_file, every_nodes, every_seconds)
+        start_time = timeit.default_timer()
+        path = AStar(initial_state, checkpoint=checkpoint).solve()
+        elapsed = timeit.default_timer() - start_time
+        sizes = [size for _, size in checkpoint.writes]
+        print(f"  checkpoint mỗi {every_nodes} nút / {every_seconds} giây: {len(checkpoint.writes)} lần ghi, tối đa {max(sizes) / 1024:.1f} KB, "
+              f"ghi mất {checkpoint.overhead():.5f} giây ({checkpoint.overhead() / elapsed:.1%}), tổng {elapsed:.5f} giây")
+
+    search = AStar.resume(path_file)
+    start_time = timeit.default_timer()
+    resumed = search.solve()
+    elapsed = timeit.default_timer() - start_time
+    print(f"  chạy tiếp từ checkpoint: số bước = {len(resumed) - 1}, giống lời giải gốc = {resumed == path}, "
+          f"mở rộng = {search.expanded}, thời gian = {elapsed:.5f} giây")
+    os.remove(path_file)
@@ -0,0 +1,90 @@
+import os, importlib
+from InstanceGenerator import check_state
+
+# ======= ALGORITHMS ======= #
+#
+# Danh sách thuật toán dùng chung cho giao diện (main.py) và dòng lệnh (Profiler.py):
+# tên hiển thị -> (module, hàm, tham số mặc định). Module chỉ được import khi lấy hàm ra,
+# nên thuật toán cần thư viện chưa cài (graphviz, numpy) không làm hỏng các thuật toán khác,
+# và thời gian import không bị tính vào lúc đo.
+
+ALGORITHMS = {
+    "BFS": ("ObservableEnvironmet", "bfs", {}),
+    "DFS": ("ObservableEnvironmet", "dfs", {}),
+    "DLS": ("ObservableEnvironmet", "dls", {}),
+    "UCS": ("ObservableEnvironmet", "ucs", {}),
+    "IDS": ("ObservableEnvironmet", "ids", {}),
+    "Greedy": ("ObservableEnvironmet", "greedy", {}),
+    "A Start": ("ObservableEnvironmet", "astar", {}),
+    "IDA Start": ("ObservableEnvironmet", "ida_star", {}),
+    "Simple Hill Climbing": ("ObservableEnvironmet", "simple_hill_climbing", {}),
+    "Steepest Ascent": ("ObservableEnvironmet", "steepest_ascent_hill_climbing", {}),
+    "Stochastic": ("ObservableEnvironmet", "stochastic_hill_climbing", {}),
+    "Simulated Annealing": ("ObservableEnvironmet", "simulated_annealing", {}),
+    "Beam Search": ("ObservableEnvironmet", "beam_search", {}),
+    "Genetic Algorithm": ("ObservableEnvironmet", "genetic_algorithm", {}),
+    "And Or Search": ("And_OrSearch", "and_or_search_solution", {}),
+    "No Observable": ("NoObservable", "bfs_no_observable", {}),
+    "Partially Observable": ("PartiallyObservable", "bfs_partially_observable", {}),
+    "Backtracking": ("Backtracking", "backtracking_solve", {}),
+    "Backtracking with Forward Checking": ("Backtracking", "backtracking_solve_with_forward_checking", {}),
+    "Fill Backtracking": ("Fill_CSP", "backtracking_fill", {}),
+    "Fill Backtracking with Forward Checking": ("Fill_CSP", "forward_checking_fill", {}),
+    "Min Conflict": ("Fill_CSP", "min_conflict_fill", {}),
+    "Q Learning": ("ReinforcementLearning", "q_learning_solve", {"episodes": 500}),
+    "Distance Database": ("DistanceDatabase", "database_solve", {}),
+    "Bidirectional BFS": ("ObservableEnvironmet", "bidirectional_bfs", {}),
+    "Bidirectional A Start": ("ObservableEnvironmet", "bidirectional_astar", {}),
+    "SMA Start": ("ObservableEnvironmet", "sma_star", {"max_bytes": 4 * 1024 ** 2}),
+    "Weighted A Start": ("ObservableEnvironmet", "weighted_astar", {}),
+    "ARA Start": ("AnytimeSearch", "anytime_astar", {"time_limit": 1.0}),
+    "HDA Start": ("ObservableEnvironmet", "hda_star", {"workers": os.cpu_count() or 1}),
+}
+
+# Các bài toán điền số (CSP) luôn bắt đầu từ bảng rỗng
+FILL_ALGORITHMS = {"Fill Backtracking", "Fill Backtracking with Forward Checking", "Min Conflict"}
+
+
+def find_algorithm(name):
+    # Nhận tên hiển thị hoặc tên hàm, không phân biệt hoa thường
+    key = name.strip().lower()
+    for display, (_, function, _) in ALGORITHMS.items():
+        if key in (display.lower(), function.lower()):
+            return display
+    raise KeyError(f"Không có thuật toán: {name}")
+
+
+def get_solver(name, cache=None):
+    # Hàm giải đã gắn tham số mặc định: solver(state, **options); cache: SolutionCache đặt phía trước
+    if cache is not None:
+        return cache.solver(name)
+    module, function, defaults = ALGORITHMS[find_algorithm(name)]
+    solve = getattr(importlib.import_module(module), function)
+
+    def solver(state, **options):
+        return solve(state, **{**defaults, **options})
+    return solver
+
+
+def initial_state_for(name, state):
+    if find_algorithm(name) in FILL_ALGORITHMS:
+        return [[0] * len(state[0]) for _ in state]
+    return state
+
+
+def solve(name, state, **options):
+    return get_solver(name)(initial_state_for(name, state), **options)
+
+
+def parse_state(text, rows=None, cols=None):
+    # "2 6 5 0 8 7 4 3 1" hoặc "2,6,5,0,8,7,4,3,1"; mặc định bàn cờ vuông
+    values = [int(value) for value in text.replace(",", " ").split()]
+    if rows is None and cols is None:
+        rows = cols = int(round(len(values) ** 0.5))
+    elif rows is None:
+        rows = len(values) // cols
+    elif cols is None:
+        cols = len(values) // rows
+    if rows * cols != len(values) or sorted(values) != list(range(rows * cols)):
+        raise ValueError(f"Trạng thái không hợp lệ cho bàn {rows}x{cols}: {text}")
+    return check_state([values[r * cols:(r + 1) * cols] for r in range(rows)])
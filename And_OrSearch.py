@@ -1,6 +1,8 @@
 import copy, random
 from graphviz import Digraph
 import tracemalloc, timeit
+from BoardEncoding import codec_for
+from SearchStats import SearchStats, finish
 
 class Puzzle:
     def __init__(self, state, parent=None, move=None, depth=0, node_id=None):
@@ -13,8 +15,8 @@ class Puzzle:
         self.node_id = node_id if node_id else f"{parent_id}_{str(id(self))}_{depth}"
 
     def find_blank(self):
-        for i in range(3):
-            for j in range(3):
+        for i in range(len(self.state)):
+            for j in range(len(self.state[0])):
                 if self.state[i][j] == 0:
                     return (i, j)
 
@@ -23,7 +25,7 @@ class Puzzle:
         bi, bj = self.blank_pos
         for di, dj in [(1, 0), (0, -1), (-1, 0), (0, 1)]:
             ni, nj = bi + di, bj + dj
-            if 0 <= ni < 3 and 0 <= nj < 3:
+            if 0 <= ni < len(self.state) and 0 <= nj < len(self.state[0]):
                 actions.append((di, dj))
         return actions
 
@@ -34,7 +36,7 @@ class Puzzle:
         new_state[bi][bj], new_state[ni][nj] = new_state[ni][nj], new_state[bi][bj]
         puzzle1 = Puzzle(new_state, parent=self, move=(ni, nj), depth=self.depth + 1)
 
-        positions = [(i, j) for i in range(3) for j in range(3)]
+        positions = [(i, j) for i in range(len(self.state)) for j in range(len(self.state[0]))]
         (i1, j1), (i2, j2) = random.sample(positions, 2)
         new_state = copy.deepcopy(puzzle1.state)
         new_state[i1][j1], new_state[i2][j2] = new_state[i2][j2], new_state[i1][j1]
@@ -43,7 +45,7 @@ class Puzzle:
         return [puzzle1, puzzle2]
 
     def is_goal(self):
-        return self.state == [[1, 2, 3], [4, 5, 6], [7, 8, 0]]
+        return self.state == codec_for(self.state).goal_state
 
     def to_tuple(self):
         return tuple(tuple(row) for row in self.state)
@@ -88,22 +90,26 @@ class GraphVisualizer:
     def render(self, filename="and_or_search_tree"):  
         self.graph.render(filename, format="png", cleanup=True)
 
-def and_or_search(node, visualizer):
-    return or_search(node, [], visualizer)
+# info: SearchStats tuỳ chọn; expanded = số nút OR đã thử hành động, generated = số nút kết quả,
+# duplicates = nút OR bị cắt vì lặp trên đường đi, peak_frontier = độ sâu lớn nhất
+def and_or_search(node, visualizer, info=None):
+    return or_search(node, [], visualizer, info)
 
 
-def and_search(nodes, path, visualizer):
+def and_search(nodes, path, visualizer, info=None):
     plan_list = []
     for new_node in nodes:
-        plan = or_search(new_node, path, visualizer)
+        plan = or_search(new_node, path, visualizer, info)
         if plan is None:
             return None
         plan_list.append(plan)
     return plan_list
 
 
-def or_search(node, path, visualizer):
+def or_search(node, path, visualizer, info=None):
     visualizer.add_node(node)
+    if info is not None:
+        info.peak_frontier = max(info.peak_frontier, node.depth + 1)
 
     if node.is_goal():
         goal_path = []
@@ -116,30 +122,41 @@ def or_search(node, path, visualizer):
         visualizer.goal_nodes.append(node)  # Lưu node đích
         return []
 
-    if node.depth > 3 or node.to_tuple() in [p.to_tuple() for p in path]:
+    if node.depth > 3:
+        return None
+    if node.to_tuple() in [p.to_tuple() for p in path]:
+        if info is not None:
+            info.duplicates += 1
         return None
 
+    if info is not None:
+        info.expanded += 1
     for action in node.get_actions():
         action_node_id = visualizer.add_action_node(node, action)
         children = node.get_possible_puzzle(action)
+        if info is not None:
+            info.generated += len(children)
         for child in children:
             visualizer.add_node(child)
             visualizer.add_edge(node, child, action_node_id)
 
-        plan = and_search(children, path + [node], visualizer)
+        plan = and_search(children, path + [node], visualizer, info)
         if plan is not None:
             return [action] + plan
     return None
 
-def and_or_search_solution(initial_state):
+def and_or_search_solution(initial_state, stats=False):
+    info = SearchStats("and_or_search")
     root = Puzzle(initial_state)
     visualizer = GraphVisualizer()
-    plan = and_or_search(root, visualizer)
+    info.mark("setup")
+    plan = and_or_search(root, visualizer, info)
+    info.extra["goal_nodes"] = len(visualizer.goal_nodes)
 
     if (len(visualizer.goal_nodes)>0):
         goal_node = visualizer.goal_nodes[0]
-        return goal_node.get_path()
-    return []
+        return finish(goal_node.get_path(), info, stats)
+    return finish([], info, stats)
 
 if __name__ == "__main__":
     initial_state = [[1, 2, 0], [4, 5, 3], [7, 8, 6]]
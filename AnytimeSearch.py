@@ -0,0 +1,157 @@
+import heapq, timeit
+from BoardEncoding import codec_for
+from PermutationRank import get_ranker
+from Heuristics import get_heuristic
+from SearchStats import SearchStats, finish
+
+# ======= ANYTIME SEARCH (ARA*) ======= #
+#
+# Anytime Repairing A*: chạy weighted A* với epsilon lớn để có lời giải nhanh, sau đó giảm
+# dần epsilon và sửa lời giải cũ thay vì tìm lại từ đầu:
+#   - bảng g và mảng hướng đi giữ nguyên qua các lượt
+#   - nút có g giảm sau khi đã đóng trong lượt hiện tại được đưa vào INCONS,
+#     đầu lượt sau mới mở lại (mỗi nút mở rộng tối đa một lần mỗi lượt)
+# solutions() là generator trả về (đường đi, cận), với độ dài đường đi <= cận * tối ưu.
+
+INFINITY = float('inf')
+
+
+class ARAStar:
+    def __init__(self, start_state, heuristic="manhattan", epsilon=3.0, decrement=0.5, deadline=None):
+        self.codec = codec_for(start_state)
+        self.ranker = get_ranker(self.codec)
+        self.h = get_heuristic(heuristic, self.codec)
+        self.start = self.codec.encode(start_state)
+        self.epsilon = epsilon
+        self.decrement = decrement
+        # deadline (theo timeit.default_timer): dừng khi quá hạn, nhưng chỉ sau lời giải đầu tiên
+        self.deadline = deadline
+        self.expanded = self.generated = 0
+        self.iterations = []
+
+    def improve_path(self, found):
+        codec, ranker, h = self.codec, self.ranker, self.h
+        g_table, parent_moves, closed = self.g_table, self.parent_moves, self.closed
+        queue, epsilon = self.queue, self.epsilon
+        goal_index = ranker.index(codec.goal)
+        count = generated = 0
+        while queue and queue[0][0] < g_table[goal_index]:
+            _, h_value, g, current = heapq.heappop(queue)
+            r = ranker.index(current)
+            if g != g_table[r] or not closed.add(r):
+                continue
+            count += 1
+            if found and self.deadline is not None and count & 1023 == 0 and timeit.default_timer() > self.deadline:
+                self.expanded += count
+                self.generated += generated
+                return False
+            key = h_value if h.key_is_h else h.evaluate(current)[1]
+            cost = g + 1
+            children = codec.successors(current)
+            generated += len(children)
+            for direction, neighbor in children:
+                n = ranker.index(neighbor)
+                if cost < g_table[n]:
+                    g_table[n] = cost
+                    parent_moves[n] = direction + 1
+                    child_h = h.update(key, current, neighbor)[0]
+                    if n in closed:
+                        self.incons.append(neighbor)
+                    else:
+                        heapq.heappush(queue, (cost + epsilon * child_h, child_h, cost, neighbor))
+        self.expanded += count
+        self.generated += generated
+        return True
+
+    def bound(self):
+        # Cận thực sự: g(đích) / min(g + h) trên OPEN và INCONS
+        ranker, h = self.ranker, self.h
+        lower = INFINITY
+        for _, h_value, g, code in self.queue:
+            if g == self.g_table[ranker.index(code)]:
+                lower = min(lower, g + h_value)
+        for code in self.incons:
+            lower = min(lower, self.g_table[ranker.index(code)] + h(code))
+        goal_g = self.g_table[ranker.index(self.codec.goal)]
+        return 1.0 if lower >= goal_g else min(self.epsilon, goal_g / lower)
+
+    def solutions(self):
+        codec, ranker = self.codec, self.ranker
+        if not ranker.is_solvable(self.start):
+            return
+        self.g_table = ranker.new_g_table(unbounded=True)
+        self.parent_moves = ranker.new_parent_moves()
+        self.g_table[ranker.index(self.start)] = 0
+        h_start = self.h(self.start)
+        self.queue = [(self.epsilon * h_start, h_start, 0, self.start)]
+        self.incons = []
+        self.closed = ranker.new_visited()
+        found = False
+
+        while True:
+            if not self.improve_path(found):
+                return
+            # OPEN cạn mà đích chưa có g: không có đường đi để trả về
+            if self.g_table[ranker.index(codec.goal)] == INFINITY:
+                return
+            found = True
+            bound = self.bound()
+            self.iterations.append((self.epsilon, bound, self.expanded))
+            yield ranker.path_from_moves(self.parent_moves, self.start, codec.goal), bound
+            if bound <= 1.0 or (self.deadline is not None and timeit.default_timer() > self.deadline):
+                return
+
+            # Giảm epsilon, gộp INCONS vào OPEN, tính lại khoá, xoá CLOSED
+            self.epsilon = max(1.0, self.epsilon - self.decrement)
+            entries = {}
+            for _, h_value, g, code in self.queue:
+                if g == self.g_table[ranker.index(code)]:
+                    entries[code] = h_value
+            for code in self.incons:
+                entries[code] = self.h(code)
+            self.queue = []
+            for code, h_value in entries.items():
+                g = self.g_table[ranker.index(code)]
+                self.queue.append((g + self.epsilon * h_value, h_value, g, code))
+            heapq.heapify(self.queue)
+            self.incons = []
+            self.closed = ranker.new_visited()
+
+
+def anytime_astar(start_state, time_limit=1.0, heuristic="manhattan", epsilon=3.0, decrement=0.5, stats=False):
+    # Lời giải tốt nhất tìm được trước hạn (luôn chờ lời giải đầu tiên)
+    info = SearchStats("anytime_astar")
+    search = ARAStar(start_state, heuristic, epsilon, decrement, timeit.default_timer() + time_limit)
+    info.mark("setup")
+    best = []
+    for path, _ in search.solutions():
+        best = path
+    info.extra["iterations"] = [(epsilon, round(bound, 3)) for epsilon, bound, _ in search.iterations]
+    return finish(best, info.absorb(search), stats)
+
+
+if __name__ == "__main__":
+    from ObservableEnvironmet import astar, weighted_astar
+    from FifteenPuzzle import random_instances
+
+    # epsilon * h(start) >= 255: vòng lặp không được dừng trước khi đích có g
+    search = ARAStar([[1, 7, 5], [4, 3, 8], [6, 2, 0]], epsilon=1000, decrement=100)
+    results = list(search.solutions())
+    assert results and results[-1][1] == 1.0 and len(results[-1][0]) - 1 == 22
+
+    for initial_state in [[[8, 6, 7], [2, 5, 4], [3, 0, 1]]] + random_instances(2, walk=80, seed=12):
+        start_time = timeit.default_timer()
+        path = astar(initial_state, heuristic="linear_conflict")
+        end_time = timeit.default_timer()
+        print(f"astar: số bước = {len(path) - 1}, thời gian = {(end_time - start_time):.5f} giây")
+        for epsilon in [1.5, 2.0, 3.0]:
+            start_time = timeit.default_timer()
+            path = weighted_astar(initial_state, epsilon, heuristic="linear_conflict")
+            end_time = timeit.default_timer()
+            print(f"  weighted_astar epsilon = {epsilon}: số bước = {len(path) - 1}, thời gian = {(end_time - start_time):.5f} giây")
+
+        search = ARAStar(initial_state, "linear_conflict", epsilon=3.0, decrement=0.5)
+        start_time = timeit.default_timer()
+        for path, bound in search.solutions():
+            elapsed = timeit.default_timer() - start_time
+            print(f"  ARA* epsilon = {search.epsilon}: số bước = {len(path) - 1}, cận = {bound:.3f}, mở rộng = {search.expanded}, sau {elapsed:.5f} giây")
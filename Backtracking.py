@@ -1,4 +1,6 @@
 import copy
+from BoardEncoding import codec_for
+from SearchStats import SearchStats, finish
 
 class Puzzle:
     def __init__(self, state, parent=None, move=None, depth=0):
@@ -9,8 +11,8 @@ class Puzzle:
         self.blank_pos = self.find_blank()
 
     def find_blank(self):
-        for i in range(3):
-            for j in range(3):
+        for i in range(len(self.state)):
+            for j in range(len(self.state[0])):
                 if self.state[i][j] == 0:
                     return (i, j)
         return None
@@ -20,14 +22,14 @@ class Puzzle:
         bi, bj = self.blank_pos
         for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
             ni, nj = bi + di, bj + dj
-            if 0 <= ni < 3 and 0 <= nj < 3:
+            if 0 <= ni < len(self.state) and 0 <= nj < len(self.state[0]):
                 new_state = copy.deepcopy(self.state)
                 new_state[bi][bj], new_state[ni][nj] = new_state[ni][nj], new_state[bi][bj]
                 neighbors.append(Puzzle(new_state, parent=self, move=(di, dj), depth=self.depth + 1))
         return neighbors
 
     def is_goal(self):
-        return self.state == [[1, 2, 3], [4, 5, 6], [7, 8, 0]]
+        return self.state == codec_for(self.state).goal_state
 
     def get_path(self):
         path = []
@@ -38,25 +40,38 @@ class Puzzle:
         return path[::-1]
 
 
-def backtracking_solve(initial_state, max_depth=100):
+# counts = [expanded, generated, duplicates, độ sâu lớn nhất]
+def backtracking_solve(initial_state, max_depth=100, stats=False):
+    info = SearchStats("backtracking")
     initial_puzzle = Puzzle(initial_state)
     visited = set()
-    return backtrack(initial_puzzle, visited, max_depth)
+    counts = [0, 0, 0, 0]
+    info.mark("setup")
+    path = backtrack(initial_puzzle, visited, max_depth, counts)
+    if stats:
+        info.count(*counts)
+    return finish(path, info, stats)
 
 
-def backtrack(puzzle, visited, max_depth):
+def backtrack(puzzle, visited, max_depth, counts):
     if puzzle.depth > max_depth:
         return []
     state_tuple = tuple(tuple(row) for row in puzzle.state)
     if state_tuple in visited:
+        counts[2] += 1
         return []
     visited.add(state_tuple)
+    if puzzle.depth >= counts[3]:
+        counts[3] = puzzle.depth + 1
 
     if puzzle.is_goal():
         return puzzle.get_path()
 
-    for neighbor in puzzle.get_neighbors():
-        result = backtrack(neighbor, visited, max_depth)
+    neighbors = puzzle.get_neighbors()
+    counts[0] += 1
+    counts[1] += len(neighbors)
+    for neighbor in neighbors:
+        result = backtrack(neighbor, visited, max_depth, counts)
         if len(result)>0:
             return result
 
@@ -64,30 +79,43 @@ def backtrack(puzzle, visited, max_depth):
     return []
 
 
-def backtracking_solve_with_forward_checking(initial_state, max_depth=100):
+def backtracking_solve_with_forward_checking(initial_state, max_depth=100, stats=False):
+    info = SearchStats("backtracking_forward_checking")
     initial_puzzle = Puzzle(initial_state)
     visited = set()
-    return backtrack_with_forward_checking(initial_puzzle, visited, max_depth)
+    counts = [0, 0, 0, 0]
+    info.mark("setup")
+    path = backtrack_with_forward_checking(initial_puzzle, visited, max_depth, counts)
+    if stats:
+        info.count(*counts)
+    return finish(path, info, stats)
 
 
-def backtrack_with_forward_checking(puzzle, visited, max_depth):
+def backtrack_with_forward_checking(puzzle, visited, max_depth, counts):
     if puzzle.depth > max_depth:
         return []
     state_tuple = tuple(tuple(row) for row in puzzle.state)
     if state_tuple in visited:
+        counts[2] += 1
         return []
     visited.add(state_tuple)
+    if puzzle.depth >= counts[3]:
+        counts[3] = puzzle.depth + 1
 
     if puzzle.is_goal():
         return puzzle.get_path()
 
-    for neighbor in puzzle.get_neighbors():
+    neighbors = puzzle.get_neighbors()
+    counts[0] += 1
+    counts[1] += len(neighbors)
+    for neighbor in neighbors:
         # Forward checking: Only proceed if neighbor is closer to goal
-        misplaced = sum(1 for i in range(3) for j in range(3) if neighbor.state[i][j] != 0 and neighbor.state[i][j] != (i * 3 + j + 1) % 9)
-        current_misplaced = sum(1 for i in range(3) for j in range(3) if puzzle.state[i][j] != 0 and puzzle.state[i][j] != (i * 3 + j + 1) % 9)
+        rows, cols = len(puzzle.state), len(puzzle.state[0])
+        misplaced = sum(1 for i in range(rows) for j in range(cols) if neighbor.state[i][j] != 0 and neighbor.state[i][j] != (i * cols + j + 1) % (rows * cols))
+        current_misplaced = sum(1 for i in range(rows) for j in range(cols) if puzzle.state[i][j] != 0 and puzzle.state[i][j] != (i * cols + j + 1) % (rows * cols))
 
         if misplaced < current_misplaced:
-            result = backtrack_with_forward_checking(neighbor, visited, max_depth)
+            result = backtrack_with_forward_checking(neighbor, visited, max_depth, counts)
             if len(result)>0:
                 return result
 
@@ -0,0 +1,292 @@
+import os, sys, json, signal, time, argparse, multiprocessing
+from collections import deque
+from BoardEncoding import codec_for
+from Algorithms import ALGORITHMS, FILL_ALGORITHMS, find_algorithm, get_solver
+from InstanceGenerator import check_state
+from SolutionCache import SolutionCache
+
+# ======= BATCH SOLVE ======= #
+#
+# Giải hàng loạt từ dòng lệnh, không cần giao diện.
+#   - đầu vào: file hoặc stdin, đọc từng dòng: JSONL ({"id": ..., "state": [[...]]}, như InstanceGenerator.py)
+#     hoặc dòng số "2 6 5 0 8 7 4 3 1"
+#   - các dòng được gom thành lô chunk_size bảng gửi cho multiprocessing.Pool (một lần gửi / nhận
+#     cho cả lô thay vì từng bảng); tối đa max_pending lô đang chờ, lô cũ nhất xong mới ghi ra và gửi
+#     thêm, nên kết quả đúng thứ tự đầu vào và bộ nhớ không phụ thuộc số bảng
+#   - timeout cho từng bảng bằng SIGALRM trong tiến trình con (không có trên Windows: chạy không giới hạn)
+#   - kết quả: JSONL, mỗi dòng {"id", "status", "steps", "moves", "seconds"}; moves là hướng đi của
+#     ô trống (U/D/L/R), --full-path ghi thêm cả dãy trạng thái
+#   - tốc độ (bảng / giây) in ra stderr định kỳ và khi kết thúc
+#   - --cache: mỗi tiến trình con có SolutionCache riêng (LRU), kèm FILE thì dùng chung một file sqlite;
+#     kết quả có thêm "cache": memory / disk / miss, tỉ lệ trúng in cùng tốc độ
+#   - HDA* tự tạo tiến trình nên không chạy được trong Pool (tiến trình con daemon), bảng đó báo "error"
+#
+#   python InstanceGenerator.py uniform --count 100000 | python BatchSolve.py ida_star --workers 4 > results.jsonl
+#   python BatchSolve.py astar --input boards.jsonl --output results.jsonl --timeout 5 --option heuristic=linear_conflict
+
+MOVE_LETTERS = "UDLR"
+REPORT_SECONDS = 2.0
+
+_solver = None
+_timeout = None
+_full_path = False
+_cache = None
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def _alarm(signum, frame):
+    raise JobTimeout()
+
+
+def install_alarm():
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _alarm)
+
+
+def _init_worker(name, options, timeout, full_path, cache=None):
+    # cache: (file sqlite hoặc None, số khoá trong bộ nhớ), None = không dùng bộ đệm
+    global _solver, _timeout, _full_path, _cache
+    if cache is not None:
+        _cache = SolutionCache(cache[1], cache[0])
+    solver = get_solver(name, cache=_cache)
+    _solver = lambda state: solver(state, **options)
+    _timeout = timeout
+    _full_path = full_path
+    install_alarm()
+
+
+def moves_of(state, path):
+    # Hướng đi của ô trống dọc đường đi, cùng thứ tự DIRECTIONS; None nếu đường đi không bắt đầu từ
+    # state hoặc có bước không phải một nước đi hợp lệ (GA bắt đầu từ cá thể tốt nhất, ...)
+    codec = codec_for(state)
+    try:
+        code = codec.encode(state)
+        if codec.encode(path[0]) != code:
+            return None
+        letters = []
+        for next_state in path[1:]:
+            child = codec.encode(next_state)
+            direction = next((d for d, c in codec.successors(code) if c == child), None)
+            if direction is None:
+                return None
+            letters.append(MOVE_LETTERS[direction])
+            code = child
+    except (TypeError, ValueError, IndexError):
+        return None
+    return "".join(letters)
+
+
+def run_job(solver, state, timeout=None, full_path=False):
+    # Giải một bảng trong tiến trình con (đã đặt handler SIGALRM), luôn trả về dict kết quả
+    if state is None:
+        return {"status": "invalid", "error": "Dòng đầu vào không đọc được"}
+    try:
+        check_state(state)
+    except (ValueError, TypeError) as error:
+        return {"status": "invalid", "error": str(error)}
+    timeout = timeout if timeout and hasattr(signal, "setitimer") else None
+    start_time = time.perf_counter()
+    try:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            path = solver(state)
+        finally:
+            if timeout:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except JobTimeout:
+        return {"status": "timeout", "seconds": round(time.perf_counter() - start_time, 6)}
+    except Exception as error:
+        return {"status": "error", "error": repr(error), "seconds": round(time.perf_counter() - start_time, 6)}
+    seconds = round(time.perf_counter() - start_time, 6)
+    if not path:
+        return {"status": "failed", "steps": None, "moves": None, "seconds": seconds}
+    moves = moves_of(state, path)
+    if moves is None:
+        return {"status": "error", "error": "Đường đi không phải dãy nước đi hợp lệ từ trạng thái đầu", "seconds": seconds}
+    result = {"status": "ok", "steps": len(moves), "moves": moves, "seconds": seconds}
+    if full_path:
+        result["path"] = [list(map(list, state)) for state in path]
+    return result
+
+
+def solve_one(key, state):
+    if _cache is None:
+        return {"id": key, **run_job(_solver, state, _timeout, _full_path)}
+    _cache.last = None
+    result = {"id": key, **run_job(_solver, state, _timeout, _full_path)}
+    if _cache.last:
+        result["cache"] = _cache.last
+    return result
+
+
+def solve_chunk(chunk):
+    return [solve_one(key, state) for key, state in chunk]
+
+
+def read_boards(f, rows=None, cols=None):
+    # (id, trạng thái) cho từng dòng; chỉ tách hàng, kiểm tra hợp lệ để tiến trình con làm
+    # (dòng hỏng vẫn có kết quả "invalid" đúng vị trí)
+    for number, line in enumerate(f):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                record = json.loads(line)
+                yield record.get("id", number), record.get("state")
+            except ValueError:
+                yield number, None
+            continue
+        try:
+            values = [int(value) for value in line.replace(",", " ").split()]
+        except ValueError:
+            yield number, None
+            continue
+        width = cols or (len(values) // rows if rows else int(round(len(values) ** 0.5)))
+        yield number, [values[start:start + width] for start in range(0, len(values), width)] if width else None
+
+
+def chunks_of(boards, size):
+    chunk = []
+    for board in boards:
+        chunk.append(board)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class BatchSolver:
+    def __init__(self, algorithm, workers=None, chunk_size=32, max_pending=None, timeout=None, options=None, full_path=False, cache=None):
+        self.algorithm = find_algorithm(algorithm)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        # Đủ lô để mọi tiến trình luôn có việc trong lúc tiến trình chính ghi kết quả
+        self.max_pending = max_pending or 2 * self.workers
+        self.timeout = timeout
+        self.options = options or {}
+        self.full_path = full_path
+        self.cache = cache
+        self.counts = {}
+        self.cache_counts = {}
+        self.solved = 0
+        self.elapsed = 0.0
+
+    def throughput(self):
+        return self.solved / self.elapsed if self.elapsed else 0.0
+
+    def cache_hit_rate(self):
+        lookups = sum(count for outcome, count in self.cache_counts.items() if outcome != "bypass")
+        hits = self.cache_counts.get("memory", 0) + self.cache_counts.get("disk", 0)
+        return hits / lookups if lookups else 0.0
+
+    def run(self, boards, write, report=None):
+        # boards: iterable (id, trạng thái); write(kết quả) được gọi đúng thứ tự đầu vào
+        get_solver(self.algorithm)
+        start_time = last_report = time.perf_counter()
+        self.counts, self.cache_counts, self.solved = {}, {}, 0
+        initargs = (self.algorithm, self.options, self.timeout, self.full_path, self.cache)
+        with multiprocessing.Pool(self.workers, _init_worker, initargs) as pool:
+            pending = deque()
+            chunks = chunks_of(boards, self.chunk_size)
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < self.max_pending:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                    else:
+                        pending.append(pool.apply_async(solve_chunk, (chunk,)))
+                if not pending:
+                    break
+                for result in pending.popleft().get():
+                    self.counts[result["status"]] = self.counts.get(result["status"], 0) + 1
+                    if "cache" in result:
+                        self.cache_counts[result["cache"]] = self.cache_counts.get(result["cache"], 0) + 1
+                    self.solved += 1
+                    write(result)
+                now = time.perf_counter()
+                if report and now - last_report >= REPORT_SECONDS:
+                    self.elapsed = now - start_time
+                    report(self)
+                    last_report = now
+        self.elapsed = time.perf_counter() - start_time
+        return self.counts
+
+
+def batch_solve(algorithm, boards, workers=None, chunk_size=32, timeout=None, **options):
+    # Dùng trong code: trả về list kết quả (giữ hết trong bộ nhớ, chỉ cho lô nhỏ)
+    results = []
+    BatchSolver(algorithm, workers, chunk_size, timeout=timeout, options=options).run(
+        ((index, state) for index, state in enumerate(boards)), results.append)
+    return results
+
+
+def parse_option(text):
+    # key=value, value đọc như JSON nếu được ("2.5", "true", "[1, 2]"), không thì là chuỗi
+    key, _, value = text.partition("=")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Giải hàng loạt bảng từ file / stdin bằng nhiều tiến trình")
+    parser.add_argument("algorithm", help="tên hiển thị hoặc tên hàm trong Algorithms.py, ví dụ astar, ida_star, bfs")
+    parser.add_argument("--input", help="file đầu vào (mặc định stdin)")
+    parser.add_argument("--output", help="file kết quả JSONL (mặc định stdout)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-size", type=int, default=32)
+    parser.add_argument("--max-pending", type=int)
+    parser.add_argument("--timeout", type=float, help="giây cho mỗi bảng")
+    parser.add_argument("--rows", type=int)
+    parser.add_argument("--cols", type=int)
+    parser.add_argument("--option", action="append", default=[], help="tham số cho thuật toán, key=value")
+    parser.add_argument("--full-path", action="store_true", help="ghi cả dãy trạng thái")
+    parser.add_argument("--cache", nargs="?", const="", metavar="FILE", help="dùng bộ đệm lời giải; kèm FILE để lưu vào sqlite")
+    parser.add_argument("--cache-size", type=int, default=10000, help="số lời giải giữ trong bộ nhớ mỗi tiến trình")
+    args = parser.parse_args(argv)
+    try:
+        name = find_algorithm(args.algorithm)
+    except KeyError as error:
+        parser.error(f"{error.args[0]} (có: {', '.join(function for _, function, _ in ALGORITHMS.values())})")
+    if name in FILL_ALGORITHMS:
+        parser.error(f"{name} luôn bắt đầu từ bảng rỗng, không giải từ trạng thái đầu vào")
+
+    source = open(args.input) if args.input else sys.stdin
+    target = open(args.output, "w") if args.output else sys.stdout
+
+    def write(result):
+        target.write(json.dumps(result, separators=(",", ":"), ensure_ascii=False) + "\n")
+
+    def report(solver):
+        line = f"  {solver.solved} bảng, {solver.throughput():.1f} bảng/giây, {solver.counts}"
+        if solver.cache is not None:
+            line += f", bộ đệm trúng {solver.cache_hit_rate():.1%}"
+        print(line, file=sys.stderr)
+
+    solver = BatchSolver(args.algorithm, args.workers, args.chunk_size, args.max_pending, args.timeout,
+                         dict(parse_option(option) for option in args.option), args.full_path,
+                         None if args.cache is None else (args.cache or None, args.cache_size))
+    try:
+        solver.run(read_boards(source, args.rows, args.cols), write, report)
+    finally:
+        if args.input:
+            source.close()
+        if args.output:
+            target.close()
+    print(f"{solver.algorithm}: {solver.solved} bảng trong {solver.elapsed:.3f} giây, {solver.throughput():.1f} bảng/giây, "
+          f"{solver.workers} tiến trình, lô {solver.chunk_size}: {solver.counts}", file=sys.stderr)
+    if solver.cache is not None:
+        print(f"Bộ đệm: trúng {solver.cache_hit_rate():.1%} {solver.cache_counts}", file=sys.stderr)
+    return 0 if solver.counts.get("ok", 0) == solver.solved else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+import os, sys, csv, json, random, signal, statistics, time
+import argparse, multiprocessing, queue
+from BoardEncoding import get_codec
+from PermutationRank import get_ranker
+from DistanceDatabase import get_database
+from InstanceGenerator import ranks_at_depth
+from Algorithms import ALGORITHMS, FILL_ALGORITHMS, find_algorithm, get_solver
+from SearchStats import SearchResult
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# ======= BENCHMARK ======= #
+#
+# Chạy các thuật toán trong Algorithms.py trên bộ trạng thái cố định, chia nhóm theo số bước tối ưu.
+#   - bộ trạng thái: với mỗi độ sâu d (0..31 với 8-puzzle), chọn per_depth trạng thái có khoảng cách
+#     đúng bằng d trong cơ sở dữ liệu khoảng cách, bằng Random(seed, d) nên luôn giống nhau
+#   - mỗi lần chạy là một tiến trình con riêng: bị giết khi quá timeout, RSS đỉnh không lẫn với lần
+#     chạy trước; random được seed lại để các thuật toán ngẫu nhiên lặp lại được
+#   - ghi: thời gian, RSS tăng thêm, số nút mở rộng (SearchStats), giải được (đường đi hợp lệ),
+#     tối ưu, số bước; kết quả ra JSON (đầy đủ) và CSV (mỗi dòng một lần chạy)
+#   - compare: so hai file JSON theo (thuật toán, độ sâu) và báo các chỗ bị chậm / tệ đi
+# Bài toán điền số (FILL_ALGORITHMS) không dùng trạng thái đầu nên không nằm trong benchmark.
+#
+#   python Benchmark.py run --per-depth 3 --timeout 10 --output baseline
+#   python Benchmark.py run "A Start" ida_star --depths 20-31 --output new
+#   python Benchmark.py compare baseline.json new.json
+
+MAX_DEPTH = 31
+FIELDS = ["algorithm", "depth", "instance", "status", "seconds", "memory", "expanded", "steps", "optimal"]
+# Ngưỡng báo hồi quy: tăng quá RATIO lần và quá mức tuyệt đối tương ứng (tránh nhiễu với lần chạy rất ngắn)
+RATIO = 1.25
+MIN_SECONDS = 0.005
+MIN_MEMORY = 1 << 20
+
+
+def instance_sets(rows=3, cols=3, per_depth=3, seed=15, depths=None):
+    # {độ sâu: [trạng thái, ...]}; cần cơ sở dữ liệu khoảng cách (bàn cờ nhỏ)
+    codec = get_codec(rows, cols)
+    ranker = get_ranker(codec)
+    table = get_database(codec).table
+    by_depth = {d: ranks_at_depth(table, d) for d in (range(MAX_DEPTH + 1) if depths is None else depths)}
+    depths = [d for d in sorted(by_depth) if by_depth[d]] if depths is None else depths
+    instances = {}
+    for d in depths:
+        ranks = by_depth[d]
+        chosen = random.Random(seed * 1000 + d).sample(ranks, min(per_depth, len(ranks)))
+        instances[d] = [codec.decode(ranker.unrank(r)) for r in sorted(chosen)]
+    return instances
+
+
+def _run_once(name, state, seed, results):
+    # Tiến trình con: nhóm tiến trình riêng để giết được cả tiến trình cháu (HDA*)
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    sys.stdout = open(os.devnull, "w")
+    random.seed(seed)
+    try:
+        solver = get_solver(name)
+        codec = get_codec(len(state), len(state[0]))
+        database = get_database(codec)
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+        start_time = time.perf_counter()
+        path = solver([row[:] for row in state], stats=True)
+        seconds = time.perf_counter() - start_time
+        memory = 0
+        if resource:
+            unit = 1 if sys.platform == "darwin" else 1024
+            memory = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) * unit
+            memory += resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+        valid, optimal = database.check_path(state, path.path if isinstance(path, SearchResult) else path)
+        expanded = path.stats.expanded if isinstance(path, SearchResult) else None
+        results.put({"status": "ok" if valid and path else "failed", "seconds": seconds, "memory": memory,
+                     "expanded": expanded, "steps": len(path) - 1 if path else None, "optimal": bool(path) and optimal})
+    except Exception as error:
+        results.put({"status": "error", "error": repr(error)})
+
+
+def kill(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        process.kill()
+    process.join()
+
+
+def run_instance(context, name, state, seed, timeout):
+    results = context.Queue()
+    process = context.Process(target=_run_once, args=(name, state, seed, results))
+    process.start()
+    try:
+        result = results.get(timeout=timeout)
+    except queue.Empty:
+        kill(process)
+        return {"status": "timeout", "seconds": timeout}
+    process.join()
+    return result
+
+
+def run_benchmark(names=None, rows=3, cols=3, per_depth=3, seed=15, depths=None, timeout=10.0, log=print):
+    names = [find_algorithm(name) for name in names] if names else [name for name in ALGORITHMS if name not in FILL_ALGORITHMS]
+    instances = instance_sets(rows, cols, per_depth, seed, depths)
+    # fork: tiến trình con dùng luôn module và cơ sở dữ liệu đã nạp
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+    runs = []
+    for name in names:
+        try:
+            get_solver(name)
+        except ImportError as error:
+            log(f"{name}: bỏ qua, thiếu thư viện ({error})")
+            continue
+        for depth, states in instances.items():
+            for index, state in enumerate(states):
+                result = run_instance(context, name, state, seed + index, timeout)
+                runs.append({"algorithm": name, "depth": depth, "instance": index, **result})
+        rows_of_name = [run for run in runs if run["algorithm"] == name]
+        solved = sum(run["status"] == "ok" for run in rows_of_name)
+        log(f"{name}: giải được {solved}/{len(rows_of_name)}, quá thời gian {sum(run['status'] == 'timeout' for run in rows_of_name)}")
+    meta = {"rows": rows, "cols": cols, "per_depth": per_depth, "seed": seed, "timeout": timeout,
+            "depths": list(instances), "python": sys.version.split()[0], "cpu_count": os.cpu_count(), "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+    return {"meta": meta, "runs": runs}
+
+
+def summarize(runs):
+    # {(thuật toán, độ sâu): số liệu gộp}
+    groups = {}
+    for run in runs:
+        groups.setdefault((run["algorithm"], run["depth"]), []).append(run)
+    summary = {}
+    for key, group in groups.items():
+        solved = [run for run in group if run["status"] == "ok"]
+        summary[key] = {
+            "runs": len(group),
+            "success": len(solved) / len(group),
+            "timeouts": sum(run["status"] == "timeout" for run in group),
+            "seconds": statistics.median(run["seconds"] for run in solved) if solved else None,
+            "memory": max(run["memory"] for run in solved) if solved else None,
+            "expanded": statistics.median(run["expanded"] for run in solved) if solved and solved[0]["expanded"] is not None else None,
+            "steps": statistics.mean(run["steps"] for run in solved) if solved else None,
+            "optimal": sum(run["optimal"] for run in solved) / len(solved) if solved else None,
+        }
+    return summary
+
+
+def save_results(results, output):
+    with open(output + ".json", "w") as f:
+        json.dump(results, f, indent=1)
+    with open(output + ".csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results["runs"])
+    return [output + ".json", output + ".csv"]
+
+
+def print_summary(summary):
+    print(f"{'thuật toán':<36} {'d':>3} {'giải được':>9} {'trung vị (s)':>12} {'mở rộng':>10} {'RSS (MB)':>9} {'số bước':>8} {'tối ưu':>7}")
+    for (name, depth), row in sorted(summary.items(), key=lambda item: (list(ALGORITHMS).index(item[0][0]) if item[0][0] in ALGORITHMS else 0, item[0][1])):
+        seconds = f"{row['seconds']:.5f}" if row["seconds"] is not None else "-"
+        expanded = f"{row['expanded']:.0f}" if row["expanded"] is not None else "-"
+        memory = f"{row['memory'] / 1024 ** 2:.2f}" if row["memory"] is not None else "-"
+        steps = f"{row['steps']:.1f}" if row["steps"] is not None else "-"
+        optimal = f"{row['optimal']:.0%}" if row["optimal"] is not None else "-"
+        print(f"{name:<36} {depth:>3} {row['success']:>9.0%} {seconds:>12} {expanded:>10} {memory:>9} {steps:>8} {optimal:>7}")
+
+
+# ======= SO SÁNH ======= #
+
+def worse(old, new, ratio, minimum=0):
+    return old is not None and new is not None and new > old * ratio and new - old > minimum
+
+
+def compare(old_results, new_results, ratio=RATIO):
+    # [(thuật toán, độ sâu, mô tả), ...] các chỗ tệ đi giữa hai lần chạy
+    old_summary, new_summary = summarize(old_results["runs"]), summarize(new_results["runs"])
+    regressions = []
+    for key in sorted(set(old_summary) & set(new_summary), key=lambda key: (key[0], key[1])):
+        old, new = old_summary[key], new_summary[key]
+        problems = []
+        if new["success"] < old["success"]:
+            problems.append(f"giải được {old['success']:.0%} -> {new['success']:.0%}")
+        if worse(old["seconds"], new["seconds"], ratio, MIN_SECONDS):
+            problems.append(f"thời gian {old['seconds']:.5f} -> {new['seconds']:.5f} giây ({new['seconds'] / old['seconds']:.2f}x)")
+        if worse(old["expanded"], new["expanded"], ratio):
+            problems.append(f"mở rộng {old['expanded']:.0f} -> {new['expanded']:.0f}")
+        if worse(old["memory"], new["memory"], ratio, MIN_MEMORY):
+            problems.append(f"RSS {old['memory'] / 1024 ** 2:.2f} -> {new['memory'] / 1024 ** 2:.2f} MB")
+        if old["steps"] is not None and new["steps"] is not None and new["steps"] > old["steps"]:
+            problems.append(f"số bước {old['steps']:.1f} -> {new['steps']:.1f}")
+        for problem in problems:
+            regressions.append((key[0], key[1], problem))
+    missing = sorted(set(old_summary) - set(new_summary))
+    return regressions, missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark các thuật toán theo số bước tối ưu")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="chạy benchmark")
+    run.add_argument("algorithm", nargs="*", help="tên hiển thị hoặc tên hàm; bỏ trống để chạy tất cả")
+    run.add_argument("--rows", type=int, default=3)
+    run.add_argument("--cols", type=int, default=3)
+    run.add_argument("--per-depth", type=int, default=3)
+    run.add_argument("--depths", help="ví dụ 0-31 hoặc 10,20,30")
+    run.add_argument("--seed", type=int, default=15)
+    run.add_argument("--timeout", type=float, default=10.0)
+    run.add_argument("--output", default="benchmark")
+    check = commands.add_parser("compare", help="so hai file kết quả JSON")
+    check.add_argument("old")
+    check.add_argument("new")
+    check.add_argument("--ratio", type=float, default=RATIO)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        depths = None
+        if args.depths:
+            if "-" in args.depths:
+                low, high = args.depths.split("-")
+                depths = list(range(int(low), int(high) + 1))
+            else:
+                depths = [int(d) for d in args.depths.split(",")]
+        results = run_benchmark(args.algorithm, args.rows, args.cols, args.per_depth, args.seed, depths, args.timeout)
+        print_summary(summarize(results["runs"]))
+        for path in save_results(results, args.output):
+            print(f"Đã ghi {path}")
+        return 0
+
+    with open(args.old) as f:
+        old_results = json.load(f)
+    with open(args.new) as f:
+        new_results = json.load(f)
+    for key in ["rows", "cols", "per_depth", "seed"]:
+        if old_results["meta"][key] != new_results["meta"][key]:
+            # Khác bộ trạng thái: so sánh chỉ mang tính tham khảo
+            print(f"  Cảnh báo: {key} khác nhau ({old_results['meta'][key]} / {new_results['meta'][key]})")
+    regressions, missing = compare(old_results, new_results, args.ratio)
+    for name, depth in missing:
+        print(f"  thiếu trong {args.new}: {name}, d = {depth}")
+    for name, depth, problem in regressions:
+        print(f"  HỒI QUY {name}, d = {depth}: {problem}")
+    print(f"{len(regressions)} hồi quy" if regressions else "Không có hồi quy")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+import timeit
+from BoardEncoding import codec_for
+from PermutationRank import get_ranker
+from OpenList import make_open_list
+from Heuristics import get_heuristic, ManhattanTo, LinearConflict
+
+# ======= BIDIRECTIONAL SEARCH ======= #
+#
+# Tìm đồng thời từ trạng thái đầu (xuôi) và từ đích (ngược), gặp nhau ở giữa.
+# Mỗi hướng có bảng g (255 = chưa gặp) và mảng hướng đi riêng; đường đi ghép từ
+# nửa xuôi (start -> điểm gặp) và nửa ngược (điểm gặp -> đích).
+#   - BidirectionalBFS: mở rộng nguyên một tầng của phía có frontier nhỏ hơn; khi tầng đó
+#     có điểm gặp thì lấy điểm gặp tốt nhất của cả tầng rồi dừng (tối ưu).
+#   - BidirectionalAStar: kiểu MM, ưu tiên pr = max(g + h, 2g), hướng ngược dùng cùng heuristic
+#     tính tới trạng thái đầu (BACKWARD_HEURISTICS; PDB / walking distance gắn với đích nên không
+#     dùng được). Dừng khi U (đường tốt nhất đã gặp) <= min(pr nhỏ nhất hai phía).
+#   - expanded / generated / duplicates: số nút đã mở rộng / sinh ra / bị bỏ vì đã gặp,
+#     peak_frontier: tổng kích thước lớn nhất của hai frontier
+
+UNKNOWN = 255
+# Heuristic tới một trạng thái bất kỳ: tên -> factory(target, codec)
+BACKWARD_HEURISTICS = {
+    "manhattan": ManhattanTo,
+    "linear_conflict": lambda target, codec: LinearConflict(codec, target),
+}
+
+
+class BidirectionalBFS:
+    def __init__(self, start_state):
+        self.codec = codec_for(start_state)
+        self.ranker = get_ranker(self.codec)
+        self.start = self.codec.encode(start_state)
+        self.expanded = self.generated = self.duplicates = self.peak_frontier = 0
+
+    def join(self, parents, meet):
+        codec, ranker = self.codec, self.ranker
+        forward = ranker.path_from_moves(parents[0], self.start, meet)
+        backward = ranker.path_from_moves(parents[1], codec.goal, meet)
+        return forward + backward[-2::-1]
+
+    def solve(self):
+        codec, ranker = self.codec, self.ranker
+        start, goal = self.start, codec.goal
+        if start == goal:
+            return [codec.decode(start)]
+        if not ranker.is_solvable(start):
+            return []
+
+        depths = [ranker.new_table(UNKNOWN), ranker.new_table(UNKNOWN)]
+        parents = [ranker.new_parent_moves(), ranker.new_parent_moves()]
+        depths[0][ranker.index(start)] = 0
+        depths[1][ranker.index(goal)] = 0
+        frontiers = [[start], [goal]]
+        levels = [0, 0]
+        best, meet = None, None
+
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            depth, other, parent_moves = depths[side], depths[1 - side], parents[side]
+            level = levels[side] + 1
+            next_frontier = []
+            generated = 0
+            for code in frontiers[side]:
+                children = codec.successors(code)
+                generated += len(children)
+                for direction, child in children:
+                    r = ranker.index(child)
+                    if depth[r] == UNKNOWN:
+                        depth[r] = level
+                        parent_moves[r] = direction + 1
+                        next_frontier.append(child)
+                        if other[r] != UNKNOWN and (best is None or level + other[r] < best):
+                            best, meet = level + other[r], child
+            self.expanded += len(frontiers[side])
+            self.generated += generated
+            self.duplicates += generated - len(next_frontier)
+            frontiers[side] = next_frontier
+            self.peak_frontier = max(self.peak_frontier, len(frontiers[0]) + len(frontiers[1]))
+            levels[side] = level
+            if meet is not None:
+                return self.join(parents, meet)
+        return []
+
+
+class BidirectionalAStar(BidirectionalBFS):
+    def __init__(self, start_state, heuristic="manhattan", open_list="bucket", tie_break="high_g"):
+        super().__init__(start_state)
+        if heuristic not in BACKWARD_HEURISTICS:
+            raise ValueError(f"Bidirectional A* chỉ hỗ trợ heuristic: {', '.join(BACKWARD_HEURISTICS)}")
+        self.heuristics = [get_heuristic(heuristic, self.codec), BACKWARD_HEURISTICS[heuristic](self.start, self.codec)]
+        self.open_list = open_list
+        self.tie_break = tie_break
+
+    def solve(self):
+        codec, ranker = self.codec, self.ranker
+        start, goal = self.start, codec.goal
+        if start == goal:
+            return [codec.decode(start)]
+        if not ranker.is_solvable(start):
+            return []
+
+        g_tables = [ranker.new_table(UNKNOWN), ranker.new_table(UNKNOWN)]
+        parents = [ranker.new_parent_moves(), ranker.new_parent_moves()]
+        queues = [make_open_list(self.open_list, self.tie_break), make_open_list(self.open_list, self.tie_break)]
+        # keys: khoá heuristic của mỗi trạng thái trên open list (pr = max(g + h, 2g) không suy ngược ra h)
+        keys = [{}, {}]
+        for side, code in enumerate((start, goal)):
+            r = ranker.index(code)
+            g_tables[side][r] = 0
+            h_value, keys[side][r] = self.heuristics[side].evaluate(code)
+            queues[side].push(h_value, 0, code)
+        best, meet = None, None
+        size = 2
+
+        while queues[0] and queues[1]:
+            if size > self.peak_frontier:
+                self.peak_frontier = size
+            lower = min(queues[0].peek(), queues[1].peek())
+            if best is not None and best <= lower:
+                break
+            side = 0 if queues[0].peek() <= queues[1].peek() else 1
+            h, g_table, other, parent_moves = self.heuristics[side], g_tables[side], g_tables[1 - side], parents[side]
+
+            _, g, current = queues[side].pop()
+            size -= 1
+            # Xoá lười như astar
+            index = ranker.index(current)
+            if g != g_table[index]:
+                continue
+            self.expanded += 1
+            key = keys[side][index]
+            cost = g + 1
+            children = codec.successors(current)
+            self.generated += len(children)
+            for direction, child in children:
+                r = ranker.index(child)
+                if cost < g_table[r]:
+                    g_table[r] = cost
+                    parent_moves[r] = direction + 1
+                    child_h, keys[side][r] = h.update(key, current, child)
+                    queues[side].push(max(cost + child_h, 2 * cost), cost, child)
+                    size += 1
+                    if other[r] != UNKNOWN and (best is None or cost + other[r] < best):
+                        best, meet = cost + other[r], child
+                else:
+                    self.duplicates += 1
+
+        if meet is None:
+            return []
+        return self.join(parents, meet)
+
+
+if __name__ == "__main__":
+    from ObservableEnvironmet import bfs, astar
+    from FifteenPuzzle import random_instances
+
+    def count_expansions(algorithm, state):
+        # bfs / astar gọi codec.successors đúng một lần cho mỗi nút mở rộng
+        codec = codec_for(state)
+        calls = [0]
+        successors = codec.successors
+        def counted(code):
+            calls[0] += 1
+            return successors(code)
+        codec.successors = counted
+        try:
+            path = algorithm(state)
+        finally:
+            del codec.successors
+        return path, calls[0]
+
+    instances = [[[2, 6, 5], [0, 8, 7], [4, 3, 1]], [[8, 6, 7], [2, 5, 4], [3, 0, 1]], [[6, 4, 7], [8, 5, 0], [3, 2, 1]]]
+    for initial_state in instances:
+        print("Trạng thái:", initial_state)
+        for name, algorithm, engine in [("bfs", bfs, BidirectionalBFS), ("astar", astar, BidirectionalAStar)]:
+            path, expanded = count_expansions(algorithm, initial_state)
+            search = engine(initial_state)
+            start_time = timeit.default_timer()
+            bidirectional_path = search.solve()
+            end_time = timeit.default_timer()
+            print(f"{name:>6}: số bước = {len(path) - 1}, mở rộng = {expanded}; hai chiều: số bước = {len(bidirectional_path) - 1}, "
+                  f"mở rộng = {search.expanded} ({search.expanded / expanded:.1%}), thời gian = {(end_time - start_time):.5f} giây")
+
+    for initial_state in random_instances(3, walk=40):
+        path, expanded = count_expansions(astar, initial_state)
+        for heuristic in BACKWARD_HEURISTICS:
+            search = BidirectionalAStar(initial_state, heuristic)
+            bidirectional_path = search.solve()
+            assert len(bidirectional_path) == len(path)
+            print(f"15-puzzle astar: số bước = {len(path) - 1}, mở rộng = {expanded}; hai chiều ({heuristic}): "
+                  f"số bước = {len(bidirectional_path) - 1}, mở rộng = {search.expanded}")
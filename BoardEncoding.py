@@ -0,0 +1,143 @@
+# ======= BOARD ENCODING ======= #
+#
+# Bàn cờ rows x cols được nén vào một số nguyên: mỗi ô 4 bit (5 bit từ 24-puzzle trở lên,
+# ô i nằm ở bit bits*i), vị trí ô trống lưu ở trường cao nhất. Sinh trạng thái kề chỉ cần
+# vài phép toán số nguyên nhờ bảng di chuyển tính trước.
+
+# Hướng di chuyển của ô trống, cùng thứ tự với get_neighbors cũ
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+def inverse_direction(direction):
+    return direction ^ 1
+
+
+def goal_state(rows=3, cols=3):
+    size = rows * cols
+    return [[(i * cols + j + 1) % size for j in range(cols)] for i in range(rows)]
+
+
+class BoardCodec:
+    def __init__(self, rows=3, cols=3):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.bits = max(4, (self.size - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.blank_shift = self.bits * self.size
+        self.cells_mask = (1 << self.blank_shift) - 1
+        # Đích dạng list, dựng một lần cho mỗi kích thước (is_goal của các Puzzle so trực tiếp)
+        self.goal_state = goal_state(rows, cols)
+        self.goal = self.encode(self.goal_state)
+
+        # moves[b] = [(direction, nb, shift_nb, tile_delta, blank_delta), ...]
+        # con = code + tile * tile_delta + blank_delta, với tile = ô tại nb
+        self.moves = []
+        for b in range(self.size):
+            bi, bj = divmod(b, cols)
+            entries = []
+            for direction, (di, dj) in enumerate(DIRECTIONS):
+                ni, nj = bi + di, bj + dj
+                if 0 <= ni < rows and 0 <= nj < cols:
+                    nb = ni * cols + nj
+                    tile_delta = (1 << (self.bits * b)) - (1 << (self.bits * nb))
+                    blank_delta = (nb - b) << self.blank_shift
+                    entries.append((direction, nb, self.bits * nb, tile_delta, blank_delta))
+            self.moves.append(entries)
+
+        # Khoảng cách Manhattan của từng ô số tại từng vị trí: distance[pos][tile]
+        self.distance = []
+        for pos in range(self.size):
+            pi, pj = divmod(pos, cols)
+            row = [0] * self.size
+            for tile in range(1, self.size):
+                gi, gj = divmod(tile - 1, cols)
+                row[tile] = abs(pi - gi) + abs(pj - gj)
+            self.distance.append(row)
+
+    def encode(self, state):
+        code = 0
+        blank = 0
+        pos = 0
+        for row in state:
+            for value in row:
+                if value == 0:
+                    blank = pos
+                code |= value << (self.bits * pos)
+                pos += 1
+        return code | (blank << self.blank_shift)
+
+    def decode(self, code):
+        bits, mask, cols = self.bits, self.mask, self.cols
+        flat = [(code >> (bits * pos)) & mask for pos in range(self.size)]
+        return [flat[i * cols:(i + 1) * cols] for i in range(self.rows)]
+
+    def blank(self, code):
+        return code >> self.blank_shift
+
+    def tile_at(self, code, pos):
+        return (code >> (self.bits * pos)) & self.mask
+
+    def is_goal(self, code):
+        return code == self.goal
+
+    def neighbors(self, code):
+        result = []
+        mask = self.mask
+        for _, _, shift_nb, tile_delta, blank_delta in self.moves[code >> self.blank_shift]:
+            tile = (code >> shift_nb) & mask
+            result.append(code + tile * tile_delta + blank_delta)
+        return result
+
+    def successors(self, code):
+        # Giống neighbors nhưng kèm hướng đi của ô trống
+        result = []
+        mask = self.mask
+        for direction, _, shift_nb, tile_delta, blank_delta in self.moves[code >> self.blank_shift]:
+            tile = (code >> shift_nb) & mask
+            result.append((direction, code + tile * tile_delta + blank_delta))
+        return result
+
+    def apply(self, code, direction):
+        for d, _, shift_nb, tile_delta, blank_delta in self.moves[code >> self.blank_shift]:
+            if d == direction:
+                tile = (code >> shift_nb) & self.mask
+                return code + tile * tile_delta + blank_delta
+        return None
+
+    def moved_tile(self, code, child):
+        # Ô số vừa di chuyển từ code sang child: (tile, vị trí cũ, vị trí mới)
+        source = child >> self.blank_shift
+        target = code >> self.blank_shift
+        return (code >> (self.bits * source)) & self.mask, source, target
+
+    def manhattan(self, code):
+        distance, bits, mask = self.distance, self.bits, self.mask
+        total = 0
+        for pos in range(self.size):
+            total += distance[pos][code & mask]
+            code >>= bits
+        return total
+
+    def path_from_parents(self, parents, code):
+        # parents: dict con -> cha (None ở gốc); trả về list-of-lists cho giao diện
+        path = []
+        while code is not None:
+            path.append(self.decode(code))
+            code = parents[code]
+        return path[::-1]
+
+
+_codecs = {}
+
+def get_codec(rows=3, cols=3):
+    if (rows, cols) not in _codecs:
+        _codecs[(rows, cols)] = BoardCodec(rows, cols)
+    return _codecs[(rows, cols)]
+
+def codec_for(state):
+    # Kích thước bàn cờ lấy từ chính trạng thái đầu vào
+    return get_codec(len(state), len(state[0]))
+
+
+codec = get_codec()
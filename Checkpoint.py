@@ -0,0 +1,196 @@
+import os, json, struct, timeit, zlib
+from array import array
+from PermutationRank import VisitedBitmap, VisitedSet, SparseTable
+
+# ======= CHECKPOINT ======= #
+#
+# Ảnh chụp nhị phân trạng thái tìm kiếm (astar, ida_star, bfs theo tầng) để chạy tiếp sau khi bị dừng.
+# File: MAGIC, độ dài + JSON (loại thuật toán và các số nhỏ), số section, rồi từng section
+# (tên, độ dài, dữ liệu nén zlib). Trạng thái lưu bằng code dạng uint64 (code dài hơn 64 bit chia thành
+# nhiều uint64: hai với 15-puzzle, ba với 5x5; phần cao gần như không đổi nên nén rất tốt), không rank
+# để ghi nhanh.
+# Ghi ra file tạm rồi os.replace, nên file cũ vẫn dùng được nếu bị dừng giữa lúc ghi.
+#
+# Checkpointer quyết định khi nào lưu: sau every_nodes nút và/hoặc every_seconds giây. Thuật toán
+# chỉ so số nút với next_at (rẻ) và hỏi poll() khi tới; save() nhận hàm dựng (meta, sections) để
+# đo cả thời gian chụp lẫn thời gian ghi: writes = [(thời gian, số byte), ...].
+
+MAGIC = b"NPCK1\n"
+MASK64 = (1 << 64) - 1
+# Với lưu theo thời gian: số nút giữa hai lần xem đồng hồ
+POLL_NODES = 4096
+
+
+class Checkpointer:
+    def __init__(self, path, every_nodes=None, every_seconds=None, level=1):
+        if every_nodes is None and every_seconds is None:
+            raise ValueError("Cần every_nodes hoặc every_seconds")
+        self.path = path
+        self.every_nodes = every_nodes
+        self.every_seconds = every_seconds
+        self.level = level
+        self.step = min(every_nodes or POLL_NODES, POLL_NODES) if every_seconds else every_nodes
+        self.writes = []
+        self.start(0)
+
+    def start(self, nodes):
+        self.last_nodes = nodes
+        self.last_time = timeit.default_timer()
+        self.next_at = nodes + self.step
+
+    def poll(self, nodes):
+        self.next_at = nodes + self.step
+        if self.every_nodes and nodes - self.last_nodes >= self.every_nodes:
+            return True
+        return bool(self.every_seconds) and timeit.default_timer() - self.last_time >= self.every_seconds
+
+    def save(self, kind, build, nodes):
+        start_time = timeit.default_timer()
+        meta, sections = build()
+        size = write_snapshot(self.path, kind, meta, sections, self.level)
+        self.writes.append((timeit.default_timer() - start_time, size))
+        self.start(nodes)
+
+    def overhead(self):
+        return sum(seconds for seconds, _ in self.writes)
+
+
+def write_snapshot(path, kind, meta, sections, level=1):
+    header = json.dumps(dict(meta, kind=kind)).encode()
+    chunks = [MAGIC, struct.pack("<II", len(header), len(sections)), header]
+    for name, data in sections.items():
+        data = zlib.compress(bytes(data), level)
+        chunks.append(struct.pack("<32sQ", name.encode(), len(data)))
+        chunks.append(data)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    return sum(len(chunk) for chunk in chunks)
+
+
+def read_snapshot(path, kind=None):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Không phải file checkpoint: {path}")
+        header_size, count = struct.unpack("<II", f.read(8))
+        meta = json.loads(f.read(header_size))
+        sections = {}
+        for _ in range(count):
+            name, size = struct.unpack("<32sQ", f.read(40))
+            sections[name.rstrip(b"\0").decode()] = zlib.decompress(f.read(size))
+    if kind is not None and meta["kind"] != kind:
+        raise ValueError(f"Checkpoint của {meta['kind']}, không phải {kind}")
+    return meta, sections
+
+
+def snapshot_kind(path):
+    # Chỉ đọc phần JSON đầu file
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Không phải file checkpoint: {path}")
+        header_size, _ = struct.unpack("<II", f.read(8))
+        return json.loads(f.read(header_size))["kind"]
+
+
+# ======= MÃ HOÁ CÁC CẤU TRÚC ======= #
+
+def pack_codes(codes):
+    # Byte đầu: số uint64 của mỗi code trừ 1 (0 với 8-puzzle, 1 với 15-puzzle, 2 với 5x5, ...);
+    # sau đó là từng mảng uint64, phần thấp trước
+    codes = list(codes)
+    words = max(1, (max(codes, default=0).bit_length() + 63) // 64)
+    chunks = [bytes([words - 1])]
+    for word in range(words):
+        shift = 64 * word
+        chunks.append(array('Q', [code >> shift & MASK64 for code in codes]).tobytes())
+    return b"".join(chunks)
+
+
+def unpack_codes(data):
+    values = array('Q')
+    values.frombytes(data[1:])
+    words = data[0] + 1
+    count = len(values) // words
+    codes = list(values[:count])
+    for word in range(1, words):
+        shift = 64 * word
+        codes = [code | high << shift for code, high in zip(codes, values[word * count:(word + 1) * count])]
+    return codes
+
+
+def pack_numbers(values, typecode='H'):
+    return array(typecode, values).tobytes()
+
+
+def unpack_numbers(data, typecode='H'):
+    values = array(typecode)
+    values.frombytes(data)
+    return values
+
+
+def pack_table(table, name, typecode='B'):
+    # Bảng theo rank (bytearray) lưu nguyên; SparseTable lưu (code, giá trị), giá trị rộng hơn 1 byte
+    # (vd. g trên bàn lớn) thì ghi kèm section name.type
+    if isinstance(table, SparseTable):
+        if typecode == 'B':
+            return {name + ".keys": pack_codes(table.keys()), name: bytes(table.values())}
+        return {name + ".keys": pack_codes(table.keys()), name: pack_numbers(table.values(), typecode),
+                name + ".type": typecode.encode()}
+    return {name: table}
+
+
+def unpack_table(sections, name, default):
+    if name + ".keys" not in sections:
+        return bytearray(sections[name])
+    table = SparseTable(default)
+    typecode = sections.get(name + ".type", b"B").decode()
+    values = sections[name] if typecode == 'B' else unpack_numbers(sections[name], typecode)
+    table.update(zip(unpack_codes(sections[name + ".keys"]), values))
+    return table
+
+
+def pack_visited(visited, name):
+    if isinstance(visited, VisitedSet):
+        return {name + ".keys": pack_codes(visited)}
+    return {name: visited.bits}
+
+
+def unpack_visited(sections, name):
+    if name + ".keys" in sections:
+        visited = VisitedSet()
+        set.update(visited, unpack_codes(sections[name + ".keys"]))
+        return visited
+    visited = VisitedBitmap(0)
+    visited.bits = bytearray(sections[name])
+    return visited
+
+
+if __name__ == "__main__":
+    import tempfile
+    from BoardEncoding import get_codec
+    from InstanceGenerator import random_state, states_at_depth
+    from ObservableEnvironmet import astar, ida_star, bfs, resume_search
+
+    # Mã hoá code qua lại: 8-puzzle 1 uint64, 15-puzzle 2, 5x5 (125 bit + ô trống) 3
+    for rows, cols in [(3, 3), (4, 4), (5, 5)]:
+        codec = get_codec(rows, cols)
+        codes = [codec.encode(random_state(rows, cols)) for _ in range(100)]
+        data = pack_codes(codes)
+        assert unpack_codes(data) == codes
+        print(f"{rows}x{cols}: {data[0] + 1} uint64 / code, {len(data)} byte cho {len(codes)} code")
+
+    # Lưu rồi chạy tiếp trên bàn 5x5
+    initial_state = next(iter(states_at_depth(12, 1, 5, 5, seed=3)))
+    with tempfile.TemporaryDirectory() as directory:
+        for solve in [astar, ida_star, bfs]:
+            path = os.path.join(directory, solve.__name__ + ".ckpt")
+            checkpoint = Checkpointer(path, every_nodes=5 if solve is not bfs else 5000)
+            solution = solve(initial_state, checkpoint=checkpoint)
+            resumed = resume_search(path)
+            assert len(resumed) == len(solution)
+            print(f"5x5 {solve.__name__}: số bước = {len(solution) - 1}, chạy tiếp = {len(resumed) - 1}, "
+                  f"số lần lưu = {len(checkpoint.writes)}")
@@ -0,0 +1,163 @@
+import timeit
+from BoardEncoding import codec_for
+from PermutationRank import get_ranker
+
+# ======= DEPTH-FIRST ENGINE ======= #
+#
+# Lõi tìm kiếm theo chiều sâu cho dfs / dls / ids: lặp (không đệ quy) trên một bàn cờ duy nhất,
+# đi một bước thì đổi chỗ 2 ô (make), quay lui thì đổi lại (unmake). Ngăn xếp nước đi
+# (codes, cursors, directions theo độ sâu) được cấp phát một lần và dùng lại.
+#   - limit = None (dfs): mỗi trạng thái thăm đúng một lần (bitmap / set như bfs)
+#   - có limit (dls, ids): bảng chuyển vị giới hạn kích thước code -> (lượt, độ sâu nhỏ nhất),
+#     chỉ cắt khi đã gặp trạng thái ở độ sâu không lớn hơn trong cùng lượt, nên không bỏ sót
+#     đường đi hợp lệ như visited dùng chung giữa các nhánh
+#   - iterations: [(limit, số nút sinh ra), ...]; expanded / generated / duplicates cộng dồn mọi lượt,
+#     peak_frontier là độ sâu ngăn xếp lớn nhất
+
+# Mục bảng chuyển vị: (lượt << G_BITS) | độ sâu; 32 bit để limit lớn không tràn sang trường lượt
+G_BITS = 32
+
+
+class DepthFirst:
+    def __init__(self, start_state, table_size=1 << 20):
+        self.codec = codec_for(start_state)
+        self.ranker = get_ranker(self.codec)
+        self.start = self.codec.encode(start_state)
+        self.board = [value for row in start_state for value in row]
+        self.table_size = table_size
+        self.table = {}
+        self.iterations = []
+        self.codes, self.cursors, self.directions = [self.start], [0], [-1]
+        self.expanded = self.generated = self.duplicates = 0
+
+    @property
+    def peak_frontier(self):
+        return len(self.codes)
+
+    def finish_iteration(self, limit, nodes, generated, duplicates):
+        self.iterations.append((limit, nodes))
+        self.expanded += nodes
+        self.generated += generated
+        self.duplicates += duplicates
+
+    def search(self, limit=None, iteration=1):
+        codec, board, table = self.codec, self.board, self.table
+        moves, blank_shift, goal = codec.moves, codec.blank_shift, codec.goal
+        stamp = iteration << G_BITS
+        table_size = self.table_size
+        if limit is None:
+            visited = self.ranker.new_visited()
+            visited.add(self.ranker.index(self.start))
+        elif len(table) >= table_size:
+            table.clear()
+        # cutoff: có nhánh bị cắt vì chạm limit (ids dừng khi cả lượt không bị cắt)
+        self.cutoff = False
+
+        codes, cursors, directions = self.codes, self.cursors, self.directions
+        codes[0] = self.start
+        cursors[0] = 0
+        directions[0] = -1
+        depth = 0
+        nodes = 1
+        generated = duplicates = 0
+        if self.start == goal:
+            self.finish_iteration(limit, nodes, generated, duplicates)
+            return codes[:1]
+
+        while depth >= 0:
+            code = codes[depth]
+            options = moves[code >> blank_shift]
+            i = cursors[depth]
+            if i == len(options) or depth == limit:
+                if depth == limit:
+                    self.cutoff = True
+                # unmake
+                if depth > 0:
+                    b = codes[depth - 1] >> blank_shift
+                    nb = code >> blank_shift
+                    board[nb], board[b] = board[b], 0
+                depth -= 1
+                continue
+            cursors[depth] = i + 1
+            direction, nb, _, tile_delta, blank_delta = options[i]
+            if direction == directions[depth] ^ 1:
+                continue
+
+            tile = board[nb]
+            child = code + tile * tile_delta + blank_delta
+            generated += 1
+            g = depth + 1
+            if limit is None:
+                if not visited.add(self.ranker.index(child)):
+                    duplicates += 1
+                    continue
+            else:
+                seen = table.get(child)
+                if seen is not None and seen >> G_BITS == iteration and seen - stamp <= g:
+                    duplicates += 1
+                    continue
+                if seen is not None or len(table) < table_size:
+                    table[child] = stamp | g
+
+            # make
+            b = code >> blank_shift
+            board[b], board[nb] = tile, 0
+            nodes += 1
+            depth = g
+            if depth == len(codes):
+                codes.append(0); cursors.append(0); directions.append(-1)
+            codes[depth] = child
+            cursors[depth] = 0
+            directions[depth] = direction
+            if child == goal:
+                # Trả bàn cờ về trạng thái đầu cho lần gọi sau
+                path = codes[:depth + 1]
+                self.board = [value for row in self.codec.decode(self.start) for value in row]
+                self.finish_iteration(limit, nodes, generated, duplicates)
+                return path
+
+        self.finish_iteration(limit, nodes, generated, duplicates)
+        return None
+
+    def decode(self, path):
+        return [self.codec.decode(code) for code in path] if path else []
+
+    def dfs(self):
+        if not self.ranker.is_solvable(self.start):
+            return []
+        return self.decode(self.search())
+
+    def dls(self, limit=50):
+        return self.decode(self.search(limit))
+
+    def ids(self, max_depth=50):
+        for limit in range(max_depth):
+            path = self.search(limit, limit + 1)
+            if path or not self.cutoff:
+                return self.decode(path)
+        return []
+
+
+if __name__ == "__main__":
+    initial_state = [[2, 6, 5], [0, 8, 7], [4, 3, 1]]
+
+    engine = DepthFirst(initial_state)
+    start_time = timeit.default_timer()
+    path = engine.dfs()
+    end_time = timeit.default_timer()
+    print(f"dfs: số bước = {len(path) - 1}, số nút = {engine.iterations[-1][1]}, thời gian = {(end_time - start_time):.5f} giây")
+
+    engine = DepthFirst(initial_state)
+    start_time = timeit.default_timer()
+    path = engine.dls(23)
+    end_time = timeit.default_timer()
+    dls_nodes = engine.iterations[-1][1]
+    print(f"dls (limit = 23): số bước = {len(path) - 1}, số nút = {dls_nodes}, thời gian = {(end_time - start_time):.5f} giây")
+
+    engine = DepthFirst(initial_state)
+    start_time = timeit.default_timer()
+    path = engine.ids()
+    end_time = timeit.default_timer()
+    total = sum(nodes for _, nodes in engine.iterations)
+    print(f"ids: số bước = {len(path) - 1}, tổng số nút = {total} ({total / dls_nodes:.2f} lần một dls), thời gian = {(end_time - start_time):.5f} giây")
+    print("    (limit, số nút):", engine.iterations)
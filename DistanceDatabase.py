@@ -0,0 +1,125 @@
+import os, mmap, timeit
+from BoardEncoding import codec, codec_for
+from PermutationRank import ranker, get_ranker
+from LevelBFS import LevelBFS
+from SearchStats import SearchStats, finish
+
+# ======= DISTANCE DATABASE ======= #
+#
+# Khoảng cách tối ưu tới đích của mọi trạng thái giải được, 1 byte theo rank.
+# Tạo bằng một lần BFS ngược từ trạng thái đích, lưu ra file và đọc lại bằng mmap.
+
+UNKNOWN = 255
+
+
+def database_path(codec=codec):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f"distances_{codec.rows}x{codec.cols}.bin")
+
+
+def build_distances(codec=codec, ranker=ranker):
+    # BFS theo tầng từ đích, bảng độ sâu của LevelBFS chính là bảng khoảng cách
+    engine = LevelBFS(codec, ranker, track_parents=False, track_depths=True)
+    for _ in engine.layers(codec.goal):
+        pass
+    return engine.depths
+
+
+def build_database(path=None, codec=codec, ranker=ranker):
+    path = path or database_path(codec)
+    distances = build_distances(codec, ranker)
+    with open(path, "wb") as f:
+        f.write(distances)
+    return path
+
+
+class DistanceDatabase:
+    def __init__(self, path=None, codec=codec, ranker=ranker):
+        self.codec = codec
+        self.ranker = ranker
+        self.path = path or database_path(codec)
+        if not os.path.exists(self.path) or os.path.getsize(self.path) != ranker.size:
+            build_database(self.path, codec, ranker)
+        with open(self.path, "rb") as f:
+            self.table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def distance(self, code):
+        return self.table[self.ranker.rank(code)]
+
+    def is_solvable(self, code):
+        return self.ranker.is_solvable(code)
+
+    def solve(self, code):
+        # Mỗi bước chọn hàng xóm có khoảng cách nhỏ hơn đúng 1
+        if not self.is_solvable(code):
+            return []
+        path = [code]
+        d = self.distance(code)
+        while d > 0:
+            for neighbor in self.codec.neighbors(code):
+                if self.distance(neighbor) == d - 1:
+                    code = neighbor
+                    break
+            path.append(code)
+            d -= 1
+        return path
+
+    def check_path(self, start_state, path):
+        # Oracle: (hợp lệ, tối ưu) cho một lời giải dạng list-of-lists
+        start = self.codec.encode(start_state)
+        if not path:
+            return not self.is_solvable(start), not self.is_solvable(start)
+        codes = [self.codec.encode(state) for state in path]
+        valid = codes[0] == start and codes[-1] == self.codec.goal
+        valid = valid and all(b in self.codec.neighbors(a) for a, b in zip(codes, codes[1:]))
+        return valid, valid and len(codes) - 1 == self.distance(start)
+
+
+_databases = {}
+
+def get_database(codec=codec):
+    # Chỉ dùng được cho bàn cờ nhỏ (bảng theo rank, 1 byte mỗi trạng thái)
+    key = (codec.rows, codec.cols)
+    if key not in _databases:
+        ranker = get_ranker(codec)
+        if not ranker.dense:
+            raise ValueError(f"Không gian trạng thái {codec.rows}x{codec.cols} quá lớn cho cơ sở dữ liệu khoảng cách")
+        _databases[key] = DistanceDatabase(codec=codec, ranker=ranker)
+    return _databases[key]
+
+def exact_distance(state):
+    codec = codec_for(state)
+    return get_database(codec).distance(codec.encode(state))
+
+def database_solve(start_state, stats=False):
+    # stats: phases "load" (đọc / tạo cơ sở dữ liệu) và "lookup"; mỗi bước tra một nút
+    info = SearchStats("database_solve")
+    codec = codec_for(start_state)
+    database = get_database(codec)
+    info.mark("load")
+    path = [codec.decode(code) for code in database.solve(codec.encode(start_state))]
+    info.count(max(len(path) - 1, 0), peak_frontier=1)
+    return finish(path, info, stats, "lookup")
+
+
+if __name__ == "__main__":
+    from ObservableEnvironmet import bfs, ucs, astar, ida_star
+
+    path = database_path()
+    start_time = timeit.default_timer()
+    build_database(path)
+    end_time = timeit.default_timer()
+    print(f"Thời gian tạo cơ sở dữ liệu: {(end_time - start_time):.5f} giây")
+    print(f"Kích thước file: {os.path.getsize(path) / 1024:.1f} KB ({path})")
+
+    database = get_database()
+    print("Khoảng cách lớn nhất:", max(database.table[:]))
+
+    initial_state = [[2, 6, 5], [0, 8, 7], [4, 3, 1]]
+    start_time = timeit.default_timer()
+    solution = database_solve(initial_state)
+    end_time = timeit.default_timer()
+    print(f"Thời gian giải: {(end_time - start_time) * 1e6:.1f} micro giây, số bước: {len(solution) - 1}")
+
+    for algorithm in [bfs, ucs, astar, ida_star]:
+        valid, optimal = database.check_path(initial_state, algorithm(initial_state))
+        print(f"{algorithm.__name__}: hợp lệ={valid}, tối ưu={optimal}")
@@ -0,0 +1,165 @@
+import os, heapq, shutil, tempfile, timeit
+from array import array
+from BoardEncoding import get_codec
+from PermutationRank import get_ranker
+
+# ======= EXTERNAL-MEMORY BFS ======= #
+#
+# BFS theo tầng với các tầng nằm trên đĩa, dùng khi không gian trạng thái không vừa RAM (15-puzzle).
+#   - mỗi tầng là một file rank uint64 đã sắp xếp, không trùng (rank của 15-puzzle < 2^64,
+#     còn code thì không vừa 64 bit)
+#   - mở rộng tầng d: đọc tuần tự từng khối lớn, rank các trạng thái con vào bộ đệm; đầy ngân sách
+#     RAM thì sắp xếp, bỏ trùng, ghi thành một run
+#   - loại trùng trễ (delayed duplicate detection): trộn các run (heapq.merge) và trừ đi tầng d - 1
+#     đang đọc song song. Đồ thị trò chơi là đồ thị hai phía (mỗi nước đổi tính chẵn lẻ vị trí
+#     ô trống theo khoảng cách), nên con của tầng d chỉ có thể nằm ở tầng d - 1 hoặc d + 1
+#   - stats: [(độ sâu, số trạng thái, thời gian, byte đọc, byte ghi, số run), ...]
+
+ITEM_BYTES = 8
+# Chi phí RAM của mỗi phần tử bộ đệm khi sắp xếp: 8 byte trong array + list con trỏ + đối tượng int
+RUN_ITEM_BYTES = 48
+
+
+class ExternalBFS:
+    def __init__(self, rows=4, cols=4, directory=None, ram_budget=64 << 20, buffer_size=1 << 20, keep_files=False):
+        self.codec = get_codec(rows, cols)
+        self.ranker = get_ranker(self.codec)
+        self.directory = directory
+        self.run_items = max(1, ram_budget // RUN_ITEM_BYTES)
+        self.buffer_items = max(1, buffer_size // ITEM_BYTES)
+        self.keep_files = keep_files
+        self.stats = []
+
+    def layer_path(self, depth):
+        return os.path.join(self.directory, f"layer_{depth:03}.bin")
+
+    def read(self, path):
+        # Đọc tuần tự từng khối buffer_items phần tử
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                chunk = array('Q')
+                try:
+                    chunk.fromfile(f, self.buffer_items)
+                except EOFError:
+                    pass
+                if not chunk:
+                    return
+                self.bytes_read += len(chunk) * ITEM_BYTES
+                yield from chunk
+
+    def write(self, path, ranks):
+        # Ghi một dãy rank đã sắp xếp, bỏ phần tử trùng liền nhau; trả về số phần tử đã ghi
+        count = 0
+        previous = -1
+        block = array('Q')
+        with open(path, "wb", buffering=0) as f:
+            for r in ranks:
+                if r == previous:
+                    continue
+                previous = r
+                block.append(r)
+                if len(block) >= self.buffer_items:
+                    block.tofile(f)
+                    count += len(block)
+                    block = array('Q')
+            block.tofile(f)
+            count += len(block)
+        self.bytes_written += count * ITEM_BYTES
+        return count
+
+    def expand(self, depth):
+        # Sinh con của tầng depth thành các run đã sắp xếp trên đĩa
+        rank, unrank, neighbors = self.ranker.rank, self.ranker.unrank, self.codec.neighbors
+        runs = []
+        buffer = array('Q')
+
+        def flush():
+            path = os.path.join(self.directory, f"run_{depth + 1:03}_{len(runs):05}.bin")
+            self.write(path, sorted(buffer))
+            runs.append(path)
+
+        for r in self.read(self.layer_path(depth)):
+            for child in neighbors(unrank(r)):
+                buffer.append(rank(child))
+            if len(buffer) >= self.run_items:
+                flush()
+                buffer = array('Q')
+        if buffer:
+            flush()
+        return runs
+
+    def subtract(self, merged, previous):
+        # merged, previous đều tăng dần: bỏ các rank có trong previous
+        previous = iter(previous)
+        current = next(previous, None)
+        for r in merged:
+            while current is not None and current < r:
+                current = next(previous, None)
+            if r != current:
+                yield r
+
+    def run(self, start=None, max_depth=None):
+        codec, ranker = self.codec, self.ranker
+        start = codec.goal if start is None else start
+        created = self.directory is None
+        if created:
+            self.directory = tempfile.mkdtemp(prefix="external_bfs_")
+        self.stats = []
+        sizes = []
+        try:
+            self.bytes_read = self.bytes_written = 0
+            count = self.write(self.layer_path(0), [ranker.rank(start)])
+            self.stats.append((0, count, 0.0, 0, self.bytes_written, 0))
+            sizes.append(count)
+            depth = 0
+            while count and (max_depth is None or depth < max_depth):
+                start_time = timeit.default_timer()
+                self.bytes_read = self.bytes_written = 0
+                runs = self.expand(depth)
+                merged = heapq.merge(*(self.read(path) for path in runs))
+                if depth > 0:
+                    merged = self.subtract(merged, self.read(self.layer_path(depth - 1)))
+                count = self.write(self.layer_path(depth + 1), merged)
+                for path in runs:
+                    os.remove(path)
+                if depth > 0 and not self.keep_files:
+                    os.remove(self.layer_path(depth - 1))
+                depth += 1
+                if count:
+                    self.stats.append((depth, count, timeit.default_timer() - start_time, self.bytes_read, self.bytes_written, len(runs)))
+                    sizes.append(count)
+        finally:
+            if created and not self.keep_files:
+                shutil.rmtree(self.directory, ignore_errors=True)
+                self.directory = None
+        return sizes
+
+
+def external_state_space(rows=4, cols=4, max_depth=None, ram_budget=64 << 20, directory=None):
+    # Số trạng thái ở từng khoảng cách tới đích, các tầng nằm trên đĩa
+    return ExternalBFS(rows, cols, directory, ram_budget).run(max_depth=max_depth)
+
+
+if __name__ == "__main__":
+    from LevelBFS import state_space_layers
+
+    def report(engine):
+        for depth, count, seconds, read, written, runs in engine.stats:
+            rate = count / seconds if seconds else 0
+            print(f"  tầng {depth:>2}: {count:>8} trạng thái, {runs:>3} run, đọc {read / 1024:9.1f} KB, ghi {written / 1024:9.1f} KB, "
+                  f"{seconds:8.3f} giây, {rate:10.0f} trạng thái/giây")
+
+    sizes, _ = state_space_layers(rows=3, cols=3)
+    engine = ExternalBFS(3, 3, ram_budget=1 << 20)
+    start_time = timeit.default_timer()
+    external_sizes = engine.run()
+    elapsed = timeit.default_timer() - start_time
+    print(f"== 3x3 (RAM 1 MB): {sum(external_sizes)} trạng thái, khớp LevelBFS = {external_sizes == sizes}, thời gian = {elapsed:.3f} giây ==")
+    report(engine)
+
+    engine = ExternalBFS(4, 4, ram_budget=16 << 20)
+    start_time = timeit.default_timer()
+    external_sizes = engine.run(max_depth=14)
+    elapsed = timeit.default_timer() - start_time
+    print(f"== 4x4, 14 tầng đầu (RAM 16 MB): {sum(external_sizes)} trạng thái, thời gian = {elapsed:.3f} giây ==")
+    report(engine)
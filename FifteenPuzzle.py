@@ -0,0 +1,63 @@
+import sys, random, timeit
+from BoardEncoding import get_codec, inverse_direction
+
+# ======= 15-PUZZLE BENCHMARK ======= #
+#
+# Bộ trạng thái 15-puzzle để chạy các thuật toán tối ưu.
+#   - random_instances: đi ngẫu nhiên từ đích (có seed nên lặp lại được)
+#   - load_instances: đọc file dạng Korf (mỗi dòng 16 số, có thể có số thứ tự ở đầu).
+#     Đích của Korf là ô trống ở góc trên trái (0 1 2 ... 15), nên xoay bàn cờ 180 độ
+#     và đổi nhãn t -> (16 - t) % 16 để về đích của chương trình; số bước tối ưu giữ nguyên.
+
+
+def random_instances(count=10, walk=60, seed=15, rows=4, cols=4):
+    codec = get_codec(rows, cols)
+    rng = random.Random(seed)
+    instances = []
+    for _ in range(count):
+        code = codec.goal
+        last = -1
+        for _ in range(walk):
+            # Không đi ngược lại nước vừa đi
+            options = [(direction, child) for direction, child in codec.successors(code) if direction != inverse_direction(last)]
+            last, code = rng.choice(options)
+        instances.append(codec.decode(code))
+    return instances
+
+
+def from_korf(values, rows=4, cols=4):
+    size = rows * cols
+    flat = [(size - values[size - 1 - pos]) % size for pos in range(size)]
+    return [flat[r * cols:(r + 1) * cols] for r in range(rows)]
+
+
+def load_instances(path, rows=4, cols=4, blank_first=True):
+    size = rows * cols
+    instances = []
+    with open(path) as f:
+        for line in f:
+            values = [int(value) for value in line.split()]
+            if len(values) < size:
+                continue
+            values = values[-size:]
+            if blank_first:
+                instances.append(from_korf(values, rows, cols))
+            else:
+                instances.append([values[r * cols:(r + 1) * cols] for r in range(rows)])
+    return instances
+
+
+if __name__ == "__main__":
+    from ObservableEnvironmet import astar, ida_star
+
+    # python FifteenPuzzle.py [file Korf]
+    instances = load_instances(sys.argv[1]) if len(sys.argv) > 1 else random_instances()
+    for algorithm, heuristics in [(ida_star, ["manhattan", "linear_conflict", "walking_distance", "pdb"]), (astar, ["linear_conflict", "pdb"])]:
+        print(f"== {algorithm.__name__} trên {len(instances)} trạng thái 15-puzzle ==")
+        for name in heuristics:
+            steps = []
+            start_time = timeit.default_timer()
+            for state in instances:
+                steps.append(len(algorithm(state, heuristic=name)) - 1)
+            end_time = timeit.default_timer()
+            print(f"{name:>17}: số bước = {steps}, thời gian = {(end_time - start_time):.5f} giây")
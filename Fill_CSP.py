@@ -1,22 +1,25 @@
 import copy
 import random
+from BoardEncoding import get_codec
+from SearchStats import SearchStats, finish
 
 class Puzzle:
     def __init__(self, state, parent=None, depth=0):
         self.state = state
         self.parent = parent
         self.depth = depth
+        self.rows, self.cols = len(state), len(state[0])
         self.blank_pos = self.find_next_blank()
 
     def find_next_blank(self):
-        for i in range(3):
-            for j in range(3):
-                if self.state[i][j] == 0 and i + j != 4:
+        for i in range(self.rows):
+            for j in range(self.cols):
+                if self.state[i][j] == 0 and i + j != self.rows + self.cols - 2:
                     return (i, j)
         return None
 
     def is_goal(self):
-        return self.state == [[1, 2, 3], [4, 5, 6], [7, 8, 0]]
+        return self.state == get_codec(self.rows, self.cols).goal_state
 
     def get_path(self):
         path = []
@@ -28,7 +31,7 @@ class Puzzle:
 
     def get_domain(self):
         used_values = set(sum(self.state, []))
-        return [i for i in range(1, 9) if i not in used_values]
+        return [i for i in range(1, self.rows * self.cols) if i not in used_values]
 
     def forward_checking(self, value):
         bi, bj = self.blank_pos
@@ -61,25 +64,35 @@ class Puzzle:
             return 0
         if (self.state[pi][pj] < value):
             return value - self.state[pi][pj]
-        return 9
+        return self.rows * self.cols
 
 
 
 # Backtracking Algorithm
-def backtracking_fill(initial_state, max_depth=1000):
+# generated = số phép gán thử, duplicates = phép gán bị loại (trùng hoặc không qua forward checking)
+def backtracking_fill(initial_state, max_depth=1000, stats=False):
+    info = SearchStats("backtracking_fill")
     initial_puzzle = Puzzle(initial_state)
     visited = set()
-    return fill_backtrack(initial_puzzle, visited, 1, max_depth)
+    counts = [0, 0, 0, 0]
+    info.mark("setup")
+    path = fill_backtrack(initial_puzzle, visited, 1, max_depth, counts)
+    if stats:
+        info.count(*counts)
+    return finish(path, info, stats)
 
 
-def fill_backtrack(puzzle, visited, num, max_depth):
+def fill_backtrack(puzzle, visited, num, max_depth, counts):
     if puzzle.depth > max_depth:
         return None
 
     state_tuple = tuple(tuple(row) for row in puzzle.state)
     if state_tuple in visited:
+        counts[2] += 1
         return None
     visited.add(state_tuple)
+    if puzzle.depth >= counts[3]:
+        counts[3] = puzzle.depth + 1
 
     if puzzle.is_goal():
         return puzzle.get_path()
@@ -89,12 +102,14 @@ def fill_backtrack(puzzle, visited, num, max_depth):
         return None
 
     bi, bj = next_blank
+    counts[0] += 1
 
-    for value in range(1, 9):
+    for value in range(1, puzzle.rows * puzzle.cols):
+        counts[1] += 1
         new_state = copy.deepcopy(puzzle.state)
         new_state[bi][bj] = value
         next_puzzle = Puzzle(new_state, parent=puzzle, depth=puzzle.depth + 1)
-        result = fill_backtrack(next_puzzle, visited, num + 1, max_depth)
+        result = fill_backtrack(next_puzzle, visited, num + 1, max_depth, counts)
         if result:
             return result
 
@@ -103,20 +118,29 @@ def fill_backtrack(puzzle, visited, num, max_depth):
 
 
 # Backtracking with Forward Checking Algorithm
-def forward_checking_fill(initial_state, max_depth=1000):
+def forward_checking_fill(initial_state, max_depth=1000, stats=False):
+    info = SearchStats("forward_checking_fill")
     initial_puzzle = Puzzle(initial_state)
     visited = set()
-    return fill_forward_check(initial_puzzle, visited, 1, max_depth)
+    counts = [0, 0, 0, 0]
+    info.mark("setup")
+    path = fill_forward_check(initial_puzzle, visited, 1, max_depth, counts)
+    if stats:
+        info.count(*counts)
+    return finish(path, info, stats)
 
 
-def fill_forward_check(puzzle, visited, num, max_depth):
+def fill_forward_check(puzzle, visited, num, max_depth, counts):
     if puzzle.depth > max_depth:
         return None
 
     state_tuple = tuple(tuple(row) for row in puzzle.state)
     if state_tuple in visited:
+        counts[2] += 1
         return None
     visited.add(state_tuple)
+    if puzzle.depth >= counts[3]:
+        counts[3] = puzzle.depth + 1
 
     if puzzle.is_goal():
         return puzzle.get_path()
@@ -126,30 +150,41 @@ def fill_forward_check(puzzle, visited, num, max_depth):
         return None
 
     bi, bj = next_blank
+    counts[0] += 1
 
-    for value in range(1, 9):
+    for value in range(1, puzzle.rows * puzzle.cols):
+        counts[1] += 1
         # Forward Checking
         if puzzle.forward_checking(value):
             new_state = copy.deepcopy(puzzle.state)
             new_state[bi][bj] = value
             next_puzzle = Puzzle(new_state, parent=puzzle, depth=puzzle.depth + 1)
-            result = fill_forward_check(next_puzzle, visited, num + 1, max_depth)
+            result = fill_forward_check(next_puzzle, visited, num + 1, max_depth, counts)
             if result:
                 return result
+        else:
+            counts[2] += 1
 
     visited.remove(state_tuple)
     return None
 
 
 # Min-Conflict Local Search Algorithm
-def min_conflict_fill(initial_state, max_steps=1000):
+def min_conflict_fill(initial_state, max_steps=1000, stats=False):
+    # expanded = số bước, generated = số giá trị đã tính xung đột; đếm bằng biến cục bộ, gom vào info khi stats=True
+    info = SearchStats("min_conflict_fill")
     puzzle = Puzzle(initial_state)
+    info.mark("setup")
+    expanded = generated = 0
 
+    path = []
     for _ in range(max_steps):
         if puzzle.is_goal():
-            return puzzle.get_path()
+            path = puzzle.get_path()
+            break
+        expanded += 1
 
-        blank_positions = [(i, j) for i in range(3) for j in range(3) if puzzle.state[i][j] == 0]
+        blank_positions = [(i, j) for i in range(puzzle.rows) for j in range(puzzle.cols) if puzzle.state[i][j] == 0]
         if not blank_positions:
             break
 
@@ -158,7 +193,9 @@ def min_conflict_fill(initial_state, max_steps=1000):
         min_conflicts = float('inf')
         best_value = None
 
-        for value in puzzle.get_domain():
+        domain = puzzle.get_domain()
+        generated += len(domain)
+        for value in domain:
             conflict_count = puzzle.conflict_difference(bi, bj, value)
             if conflict_count < min_conflicts:
                 min_conflicts = conflict_count
@@ -166,7 +203,9 @@ def min_conflict_fill(initial_state, max_steps=1000):
 
         puzzle.state[bi][bj] = best_value
 
-    return []
+    if stats:
+        info.count(expanded, generated)
+    return finish(path, info, stats)
 
 
 # Example usage
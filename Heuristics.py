@@ -0,0 +1,308 @@
+import random, timeit
+from collections import deque
+from BoardEncoding import codec
+
+# ======= HEURISTICS ======= #
+#
+# Các hàm heuristic nhận trạng thái đã mã hoá (code) và được chọn theo tên,
+# để mọi thuật toán có thông tin dùng chung một cách chọn heuristic.
+#
+# Ngoài h = heuristic(code), mỗi heuristic hỗ trợ cập nhật tăng dần:
+#   h, key = heuristic.evaluate(code)              -- một lần cho nút gốc
+#   h, key = heuristic.update(key, code, child)    -- cho nút con, chỉ dựa vào ô vừa di chuyển
+# key là dữ liệu phụ nút phải mang theo (với Manhattan / linear conflict thì key chính là h).
+
+HEURISTICS = {}
+_instances = {}
+
+
+def register_heuristic(name, factory):
+    # factory(codec) trả về heuristic cho một kích thước bàn cờ, chỉ gọi khi cần (vd. PDB phải nạp file)
+    HEURISTICS[name] = factory
+    for key in [key for key in _instances if key[0] == name]:
+        del _instances[key]
+
+
+class Heuristic:
+    key_is_h = True
+
+    def evaluate(self, code):
+        h = self(code)
+        return h, h
+
+    def update(self, key, code, child):
+        h = self(child)
+        return h, h
+
+
+class FunctionHeuristic(Heuristic):
+    # Bọc một hàm bất kỳ: không cập nhật tăng dần được nên tính lại toàn bộ
+    def __init__(self, function):
+        self.function = function
+
+    def __call__(self, code):
+        return self.function(code)
+
+
+class Manhattan(Heuristic):
+    def __init__(self, codec=codec):
+        self.codec = codec
+        self.distance = codec.distance
+
+    def __call__(self, code):
+        return self.codec.manhattan(code)
+
+    def update(self, key, code, child):
+        tile, source, target = self.codec.moved_tile(code, child)
+        h = key + self.distance[target][tile] - self.distance[source][tile]
+        return h, h
+
+
+def target_positions(target, codec=codec):
+    # positions[tile] = vị trí của tile trong trạng thái target
+    positions = [0] * codec.size
+    for pos in range(codec.size):
+        positions[codec.tile_at(target, pos)] = pos
+    return positions
+
+
+class ManhattanTo(Manhattan):
+    # Manhattan tới một trạng thái bất kỳ (vd. trạng thái đầu, cho hướng tìm ngược)
+    def __init__(self, target, codec=codec):
+        self.codec = codec
+        positions = target_positions(target, codec)
+        self.distance = []
+        for pos in range(codec.size):
+            pi, pj = divmod(pos, codec.cols)
+            row = [0] * codec.size
+            for tile in range(1, codec.size):
+                ti, tj = divmod(positions[tile], codec.cols)
+                row[tile] = abs(pi - ti) + abs(pj - tj)
+            self.distance.append(row)
+
+    def __call__(self, code):
+        distance, bits, mask = self.distance, self.codec.bits, self.codec.mask
+        total = 0
+        for pos in range(self.codec.size):
+            total += distance[pos][code & mask]
+            code >>= bits
+        return total
+
+
+def get_heuristic(heuristic="manhattan", codec=codec):
+    if isinstance(heuristic, Heuristic):
+        return heuristic
+    if callable(heuristic):
+        return FunctionHeuristic(heuristic)
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"Không hỗ trợ heuristic: {heuristic}")
+    key = (heuristic, codec.rows, codec.cols)
+    if key not in _instances:
+        _instances[key] = HEURISTICS[heuristic](codec)
+    return _instances[key]
+
+
+def _conflict_penalty(goal_lines):
+    # 2 * (số ô phải rời khỏi hàng/cột) = 2 * (n - độ dài dãy con tăng dài nhất)
+    longest = [1] * len(goal_lines)
+    for i in range(len(goal_lines)):
+        for j in range(i):
+            if goal_lines[j] < goal_lines[i]:
+                longest[i] = max(longest[i], longest[j] + 1)
+    return 2 * (len(goal_lines) - max(longest, default=0))
+
+
+class _LineTable(dict):
+    # Bảng phạt của một hàng / cột theo nội dung đóng gói, điền dần khi gặp khoá mới
+    # (bảng đầy đủ 2^(bits*cols) phần tử quá lớn với 24-puzzle)
+    def __init__(self, codec, length, line, by_row, positions):
+        super().__init__()
+        self.codec, self.length, self.line, self.by_row = codec, length, line, by_row
+        self.positions = positions
+
+    def __missing__(self, key):
+        codec, cols, positions = self.codec, self.codec.cols, self.positions
+        tiles = [(key >> (codec.bits * j)) & codec.mask for j in range(self.length)]
+        tiles = [t for t in tiles if 0 < t < codec.size]
+        if self.by_row:
+            goals = [positions[t] % cols for t in tiles if positions[t] // cols == self.line]
+        else:
+            goals = [positions[t] // cols for t in tiles if positions[t] % cols == self.line]
+        penalty = self[key] = _conflict_penalty(goals)
+        return penalty
+
+
+class LinearConflict(Heuristic):
+    # Manhattan + xung đột tuyến tính. Bảng tra theo nội dung đóng gói của từng hàng / cột.
+    # target: tính tới trạng thái bất kỳ thay cho đích (hướng ngược của bidirectional A*)
+    def __init__(self, codec=codec, target=None):
+        self.codec = codec
+        rows, cols, bits = codec.rows, codec.cols, codec.bits
+        if target is None:
+            self.manhattan = Manhattan(codec)
+            positions = [tile - 1 if tile else codec.size - 1 for tile in range(codec.size)]
+        else:
+            self.manhattan = ManhattanTo(target, codec)
+            positions = target_positions(target, codec)
+        self.row_mask = (1 << (bits * cols)) - 1
+        self.row_tables = [_LineTable(codec, cols, r, True, positions) for r in range(rows)]
+        self.col_tables = [_LineTable(codec, rows, c, False, positions) for c in range(cols)]
+
+    def row_penalty(self, code, r):
+        return self.row_tables[r][(code >> (self.codec.bits * self.codec.cols * r)) & self.row_mask]
+
+    def col_penalty(self, code, c):
+        bits, mask = self.codec.bits, self.codec.mask
+        row_bits = bits * self.codec.cols
+        key = 0
+        column = code >> (bits * c)
+        for i in range(self.codec.rows):
+            key |= (column & mask) << (bits * i)
+            column >>= row_bits
+        return self.col_tables[c][key]
+
+    def __call__(self, code):
+        total = self.manhattan(code)
+        for r in range(self.codec.rows):
+            total += self.row_penalty(code, r)
+        for c in range(self.codec.cols):
+            total += self.col_penalty(code, c)
+        return total
+
+    def update(self, key, code, child):
+        # Đi ngang chỉ đổi xung đột của 2 cột liên quan, đi dọc chỉ đổi của 2 hàng
+        tile, source, target = self.codec.moved_tile(code, child)
+        distance = self.manhattan.distance
+        h = key + distance[target][tile] - distance[source][tile]
+        cols = self.codec.cols
+        source_row, source_col = divmod(source, cols)
+        target_row, target_col = divmod(target, cols)
+        if source_row == target_row:
+            for c in (source_col, target_col):
+                h += self.col_penalty(child, c) - self.col_penalty(code, c)
+        else:
+            for r in (source_row, target_row):
+                h += self.row_penalty(child, r) - self.row_penalty(code, r)
+        return h, h
+
+
+def _walking_table(lines, length):
+    # BFS trên ma trận count[line][goal_line] (số ô đang ở line có đích ở goal_line),
+    # mỗi bước: một ô từ line kề chuyển vào line đang có ô trống
+    base = length + 1
+    def key_of(matrix):
+        key = 0
+        for line in matrix:
+            for count in line:
+                key = key * base + count
+        return key
+
+    goal = [[length if i == j else 0 for j in range(lines)] for i in range(lines)]
+    goal[lines - 1][lines - 1] = length - 1
+    distances = {key_of(goal): 0}
+    queue = deque([(goal, lines - 1)])
+    while queue:
+        matrix, blank = queue.popleft()
+        d = distances[key_of(matrix)]
+        for other in (blank - 1, blank + 1):
+            if 0 <= other < lines:
+                for g in range(lines):
+                    if matrix[other][g]:
+                        moved = [line[:] for line in matrix]
+                        moved[other][g] -= 1
+                        moved[blank][g] += 1
+                        key = key_of(moved)
+                        if key not in distances:
+                            distances[key] = d + 1
+                            queue.append((moved, other))
+    return distances
+
+
+class WalkingDistance(Heuristic):
+    # Khoảng cách đi bộ (Takahashi): WD theo hàng + WD theo cột, mỗi phần một lần tra bảng.
+    # weights[pos][tile] cộng dồn thành khoá của ma trận đếm, cùng thứ tự với _walking_table
+    def __init__(self, codec=codec):
+        self.codec = codec
+        rows, cols, size = codec.rows, codec.cols, codec.size
+        self.row_distances = _walking_table(rows, cols)
+        self.col_distances = _walking_table(cols, rows)
+        self.row_weights = []
+        self.col_weights = []
+        for pos in range(size):
+            r, c = divmod(pos, cols)
+            row_weight = [0] * size
+            col_weight = [0] * size
+            for tile in range(1, size):
+                gr, gc = divmod(tile - 1, cols)
+                row_weight[tile] = (cols + 1) ** (rows * rows - 1 - (r * rows + gr))
+                col_weight[tile] = (rows + 1) ** (cols * cols - 1 - (c * cols + gc))
+            self.row_weights.append(row_weight)
+            self.col_weights.append(col_weight)
+
+    key_is_h = False
+
+    def evaluate(self, code):
+        bits, mask = self.codec.bits, self.codec.mask
+        row_key = col_key = 0
+        for row_weight, col_weight in zip(self.row_weights, self.col_weights):
+            tile = code & mask
+            row_key += row_weight[tile]
+            col_key += col_weight[tile]
+            code >>= bits
+        return self.row_distances[row_key] + self.col_distances[col_key], (row_key, col_key)
+
+    def __call__(self, code):
+        return self.evaluate(code)[0]
+
+    def update(self, key, code, child):
+        tile, source, target = self.codec.moved_tile(code, child)
+        row_key, col_key = key
+        row_key += self.row_weights[target][tile] - self.row_weights[source][tile]
+        col_key += self.col_weights[target][tile] - self.col_weights[source][tile]
+        return self.row_distances[row_key] + self.col_distances[col_key], (row_key, col_key)
+
+
+def _pdb(codec):
+    from PatternDatabase import PatternDatabase
+    return PatternDatabase(codec=codec)
+
+
+def _distance(codec):
+    # Khoảng cách chính xác từ cơ sở dữ liệu (heuristic hoàn hảo), chỉ cho bàn nhỏ
+    from DistanceDatabase import get_database
+    return FunctionHeuristic(get_database(codec).distance)
+
+
+register_heuristic("manhattan", Manhattan)
+register_heuristic("pdb", _pdb)
+register_heuristic("linear_conflict", LinearConflict)
+register_heuristic("walking_distance", WalkingDistance)
+register_heuristic("distance", _distance)
+
+
+if __name__ == "__main__":
+    from PermutationRank import ranker
+    from ObservableEnvironmet import astar, ida_star, beam_search
+
+    rng = random.Random(8)
+    instances = [codec.decode(ranker.unrank(rng.randrange(ranker.size))) for _ in range(20)]
+
+    for algorithm in [astar, ida_star, beam_search]:
+        print(f"== {algorithm.__name__} trên {len(instances)} trạng thái ngẫu nhiên ==")
+        for name in ["manhattan", "linear_conflict", "walking_distance", "pdb"]:
+            heuristic = get_heuristic(name)
+            calls = [0]
+            def counted(code, heuristic=heuristic):
+                calls[0] += 1
+                return heuristic(code)
+            steps = 0
+            start_time = timeit.default_timer()
+            for state in instances:
+                steps += len(algorithm(state, heuristic=counted)) - 1
+            end_time = timeit.default_timer()
+            # Chạy lại với heuristic theo tên để dùng cập nhật tăng dần
+            start_incremental = timeit.default_timer()
+            for state in instances:
+                algorithm(state, heuristic=name)
+            end_incremental = timeit.default_timer()
+            print(f"{name:>17}: số lần đánh giá = {calls[0]:>8}, tổng số bước = {steps}, thời gian = {(end_time - start_time):.5f} giây, tăng dần = {(end_incremental - start_incremental):.5f} giây")
@@ -0,0 +1,221 @@
+import timeit
+from BoardEncoding import codec_for, get_codec
+from PermutationRank import get_ranker
+from Heuristics import get_heuristic
+from Checkpoint import read_snapshot, pack_codes, unpack_codes, pack_numbers, unpack_numbers
+
+# ======= IDA* ENGINE ======= #
+#
+# IDA* lặp (không đệ quy) trên một bàn cờ duy nhất: đi một bước thì đổi chỗ 2 ô (make),
+# quay lui thì đổi lại (unmake). Mọi mảng theo độ sâu được cấp phát sẵn và dùng lại.
+#   - bỏ nước đi ngược với nước vừa đi
+#   - bảng chuyển vị giới hạn kích thước: code -> (lượt lặp, g nhỏ nhất đã gặp),
+#     giữ nguyên qua các lượt, chỉ các mục cùng lượt mới dùng để cắt nhánh
+#   - iterations: [(ngưỡng, số nút mở rộng), ...]; generated / duplicates (bị bảng chuyển vị cắt)
+#     cộng dồn mọi lượt, peak_frontier là độ sâu ngăn xếp lớn nhất
+#   - checkpoint: lưu ngưỡng, lượt, ngăn xếp (code, con trỏ, hướng đi) và bảng chuyển vị;
+#     IDAStar.resume(path) chạy tiếp đúng từ nút đang xét của lượt đó
+
+INFINITY = float('inf')
+# Mục bảng chuyển vị: (lượt << G_BITS) | g; 32 bit để g sâu (4x4, 5x5) không tràn sang trường lượt
+G_BITS = 32
+
+
+class IDAStar:
+    def __init__(self, start_state, heuristic="manhattan", codec=None, table_size=1 << 20, checkpoint=None):
+        if checkpoint is not None and not isinstance(heuristic, str):
+            raise ValueError("Checkpoint cần heuristic theo tên để chạy tiếp được")
+        codec = self.codec = codec or codec_for(start_state)
+        self.h = get_heuristic(heuristic, codec)
+        self.heuristic = heuristic
+        self.start = codec.encode(start_state)
+        self.board = [value for row in start_state for value in row]
+        self.table_size = table_size
+        self.table = {}
+        self.iterations = []
+        self.solution = None
+        self.checkpoint = checkpoint
+        self.generated = self.duplicates = 0
+        self.codes = [0]
+        # (ngưỡng, lượt, ngưỡng kế, số nút, độ sâu) khi chạy tiếp từ checkpoint
+        self.resumed = None
+
+    def search(self, threshold, iteration):
+        codec, h, board, table = self.codec, self.h, self.board, self.table
+        moves, blank_shift, goal = codec.moves, codec.blank_shift, codec.goal
+        stamp = iteration << G_BITS
+        table_size = self.table_size
+        checkpoint = self.checkpoint
+
+        # Mảng theo độ sâu, dùng lại cho cả lượt lặp
+        codes, keys, cursors, directions = self.codes, self.keys, self.cursors, self.directions
+        if self.resumed:
+            _, _, next_threshold, nodes, depth = self.resumed
+            self.resumed = None
+        else:
+            if len(table) >= table_size:
+                table.clear()
+            codes[0] = self.start
+            keys[0] = self.h.evaluate(self.start)[1]
+            cursors[0] = 0
+            directions[0] = -1
+            depth = 0
+            nodes = 0
+            next_threshold = INFINITY
+        generated, duplicates = self.generated, self.duplicates
+        if checkpoint:
+            checkpoint.start(nodes)
+        next_at = checkpoint.next_at if checkpoint else INFINITY
+
+        while depth >= 0:
+            if nodes >= next_at:
+                if checkpoint.poll(nodes):
+                    self.generated, self.duplicates = generated, duplicates
+                    checkpoint.save("ida_star", lambda: self.snapshot(threshold, iteration, next_threshold, nodes, depth), nodes)
+                next_at = checkpoint.next_at
+            code = codes[depth]
+            options = moves[code >> blank_shift]
+            i = cursors[depth]
+            if i == len(options):
+                # unmake: trả ô về chỗ cũ rồi lùi một mức
+                if depth > 0:
+                    b = codes[depth - 1] >> blank_shift
+                    nb = code >> blank_shift
+                    board[nb], board[b] = board[b], 0
+                depth -= 1
+                continue
+            cursors[depth] = i + 1
+            direction, nb, _, tile_delta, blank_delta = options[i]
+            if direction == directions[depth] ^ 1:
+                continue
+
+            tile = board[nb]
+            child = code + tile * tile_delta + blank_delta
+            generated += 1
+            g = depth + 1
+            child_h, child_key = h.update(keys[depth], code, child)
+            f = g + child_h
+            if f > threshold:
+                if f < next_threshold:
+                    next_threshold = f
+                continue
+
+            seen = table.get(child)
+            if seen is not None and seen >> G_BITS == iteration and seen - stamp <= g:
+                duplicates += 1
+                continue
+            if seen is not None or len(table) < table_size:
+                table[child] = stamp | g
+
+            # make
+            b = code >> blank_shift
+            board[b], board[nb] = tile, 0
+            nodes += 1
+            depth = g
+            if depth == len(codes):
+                codes.append(0); keys.append(None); cursors.append(0); directions.append(-1)
+            codes[depth] = child
+            keys[depth] = child_key
+            cursors[depth] = 0
+            directions[depth] = direction
+            if child == goal:
+                self.iterations.append((threshold, nodes))
+                self.generated, self.duplicates = generated, duplicates
+                return codes[:depth + 1], next_threshold
+
+        self.iterations.append((threshold, nodes))
+        self.generated, self.duplicates = generated, duplicates
+        return None, next_threshold
+
+    def solve(self):
+        if self.resumed:
+            threshold, iteration = self.resumed[:2]
+        else:
+            self.codes, self.keys, self.cursors, self.directions = [0], [None], [0], [-1]
+            if self.start == self.codec.goal:
+                self.solution = [self.start]
+                return [self.codec.decode(self.start)]
+            # Bàn không giải được: ngưỡng tăng mãi, phải dừng trước vòng lặp
+            if not get_ranker(self.codec).is_solvable(self.start):
+                return []
+            threshold = self.h(self.start)
+            iteration = 1
+        while threshold < INFINITY:
+            path, threshold = self.search(threshold, iteration)
+            iteration += 1
+            if path:
+                self.solution = path
+                return [self.codec.decode(code) for code in path]
+        return []
+
+    @property
+    def expanded(self):
+        return sum(nodes for _, nodes in self.iterations)
+
+    @property
+    def peak_frontier(self):
+        return len(self.codes)
+
+    def snapshot(self, threshold, iteration, next_threshold, nodes, depth):
+        meta = {"rows": self.codec.rows, "cols": self.codec.cols, "start": self.start, "heuristic": self.heuristic,
+                "table_size": self.table_size, "threshold": threshold, "iteration": iteration,
+                "next_threshold": next_threshold, "nodes": nodes, "depth": depth, "iterations": self.iterations,
+                "generated": self.generated, "duplicates": self.duplicates, "g_bits": G_BITS}
+        sections = {"stack": pack_codes(self.codes[:depth + 1]),
+                    "stack.cursors": pack_numbers(self.cursors[:depth + 1], 'B'),
+                    "stack.directions": pack_numbers(self.directions[:depth + 1], 'b'),
+                    "table.keys": pack_codes(self.table.keys()),
+                    "table": pack_numbers(self.table.values(), 'Q')}
+        return meta, sections
+
+    @classmethod
+    def resume(cls, path, checkpoint=None):
+        meta, sections = read_snapshot(path, "ida_star")
+        codec = get_codec(meta["rows"], meta["cols"])
+        depth = meta["depth"]
+        codes = unpack_codes(sections["stack"])
+        search = cls(codec.decode(codes[depth]), meta["heuristic"], codec, meta["table_size"], checkpoint)
+        # Bàn cờ make/unmake đang ở trạng thái của đỉnh ngăn xếp
+        search.start = meta["start"]
+        search.iterations = [tuple(item) for item in meta["iterations"]]
+        search.generated, search.duplicates = meta["generated"], meta["duplicates"]
+        search.table = dict(zip(unpack_codes(sections["table.keys"]), unpack_numbers(sections["table"], 'Q')))
+        # Checkpoint cũ đóng gói g vào 8 bit
+        g_bits = meta.get("g_bits", 8)
+        if g_bits != G_BITS:
+            mask = (1 << g_bits) - 1
+            search.table = {code: (seen >> g_bits) << G_BITS | (seen & mask) for code, seen in search.table.items()}
+        search.codes = codes
+        search.cursors = list(unpack_numbers(sections["stack.cursors"], 'B'))
+        search.directions = list(unpack_numbers(sections["stack.directions"], 'b'))
+        search.keys = [search.h.evaluate(code)[1] for code in codes]
+        search.resumed = (meta["threshold"], meta["iteration"], meta["next_threshold"], meta["nodes"], depth)
+        return search
+
+
+if __name__ == "__main__":
+    # Hai trạng thái khó nhất của 8-puzzle (31 bước)
+    for initial_state in [[[8, 6, 7], [2, 5, 4], [3, 0, 1]], [[6, 4, 7], [8, 5, 0], [3, 2, 1]]]:
+        for name in ["manhattan", "linear_conflict", "walking_distance", "pdb", "distance"]:
+            engine = IDAStar(initial_state, name)
+            start_time = timeit.default_timer()
+            path = engine.solve()
+            end_time = timeit.default_timer()
+            print(f"{name:>17}: số bước = {len(path) - 1}, thời gian = {(end_time - start_time):.5f} giây")
+            print("    (ngưỡng, số nút):", engine.iterations)
+
+    initial_state = [[1, 2, 7, 3], [14, 13, 9, 4], [5, 8, 15, 10], [12, 0, 11, 6]]
+    engine = IDAStar(initial_state)
+    start_time = timeit.default_timer()
+    path = engine.solve()
+    end_time = timeit.default_timer()
+    print(f"15-puzzle: số bước = {len(path) - 1}, thời gian = {(end_time - start_time):.5f} giây")
+    print("    (ngưỡng, số nút):", engine.iterations)
+
+    # Bàn không giải được: trả về [] ngay thay vì tăng ngưỡng mãi
+    initial_state = [[1, 2, 3], [4, 5, 6], [8, 7, 0]]
+    start_time = timeit.default_timer()
+    path = IDAStar(initial_state).solve()
+    end_time = timeit.default_timer()
+    assert path == []
+    print(f"không giải được: {path}, thời gian = {(end_time - start_time):.5f} giây")
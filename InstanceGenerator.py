@@ -0,0 +1,198 @@
+import sys, json, random, argparse
+from BoardEncoding import get_codec, inverse_direction
+from PermutationRank import get_ranker
+
+# ======= INSTANCE GENERATOR ======= #
+#
+# Sinh trạng thái đầu cho benchmark / thử tải, thay cho shuffle_state (đi ngẫu nhiên thì lệch về
+# các trạng thái nông, dễ giải).
+#   - uniform_states: đều trên mọi trạng thái giải được, bằng cách unrank một rank ngẫu nhiên
+#     (Ranker đánh số đúng n!/2 trạng thái giải được nên không cần loại bỏ)
+#   - is_solvable: tính chẵn lẻ số nghịch thế bằng cây Fenwick, O(n log n); check_state báo lỗi sớm
+#     với đầu vào không phải hoán vị hoặc không giải được
+#   - states_at_depth: đều trên các trạng thái có số bước tối ưu đúng bằng depth. Bàn nhỏ tra cơ sở
+#     dữ liệu khoảng cách; bàn lớn đi ngẫu nhiên depth bước rồi giữ lại nếu IDA* xác nhận đúng depth
+#   - write_jsonl / read_jsonl: mỗi dòng một trạng thái, sinh tới đâu ghi tới đó nên hàng triệu
+#     trạng thái cũng không phải giữ trong bộ nhớ
+#
+#   python InstanceGenerator.py uniform --count 1000000 --output uniform.jsonl
+#   python InstanceGenerator.py depth 20 --count 100 --rows 3 --cols 3
+#   python InstanceGenerator.py check "2 6 5 0 8 7 4 3 1"
+
+
+def inversion_parity(values):
+    # Chẵn lẻ số cặp (i < j, values[i] > values[j]); values là các số 1..n khác nhau
+    size = len(values) + 1
+    tree = [0] * (size + 1)
+    inversions = 0
+    for seen, value in enumerate(values):
+        # Số phần tử đã gặp <= value
+        count, i = 0, value
+        while i > 0:
+            count += tree[i]
+            i -= i & -i
+        inversions += seen - count
+        i = value
+        while i <= size:
+            tree[i] += 1
+            i += i & -i
+    return inversions & 1
+
+
+def is_solvable(state):
+    # Cùng quy tắc với Ranker.required_parity: số cột lẻ thì số nghịch thế chẵn; số cột chẵn thì
+    # cộng thêm số hàng từ ô trống tới hàng cuối
+    rows, cols = len(state), len(state[0])
+    flat = [tile for row in state for tile in row]
+    parity = inversion_parity([tile for tile in flat if tile])
+    if cols % 2 == 0:
+        parity ^= (rows - 1 - flat.index(0) // cols) & 1
+    return parity == 0
+
+
+def check_state(state):
+    # Báo lỗi sớm, trước khi thuật toán chạy hết không gian trạng thái mà không tìm được lời giải
+    rows, cols = len(state), len(state[0]) if state else 0
+    flat = [tile for row in state for tile in row]
+    if not rows or any(len(row) != cols for row in state) or sorted(flat) != list(range(rows * cols)):
+        raise ValueError(f"Trạng thái không hợp lệ: {state}")
+    if not is_solvable(state):
+        raise ValueError(f"Trạng thái không giải được: {state}")
+    return state
+
+
+def random_state(rows=3, cols=3, rng=random):
+    codec = get_codec(rows, cols)
+    ranker = get_ranker(codec)
+    return codec.decode(ranker.unrank(rng.randrange(ranker.size)))
+
+
+def uniform_states(count=None, rows=3, cols=3, seed=None):
+    # count = None: sinh mãi
+    rng = random.Random(seed)
+    codec = get_codec(rows, cols)
+    ranker = get_ranker(codec)
+    generated = 0
+    while count is None or generated < count:
+        yield codec.decode(ranker.unrank(rng.randrange(ranker.size)))
+        generated += 1
+
+
+def ranks_at_depth(table, depth):
+    # Quét bảng khoảng cách bằng find (chạy trong C) thay vì vòng lặp Python trên từng rank
+    ranks = []
+    target = bytes([depth])
+    position = table.find(target)
+    while position != -1:
+        ranks.append(position)
+        position = table.find(target, position + 1)
+    return ranks
+
+
+def states_at_depth(depth, count=None, rows=3, cols=3, seed=None, max_tries=None):
+    rng = random.Random(seed)
+    codec = get_codec(rows, cols)
+    ranker = get_ranker(codec)
+    generated = 0
+    if ranker.dense:
+        from DistanceDatabase import get_database
+        ranks = ranks_at_depth(get_database(codec).table, depth)
+        if not ranks:
+            raise ValueError(f"Không có trạng thái {rows}x{cols} nào cần đúng {depth} bước")
+        while count is None or generated < count:
+            yield codec.decode(ranker.unrank(rng.choice(ranks)))
+            generated += 1
+        return
+
+    from IDAStar import IDAStar
+    from PatternDatabase import DEFAULT_PARTITIONS
+    heuristic = "pdb" if (rows, cols) in DEFAULT_PARTITIONS else "linear_conflict"
+    tries = 0
+    while count is None or generated < count:
+        if max_tries is not None and tries >= max_tries:
+            raise RuntimeError(f"Không tìm đủ trạng thái {depth} bước sau {tries} lần thử")
+        tries += 1
+        code, last = codec.goal, -1
+        for _ in range(depth):
+            options = [(direction, child) for direction, child in codec.successors(code) if direction != inverse_direction(last)]
+            last, code = rng.choice(options)
+        state = codec.decode(code)
+        if len(IDAStar(state, heuristic).solve()) - 1 == depth:
+            yield state
+            generated += 1
+
+
+def write_jsonl(states, f, depth=None, label=None):
+    # label(state) -> số bước tối ưu (tuỳ chọn); trả về số dòng đã ghi
+    count = 0
+    for count, state in enumerate(states, 1):
+        record = {"id": count - 1, "state": state}
+        if depth is not None:
+            record["depth"] = depth
+        elif label is not None:
+            record["depth"] = label(state)
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    return count
+
+
+def read_jsonl(f):
+    # Đọc lần lượt từng dòng: (bản ghi, trạng thái)
+    for line in f:
+        line = line.strip()
+        if line:
+            record = json.loads(line)
+            yield record, record["state"]
+
+
+def main(argv=None):
+    from Algorithms import parse_state
+
+    parser = argparse.ArgumentParser(description="Sinh trạng thái đầu giải được, ghi ra JSONL")
+    commands = parser.add_subparsers(dest="command", required=True)
+    uniform = commands.add_parser("uniform", help="đều trên mọi trạng thái giải được")
+    at_depth = commands.add_parser("depth", help="đều trên các trạng thái có số bước tối ưu cho trước")
+    at_depth.add_argument("depth", type=int)
+    for command in (uniform, at_depth):
+        command.add_argument("--count", type=int, default=10)
+        command.add_argument("--rows", type=int, default=3)
+        command.add_argument("--cols", type=int, default=3)
+        command.add_argument("--seed", type=int)
+        command.add_argument("--output", help="file JSONL (mặc định in ra màn hình)")
+    uniform.add_argument("--label-depth", action="store_true", help="ghi thêm số bước tối ưu (chỉ bàn nhỏ)")
+    check = commands.add_parser("check", help="kiểm tra một trạng thái có giải được không")
+    check.add_argument("state")
+    check.add_argument("--rows", type=int)
+    check.add_argument("--cols", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == "check":
+        try:
+            check_state(parse_state(args.state, args.rows, args.cols))
+        except ValueError as error:
+            print(error)
+            return 1
+        print("Giải được")
+        return 0
+
+    f = open(args.output, "w") if args.output else sys.stdout
+    try:
+        if args.command == "uniform":
+            label = None
+            if args.label_depth:
+                from DistanceDatabase import get_database
+                codec = get_codec(args.rows, args.cols)
+                database = get_database(codec)
+                label = lambda state: database.distance(codec.encode(state))
+            count = write_jsonl(uniform_states(args.count, args.rows, args.cols, args.seed), f, label=label)
+        else:
+            count = write_jsonl(states_at_depth(args.depth, args.count, args.rows, args.cols, args.seed), f, depth=args.depth)
+    finally:
+        if args.output:
+            f.close()
+    if args.output:
+        print(f"Đã ghi {count} trạng thái vào {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
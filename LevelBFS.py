@@ -0,0 +1,207 @@
+import sys, timeit
+from array import array
+from BoardEncoding import codec_for, get_codec
+from PermutationRank import get_ranker
+from Checkpoint import read_snapshot, pack_codes, unpack_codes, pack_table, unpack_table, pack_visited, unpack_visited
+
+# ======= LEVEL-SYNCHRONOUS BFS ======= #
+#
+# BFS theo tầng: mỗi tầng là một mảng code liền nhau (array 'Q' nếu code vừa 64 bit,
+# list nếu không, vd. 15-puzzle), trạng thái bị loại trùng ngay khi sinh ra.
+#   - cha lưu trong mảng hướng đi theo rank (1 byte / trạng thái) thay vì con trỏ
+#   - track_depths: dùng bảng độ sâu 1 byte theo rank làm tập đã thăm, chạy hết
+#     không gian thì chính là cơ sở dữ liệu khoảng cách
+#   - stats: [(độ sâu, số trạng thái, thời gian, byte của tầng), ...]; expanded / generated đếm
+#     số trạng thái đã mở rộng / sinh ra, trùng và tầng lớn nhất suy ra từ stats
+#   - checkpoint: lưu giữa tầng (tầng đang mở rộng, vị trí trong tầng, phần tầng mới đã sinh,
+#     tập đã thăm / bảng độ sâu, mảng hướng đi); LevelBFS.resume(path) rồi layers() chạy tiếp
+
+UNKNOWN = 255
+INFINITY = float('inf')
+
+
+class LevelBFS:
+    def __init__(self, codec, ranker=None, track_parents=True, track_depths=False, checkpoint=None):
+        self.codec = codec
+        self.ranker = ranker or get_ranker(codec)
+        self.track_parents = track_parents
+        self.track_depths = track_depths
+        self.packed = codec.blank_shift + (codec.size - 1).bit_length() <= 64
+        self.stats = []
+        self.checkpoint = checkpoint
+        self.expanded = 0
+        self.generated = 0
+        # (độ sâu, tầng, vị trí, tầng mới) khi chạy tiếp từ checkpoint
+        self.resumed = None
+
+    def new_frontier(self):
+        return array('Q') if self.packed else []
+
+    def frontier_bytes(self, frontier):
+        if self.packed:
+            return frontier.itemsize * len(frontier)
+        return sys.getsizeof(frontier) + sum(sys.getsizeof(code) for code in frontier[:1]) * len(frontier)
+
+    def layers(self, start, goal=None):
+        # Sinh (độ sâu, tầng); dừng sớm khi gặp goal (self.found = goal)
+        codec, ranker = self.codec, self.ranker
+        successors, index = codec.successors, ranker.index
+        checkpoint = self.checkpoint
+        if self.resumed:
+            depth, frontier, position, next_frontier = self.resumed
+            self.resumed = None
+            if self.track_depths:
+                depths = self.depths
+            else:
+                visited = self.visited
+            if self.track_parents:
+                parent_moves = self.parent_moves
+        else:
+            self.stats = []
+            self.found = None
+            self.expanded = 0
+            self.generated = 0
+            if self.track_depths:
+                self.depths = depths = ranker.new_table(UNKNOWN)
+                depths[index(start)] = 0
+            else:
+                self.visited = visited = ranker.new_visited()
+                visited.add(index(start))
+            if self.track_parents:
+                self.parent_moves = parent_moves = ranker.new_parent_moves()
+
+            frontier = self.new_frontier()
+            frontier.append(start)
+            depth = 0
+            self.stats.append((0, 1, 0.0, self.frontier_bytes(frontier)))
+            yield depth, frontier
+            if start == goal:
+                self.found = start
+                return
+            depth, position, next_frontier = 1, 0, self.new_frontier()
+        if checkpoint:
+            checkpoint.start(self.expanded)
+        next_at = checkpoint.next_at if checkpoint else INFINITY
+
+        while frontier:
+            start_time = timeit.default_timer()
+            append = next_frontier.append
+            expanded = self.expanded - position
+            generated = self.generated
+            for i in range(position, len(frontier)):
+                if expanded + i >= next_at:
+                    self.expanded = expanded + i
+                    self.generated = generated
+                    if checkpoint.poll(self.expanded):
+                        checkpoint.save("bfs", lambda: self.snapshot(start, goal, depth, frontier, i, next_frontier), self.expanded)
+                    next_at = checkpoint.next_at
+                children = successors(frontier[i])
+                generated += len(children)
+                for direction, child in children:
+                    r = index(child)
+                    if self.track_depths:
+                        if depths[r] != UNKNOWN:
+                            continue
+                        depths[r] = depth
+                    elif not visited.add(r):
+                        continue
+                    if self.track_parents:
+                        parent_moves[r] = direction + 1
+                    append(child)
+                    if child == goal:
+                        self.found = child
+            self.expanded = expanded + len(frontier)
+            self.generated = generated
+            frontier = next_frontier
+            self.stats.append((depth, len(frontier), timeit.default_timer() - start_time, self.frontier_bytes(frontier)))
+            if frontier:
+                yield depth, frontier
+            if self.found is not None:
+                return
+            depth, position, next_frontier = depth + 1, 0, self.new_frontier()
+
+    @property
+    def duplicates(self):
+        return self.generated - sum(count for _, count, _, _ in self.stats) + 1
+
+    @property
+    def peak_frontier(self):
+        return max((count for _, count, _, _ in self.stats), default=0)
+
+    def snapshot(self, start, goal, depth, frontier, position, next_frontier):
+        codec = self.codec
+        meta = {"rows": codec.rows, "cols": codec.cols, "start": start, "goal": goal, "depth": depth, "position": position,
+                "track_parents": self.track_parents, "track_depths": self.track_depths,
+                "expanded": self.expanded, "generated": self.generated,
+                "found": self.found, "stats": self.stats}
+        sections = {"frontier": pack_codes(frontier), "next_frontier": pack_codes(next_frontier)}
+        if self.track_depths:
+            sections.update(pack_table(self.depths, "depths"))
+        else:
+            sections.update(pack_visited(self.visited, "visited"))
+        if self.track_parents:
+            sections.update(pack_table(self.parent_moves, "parent_moves"))
+        return meta, sections
+
+    @classmethod
+    def resume(cls, path, checkpoint=None):
+        # Trả về (engine, start, goal); gọi engine.layers(start, goal) để chạy tiếp
+        meta, sections = read_snapshot(path, "bfs")
+        codec = get_codec(meta["rows"], meta["cols"])
+        engine = cls(codec, track_parents=meta["track_parents"], track_depths=meta["track_depths"], checkpoint=checkpoint)
+        engine.stats = [tuple(item) for item in meta["stats"]]
+        engine.expanded = meta["expanded"]
+        engine.generated = meta["generated"]
+        engine.found = meta["found"]
+        if engine.track_depths:
+            engine.depths = unpack_table(sections, "depths", UNKNOWN)
+        else:
+            engine.visited = unpack_visited(sections, "visited")
+        if engine.track_parents:
+            engine.parent_moves = unpack_table(sections, "parent_moves", 0)
+        frontier, next_frontier = engine.new_frontier(), engine.new_frontier()
+        frontier.extend(unpack_codes(sections["frontier"]))
+        next_frontier.extend(unpack_codes(sections["next_frontier"]))
+        engine.resumed = (meta["depth"], frontier, meta["position"], next_frontier)
+        return engine, meta["start"], meta["goal"]
+
+    def search(self, start):
+        codec, ranker = self.codec, self.ranker
+        if not ranker.is_solvable(start):
+            return []
+        for _ in self.layers(start, codec.goal):
+            pass
+        if self.found is None:
+            return []
+        return ranker.path_from_moves(self.parent_moves, start, self.found)
+
+
+def state_space_layers(start_state=None, rows=3, cols=3):
+    # Số trạng thái ở từng khoảng cách tính từ start_state (mặc định là đích)
+    codec = codec_for(start_state) if start_state else get_codec(rows, cols)
+    start = codec.encode(start_state) if start_state else codec.goal
+    engine = LevelBFS(codec, track_parents=False)
+    return [len(frontier) for _, frontier in engine.layers(start)], engine.stats
+
+
+if __name__ == "__main__":
+    from ObservableEnvironmet import bfs
+
+    for rows, cols in [(3, 3), (2, 4), (3, 4)]:
+        codec = get_codec(rows, cols)
+        if not get_ranker(codec).dense:
+            continue
+        start_time = timeit.default_timer()
+        sizes, stats = state_space_layers(rows=rows, cols=cols)
+        end_time = timeit.default_timer()
+        print(f"== {rows}x{cols}: {sum(sizes)} trạng thái, {len(sizes) - 1} tầng, thời gian = {(end_time - start_time):.5f} giây, "
+              f"bitmap đã thăm = {get_ranker(codec).size / 8 / 1024:.1f} KB ==")
+        if rows * cols == 9:
+            for depth, count, seconds, size in stats:
+                print(f"  tầng {depth:>2}: {count:>6} trạng thái, {seconds * 1000:8.2f} ms, {size / 1024:8.1f} KB")
+
+    initial_state = [[8, 6, 7], [2, 5, 4], [3, 0, 1]]
+    start_time = timeit.default_timer()
+    path = bfs(initial_state)
+    end_time = timeit.default_timer()
+    print(f"bfs: số bước = {len(path) - 1}, thời gian = {(end_time - start_time):.5f} giây")
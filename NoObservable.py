@@ -1,6 +1,8 @@
 import copy
 import random
 from collections import deque
+from BoardEncoding import codec_for
+from SearchStats import SearchStats, finish
 
 class Puzzle:
     def __init__(self, state, parent=None, move=None, depth=0, node_id=None):
@@ -13,8 +15,8 @@ class Puzzle:
         self.node_id = node_id if node_id else f"{parent_id}_{str(id(self))}_{depth}"
 
     def find_blank(self):
-        for i in range(3):
-            for j in range(3):
+        for i in range(len(self.state)):
+            for j in range(len(self.state[0])):
                 if self.state[i][j] == 0:
                     return (i, j)
         return None
@@ -24,23 +26,23 @@ class Puzzle:
         bi, bj = self.blank_pos
         for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
             ni, nj = bi + di, bj + dj
-            if 0 <= ni < 3 and 0 <= nj < 3:
+            if 0 <= ni < len(self.state) and 0 <= nj < len(self.state[0]):
                 new_state = copy.deepcopy(self.state)
                 new_state[bi][bj], new_state[ni][nj] = new_state[ni][nj], new_state[bi][bj]
                 neighbors.append(Puzzle(new_state, parent=self, move=(ni, nj), depth=self.depth + 1))
         return neighbors
 
     def is_goal(self):
-        return self.state == [[1, 2, 3], [4, 5, 6], [7, 8, 0]]
+        return self.state == codec_for(self.state).goal_state
 
     def heuristic(self):
-        goal = [[1, 2, 3], [4, 5, 6], [7, 8, 0]]
+        rows, cols = len(self.state), len(self.state[0])
         distance = 0
-        for i in range(3):
-            for j in range(3):
+        for i in range(rows):
+            for j in range(cols):
                 value = self.state[i][j]
                 if value != 0:
-                    goal_i, goal_j = divmod(value - 1, 3)
+                    goal_i, goal_j = divmod(value - 1, cols)
                     distance += abs(i - goal_i) + abs(j - goal_j)
         return distance
 
@@ -66,14 +68,15 @@ def generate_belief_states(state, num_beliefs=1):
     beliefs = [state]
     for _ in range(num_beliefs):
         new_state = copy.deepcopy(state)
-        bi, bj = random.randint(0, 2), random.randint(0, 2)
-        ni, nj = random.randint(0, 2), random.randint(0, 2)
+        bi, bj = random.randrange(len(state)), random.randrange(len(state[0]))
+        ni, nj = random.randrange(len(state)), random.randrange(len(state[0]))
         new_state[bi][bj], new_state[ni][nj] = new_state[ni][nj], new_state[bi][bj]
         beliefs.append(new_state)
     return beliefs
 
 
-def bfs_no_observable(start_state, num_beliefs=1):
+def bfs_no_observable(start_state, num_beliefs=1, stats=False):
+    info = SearchStats("bfs_no_observable")
     initial_beliefs = generate_belief_states(start_state, num_beliefs)
     queue = deque()
     visited = set()
@@ -82,16 +85,25 @@ def bfs_no_observable(start_state, num_beliefs=1):
         initial_node = Puzzle(belief_state)
         queue.append(initial_node)
         visited.add(initial_node)
+    info.mark("setup")
+    expanded = generated = duplicates = 0
+    peak = len(queue)
 
     while queue:
         current = queue.popleft()
         neighbors = current.get_neighbors()
+        expanded += 1
+        generated += len(neighbors)
 
         for neighbor in neighbors:
             if neighbor not in visited:
                 visited.add(neighbor)
                 if neighbor.is_goal():
-                    return [n.state for n in neighbor.get_path()]
+                    info.count(expanded, generated, duplicates, peak)
+                    return finish([n.state for n in neighbor.get_path()], info, stats)
                 queue.append(neighbor)
+            else:
+                duplicates += 1
+        peak = max(peak, len(queue))
 
-    return []
\ No newline at end of file
+    return finish([], info.count(expanded, generated, duplicates, peak), stats)
\ No newline at end of file
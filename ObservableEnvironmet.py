@@ -1,41 +1,65 @@
 import copy
 from collections import deque
 import heapq, random, math, copy
+from BoardEncoding import codec_for
+from PermutationRank import get_ranker
+from OpenList import make_open_list
+from Heuristics import get_heuristic
+from IDAStar import IDAStar
+from BidirectionalSearch import BidirectionalBFS, BidirectionalAStar
+from SMAStar import SMAStar
+from LevelBFS import LevelBFS
+from DepthFirst import DepthFirst
+from ParallelAStar import ParallelAStar
+from AStar import AStar
+from Checkpoint import snapshot_kind
+from SearchStats import SearchStats, finish
+from InstanceGenerator import is_solvable
 
 # ======= AGENT ======= #
 
 class Puzzle:
-    def __init__(self, state, parent=None, move=None, depth=0):
-        self.state = state  
+    def __init__(self, state=None, parent=None, move=None, depth=0, code=None, codec=None):
+        self.codec = codec or codec_for(state)
+        self.code = code if code is not None else self.codec.encode(state)
         self.parent = parent
         self.move = move
         self.depth = depth
-        self.blank_pos = self.find_blank()
         self.heuristic = 0
+        self.h_key = None
+
+    @property
+    def state(self):
+        return self.codec.decode(self.code)
+
+    @property
+    def blank_pos(self):
+        return self.find_blank()
 
     def find_blank(self):
-        for i in range(3):
-            for j in range(3):
-                if self.state[i][j] == 0:
-                    return (i, j)
-                
-    def get_neighbors(self):
+        return divmod(self.codec.blank(self.code), self.codec.cols)
+
+    def evaluate(self, heuristic):
+        self.heuristic, self.h_key = heuristic.evaluate(self.code)
+        return self
+
+    def get_neighbors(self, heuristic=None):
+        # Có heuristic thì h của nút con được cập nhật từ h của nút cha
+        codec = self.codec
         neighbors = []
-        bi, bj = self.blank_pos
-        for di, dj in [(-1,0),(1,0),(0,-1),(0,1)]:
-            ni, nj = bi + di, bj + dj
-            if 0 <= ni < 3 and 0 <= nj < 3:
-                new_state = copy.deepcopy(self.state)
-                new_state[bi][bj], new_state[ni][nj] = new_state[ni][nj], new_state[bi][bj]
-                neighbors.append(Puzzle(new_state, parent=self, move=(ni, nj), depth=self.depth + 1))
+        for child in codec.neighbors(self.code):
+            neighbor = Puzzle(parent=self, move=divmod(codec.blank(child), codec.cols), depth=self.depth + 1, code=child, codec=codec)
+            if heuristic is not None:
+                neighbor.heuristic, neighbor.h_key = heuristic.update(self.h_key, self.code, child)
+            neighbors.append(neighbor)
         return neighbors
-    
+
     def is_goal(self):
-        return self.state == [[1,2,3],[4,5,6],[7,8,0]]
+        return self.code == self.codec.goal
 
     def to_tuple(self):
-        return tuple(tuple(row) for row in self.state)
-    
+        return self.code
+
     def get_path(self):
         path = []
         node = self
@@ -43,7 +67,7 @@ class Puzzle:
             path.append(node.state)
             node = node.parent
         return path[::-1]
-    
+
     def __lt__(self, other):
         return self.depth < other.depth
 
@@ -51,307 +75,410 @@ class Puzzle:
 # ======= SUPPORTED FUNCTION ======= #
 
 def manhattan_distance(state):
-    goal = {
-        1: (0, 0), 2: (0, 1), 3: (0, 2),
-        4: (1, 0), 5: (1, 1), 6: (1, 2),
-        7: (2, 0), 8: (2, 1), 0: (2, 2)
-    }
     distance = 0
-    for i in range(3):
-        for j in range(3):
+    rows, cols = len(state), len(state[0])
+    for i in range(rows):
+        for j in range(cols):
             value = state[i][j]
             if value != 0:
-                goal_i, goal_j = goal[value]
+                goal_i, goal_j = divmod(value - 1, cols)
                 distance += abs(i - goal_i) + abs(j - goal_j)
     return distance
 
 # ======= ALGORITHMS ======= #
+#
+# Mọi thuật toán nhận stats=False; stats=True trả về SearchResult (đường đi kèm .stats, SearchStats.py)
 
 # Nhóm Thuật toán tìm kiếm KHÔNG CÓ thông tin
 
-def bfs(start_state):
-    start = Puzzle(start_state)
-    visited = set()
-    queue = [start]
+def run_engine(name, engine, solve, stats):
+    # Engine tự đếm; ở đây chỉ chia thời gian khởi tạo / tìm kiếm rồi gom bộ đếm
+    info = SearchStats(name)
+    info.mark("setup")
+    path = solve()
+    return finish(path, info.absorb(engine), stats)
+
+def bfs(start_state, checkpoint=None, stats=False):
+    # BFS theo tầng, loại trùng khi sinh, cha lưu theo rank (LevelBFS.py)
+    codec = codec_for(start_state)
+    engine = LevelBFS(codec, checkpoint=checkpoint)
+    return run_engine("bfs", engine, lambda: engine.search(codec.encode(start_state)), stats)
+
+def dfs(start_state, stats=False):
+    # dfs / dls / ids dùng chung lõi make/unmake (DepthFirst.py)
+    engine = DepthFirst(start_state)
+    return run_engine("dfs", engine, engine.dfs, stats)
+
+def dls(start_state, limit = 50, stats=False):
+    engine = DepthFirst(start_state)
+    return run_engine("dls", engine, lambda: engine.dls(limit), stats)
+
+def ucs(start_state, open_list="bucket", tie_break="fifo", stats=False):
+    info = SearchStats("ucs")
+    codec = codec_for(start_state)
+    ranker = get_ranker(codec)
+    start = codec.encode(start_state)
+    parent_moves = ranker.new_parent_moves()
+    best_g = ranker.new_g_table()
+    best_g[ranker.index(start)] = 0
+    queue = make_open_list(open_list, tie_break)
+    queue.push(0, 0, start)  # (cost, cost, code)
+    info.mark("setup")
+    # size: kích thước open list (push - pop, kể cả mục cũ chờ xoá lười)
+    expanded = generated = duplicates = peak = 0
+    size = 1
     while queue:
-
-        current = queue.pop(0)
-        if current.is_goal():
-            return current.get_path()
-        
-        visited.add(current.to_tuple())
-        for neighbor in current.get_neighbors():
-            if neighbor.to_tuple() not in visited:
-                queue.append(neighbor)
-
-    return []
-
-def dfs(start_state):
-    start = Puzzle(start_state)
-    visited = set()
-    stack = [start]
-    while stack:
-        current = stack.pop()
-        if current.is_goal():
-            return current.get_path()
-        visited.add(current.to_tuple())
-        for neighbor in reversed(current.get_neighbors()):
-            if neighbor.to_tuple() not in visited:
-                stack.append(neighbor)
-    return []
-
-def dls(start_state, limit = 50):
-    start = Puzzle(start_state)
-    visited = set()
-    stack = [start]
-    while stack:
-        current = stack.pop()
-        if current.is_goal():
-            return current.get_path()
-        visited.add(current.to_tuple())
-        if current.depth < limit:
-            for neighbor in reversed(current.get_neighbors()):
-                if neighbor.to_tuple() not in visited:
-                    stack.append(neighbor)
-    return []
-
-def ucs(start_state):
-    start = Puzzle(start_state)
-    visited = set()
-    queue = [(0, start)]  # (cost, node)
-    while queue:
-        cost, current = heapq.heappop(queue)
-        if current.is_goal():
-            return current.get_path()
-        visited.add(current.to_tuple())
-        for neighbor in current.get_neighbors():
-            if neighbor.to_tuple() not in visited:
-                heapq.heappush(queue, (neighbor.depth, neighbor))
-    return []
-
-def ids(start_state, max_depth=50):
-    def dls(node, depth, visited):
-        if node.is_goal():
-            return node.get_path()
-        if depth == 0:
-            return None
-        visited.add(node.to_tuple())
-        for neighbor in node.get_neighbors():
-            if neighbor.to_tuple() not in visited:
-                result = dls(neighbor, depth - 1, visited)
-                if result:
-                    return result
-        return None
-    
-    for depth in range(max_depth):
-        start = Puzzle(start_state)
-        visited = set()
-        result = dls(start, depth, visited)
-        if result:
-            return result
-    return []
+        if size > peak:
+            peak = size
+        _, cost, current = queue.pop()
+        size -= 1
+        if cost != best_g[ranker.index(current)]:
+            continue
+        if current == codec.goal:
+            info.count(expanded, generated, duplicates, peak).mark("search")
+            return finish(ranker.path_from_moves(parent_moves, start, current), info, stats, "path")
+        expanded += 1
+        cost += 1
+        children = codec.successors(current)
+        generated += len(children)
+        for direction, neighbor in children:
+            r = ranker.index(neighbor)
+            # Loại trùng ngay khi sinh: chỉ đưa vào khi tìm được chi phí tốt hơn
+            if cost < best_g[r]:
+                best_g[r] = cost
+                parent_moves[r] = direction + 1
+                queue.push(cost, cost, neighbor)
+                size += 1
+            else:
+                duplicates += 1
+    return finish([], info.count(expanded, generated, duplicates, peak), stats)
+
+def ids(start_state, max_depth=50, stats=False):
+    engine = DepthFirst(start_state)
+    info = SearchStats("ids")
+    info.mark("setup")
+    path = engine.ids(max_depth)
+    info.extra["iterations"] = len(engine.iterations)
+    return finish(path, info.absorb(engine), stats)
 
 # Nhóm Thuật toán tìm kiếm có thông tin
 
-def greedy(start_state):
-    start = Puzzle(start_state)
-    visited = set()
-    queue = [(manhattan_distance(start.state), start)]
+def greedy(start_state, open_list="bucket", tie_break="fifo", heuristic="manhattan", stats=False):
+    info = SearchStats("greedy")
+    codec = codec_for(start_state)
+    ranker = get_ranker(codec)
+    h = get_heuristic(heuristic, codec)
+    start = codec.encode(start_state)
+    seen = ranker.new_visited()
+    parent_moves = ranker.new_parent_moves()
+    seen.add(ranker.index(start))
+    queue = make_open_list(open_list, tie_break)
+    queue.push(h(start), 0, start)
+    info.mark("setup")
+    expanded = generated = duplicates = peak = 0
+    size = 1
     while queue:
-        queue.sort(key=lambda x: x[0])
-        _, current = queue.pop(0)
-        if current.is_goal():
-            return current.get_path()
-        visited.add(current.to_tuple())
-        for neighbor in current.get_neighbors():
-            if neighbor.to_tuple() not in visited:
-                queue.append((manhattan_distance(neighbor.state), neighbor))
-    return []
-
-def astar(start_state):
-    start = Puzzle(start_state)
-    visited = set()
-    queue = [(manhattan_distance(start.state), 0, start)]
+        if size > peak:
+            peak = size
+        f, g, current = queue.pop()
+        size -= 1
+        if current == codec.goal:
+            info.count(expanded, generated, duplicates, peak).mark("search")
+            return finish(ranker.path_from_moves(parent_moves, start, current), info, stats, "path")
+        expanded += 1
+        key = f if h.key_is_h else h.evaluate(current)[1]
+        children = codec.successors(current)
+        generated += len(children)
+        for direction, neighbor in children:
+            r = ranker.index(neighbor)
+            if seen.add(r):
+                parent_moves[r] = direction + 1
+                queue.push(h.update(key, current, neighbor)[0], g + 1, neighbor)
+                size += 1
+            else:
+                duplicates += 1
+    return finish([], info.count(expanded, generated, duplicates, peak), stats)
+
+def astar(start_state, open_list="bucket", tie_break="high_g", heuristic="manhattan", checkpoint=None, stats=False):
+    # Engine A* có thể lưu checkpoint định kỳ (AStar.py)
+    engine = AStar(start_state, open_list, tie_break, heuristic, checkpoint)
+    return run_engine("astar", engine, engine.solve, stats)
+
+def weighted_astar(start_state, epsilon=2.0, open_list="heap", tie_break="high_g", heuristic="manhattan", stats=False):
+    # f = g + epsilon * h: nhanh hơn astar, độ dài đường đi <= epsilon * tối ưu.
+    # f không còn là số nguyên nên mặc định dùng heap
+    info = SearchStats("weighted_astar")
+    codec = codec_for(start_state)
+    ranker = get_ranker(codec)
+    h = get_heuristic(heuristic, codec)
+    start = codec.encode(start_state)
+    parent_moves = ranker.new_parent_moves()
+    best_g = ranker.new_g_table()
+    best_g[ranker.index(start)] = 0
+    # keys: khoá heuristic của mỗi trạng thái đã đưa vào open list, để mở rộng chỉ cần h.update
+    # cho từng con thay vì tính lại h.evaluate (f = g + epsilon * h không suy ngược ra khoá được)
+    h_start, start_key = h.evaluate(start)
+    keys = {ranker.index(start): start_key}
+    queue = make_open_list(open_list, tie_break)
+    queue.push(epsilon * h_start, 0, start)
+    info.mark("setup")
+    expanded = generated = duplicates = peak = 0
+    size = 1
     while queue:
-        queue.sort(key=lambda x: x[0])
-        _, g, current = queue.pop(0)
-        if current.is_goal():
-            return current.get_path()
-        visited.add(current.to_tuple())
-        for neighbor in current.get_neighbors():
-            if neighbor.to_tuple() not in visited:
-                cost = g + 1
-                h = manhattan_distance(neighbor.state)
-                queue.append((cost + h, cost, neighbor))
-    return []
-
-def ida_star(start_state):
-    def dfs_f(node, g, threshold, path, visited):
-        f = g + manhattan_distance(node.state)
-        if f > threshold:
-            return f, None
-        if node.is_goal():
-            return f, path + [node.state]
-        minimum = float('inf')
-        for neighbor in node.get_neighbors():
-            state_tuple = neighbor.to_tuple()
-            if state_tuple not in visited:
-                visited.add(state_tuple)
-                t, result = dfs_f(neighbor, g + 1, threshold, path + [node.state], visited)
-                if result:
-                    return t, result
-                minimum = min(minimum, t)
-                visited.remove(state_tuple)
-        return minimum, None
-
-    start = Puzzle(start_state)
-    threshold = manhattan_distance(start.state)
-    path = []
-    while True:
-        visited = {start.to_tuple()}
-        t, result = dfs_f(start, 0, threshold, path, visited)
-        if result:
-            return result
-        if t == float('inf'):
-            return []
-        threshold = t
-
-def simple_hill_climbing(start_state):
+        if size > peak:
+            peak = size
+        f, g, current = queue.pop()
+        size -= 1
+        index = ranker.index(current)
+        if g != best_g[index]:
+            continue
+        if current == codec.goal:
+            info.count(expanded, generated, duplicates, peak).mark("search")
+            return finish(ranker.path_from_moves(parent_moves, start, current), info, stats, "path")
+        expanded += 1
+        key = keys[index]
+        cost = g + 1
+        children = codec.successors(current)
+        generated += len(children)
+        for direction, neighbor in children:
+            r = ranker.index(neighbor)
+            if cost < best_g[r]:
+                best_g[r] = cost
+                parent_moves[r] = direction + 1
+                child_h, keys[r] = h.update(key, current, neighbor)
+                queue.push(cost + epsilon * child_h, cost, neighbor)
+                size += 1
+            else:
+                duplicates += 1
+    return finish([], info.count(expanded, generated, duplicates, peak), stats)
+
+def ida_star(start_state, heuristic="manhattan", checkpoint=None, stats=False):
+    # Dùng engine lặp make/unmake có bảng chuyển vị (IDAStar.py)
+    engine = IDAStar(start_state, heuristic, checkpoint=checkpoint)
+    info = SearchStats("ida_star")
+    info.mark("setup")
+    path = engine.solve()
+    info.extra["iterations"] = len(engine.iterations)
+    return finish(path, info.absorb(engine), stats)
+
+def resume_search(path, checkpoint=None):
+    # Chạy tiếp astar / ida_star / bfs từ file checkpoint; checkpoint: Checkpointer để tiếp tục lưu
+    kind = snapshot_kind(path)
+    if kind == "astar":
+        return AStar.resume(path, checkpoint).solve()
+    if kind == "ida_star":
+        return IDAStar.resume(path, checkpoint).solve()
+    engine, start, goal = LevelBFS.resume(path, checkpoint)
+    for _ in engine.layers(start, goal):
+        pass
+    return engine.ranker.path_from_moves(engine.parent_moves, start, engine.found) if engine.found is not None else []
+
+def bidirectional_bfs(start_state, stats=False):
+    # Tìm từ hai phía, gặp nhau ở giữa (BidirectionalSearch.py)
+    engine = BidirectionalBFS(start_state)
+    return run_engine("bidirectional_bfs", engine, engine.solve, stats)
+
+def bidirectional_astar(start_state, heuristic="manhattan", stats=False):
+    engine = BidirectionalAStar(start_state, heuristic)
+    return run_engine("bidirectional_astar", engine, engine.solve, stats)
+
+def sma_star(start_state, heuristic="manhattan", max_nodes=50000, max_bytes=None, stats=False):
+    # A* giới hạn bộ nhớ: giữ tối đa max_nodes nút (hoặc max_bytes byte) (SMAStar.py)
+    engine = SMAStar(start_state, heuristic, max_nodes, max_bytes)
+    info = SearchStats("sma_star")
+    info.mark("setup")
+    path = engine.solve()
+    info.extra["dropped"] = engine.dropped
+    return finish(path, info.absorb(engine), stats)
+
+def hda_star(start_state, workers=4, heuristic="manhattan", stats=False):
+    # A* song song, trạng thái chia cho các tiến trình theo hash (ParallelAStar.py)
+    engine = ParallelAStar(start_state, workers, heuristic)
+    info = SearchStats("hda_star")
+    info.mark("setup")
+    path = engine.solve()
+    info.extra["expanded_per_worker"] = engine.expanded
+    return finish(path, info.absorb(engine), stats)
+
+# Leo đồi / luyện kim: expanded = số lần sinh hàng xóm, generated = số hàng xóm đã xét
+def simple_hill_climbing(start_state, heuristic="manhattan", stats=False):
+    info = SearchStats("simple_hill_climbing")
     current = Puzzle(start_state)
+    h = get_heuristic(heuristic, current.codec)
+    current.evaluate(h)
+    info.mark("setup")
+    expanded = generated = 0
     
     while not current.is_goal():
-        neighbors = current.get_neighbors()
+        neighbors = current.get_neighbors(h)
+        expanded += 1
+        generated += len(neighbors)
 
         # Kiểm tra từng neighbor và dừng ngay khi tìm thấy neighbor tốt hơn
         for neighbor in neighbors:
-            if manhattan_distance(neighbor.state) < manhattan_distance(current.state):
+            if neighbor.heuristic < current.heuristic:
                 current = neighbor
                 break
         else:
             # Nếu không có neighbor nào tốt hơn, thoát vòng lặp
             break
 
-    return current.get_path() if current.is_goal() else []
+    info.count(expanded, generated, peak_frontier=1)
+    return finish(current.get_path() if current.is_goal() else [], info, stats)
 
 
 
-def steepest_ascent_hill_climbing(start_state):
+def steepest_ascent_hill_climbing(start_state, heuristic="manhattan", stats=False):
+    info = SearchStats("steepest_ascent_hill_climbing")
     current = Puzzle(start_state)
+    h = get_heuristic(heuristic, current.codec)
+    current.evaluate(h)
+    info.mark("setup")
+    expanded = generated = 0
     while True:
-        neighbors = current.get_neighbors()
+        neighbors = current.get_neighbors(h)
+        expanded += 1
+        generated += len(neighbors)
         best_neighbor = None
-        best_h = manhattan_distance(current.state)
+        best_h = current.heuristic
         for neighbor in neighbors:
-            h = manhattan_distance(neighbor.state)
-            if h < best_h:
-                best_h = h
+            if neighbor.heuristic < best_h:
+                best_h = neighbor.heuristic
                 best_neighbor = neighbor
         if best_neighbor is None:
             break
         current = best_neighbor
         if current.is_goal():
-            return current.get_path()
-    return current.get_path() if current.is_goal() else []
+            break
+    info.count(expanded, generated, peak_frontier=1)
+    return finish(current.get_path() if current.is_goal() else [], info, stats)
 
-def stochastic_hill_climbing(start_state):
+def stochastic_hill_climbing(start_state, heuristic="manhattan", stats=False):
+    info = SearchStats("stochastic_hill_climbing")
     current = Puzzle(start_state)
+    h = get_heuristic(heuristic, current.codec)
+    current.evaluate(h)
+    info.mark("setup")
+    expanded = generated = 0
     while True:
-        neighbors = current.get_neighbors()
-        better_neighbors = [n for n in neighbors if manhattan_distance(n.state) < manhattan_distance(current.state)]
+        neighbors = current.get_neighbors(h)
+        expanded += 1
+        generated += len(neighbors)
+        better_neighbors = [n for n in neighbors if n.heuristic < current.heuristic]
         if not better_neighbors:
             break
         current = random.choice(better_neighbors)
         if current.is_goal():
-            return current.get_path()
-    return current.get_path() if current.is_goal() else []
+            break
+    info.count(expanded, generated, peak_frontier=1)
+    return finish(current.get_path() if current.is_goal() else [], info, stats)
 
-def simulated_annealing(start_state, initial_temp=1000, cooling_rate=0.95):
+def simulated_annealing(start_state, initial_temp=1000, cooling_rate=0.95, heuristic="manhattan", stats=False):
+    info = SearchStats("simulated_annealing")
     current = Puzzle(start_state)
+    h = get_heuristic(heuristic, current.codec)
+    current.evaluate(h)
+    info.mark("setup")
+    expanded = generated = accepted = 0
     T = initial_temp
     while T > 1:
         if current.is_goal():
-            return current.get_path()
-        neighbors = current.get_neighbors()
+            break
+        neighbors = current.get_neighbors(h)
         if not neighbors:
             break
+        expanded += 1
+        generated += len(neighbors)
         next_node = random.choice(neighbors)
-        delta_e = manhattan_distance(current.state) - manhattan_distance(next_node.state)
+        delta_e = current.heuristic - next_node.heuristic
         if delta_e > 0 or math.exp(delta_e / T) > random.random():
             current = next_node
+            accepted += 1
         T *= cooling_rate
-    return current.get_path() if current.is_goal() else []
-
-def beam_search(start_state, width=4):
-    start = Puzzle(start_state)
-    visited = set()
-    frontier = [start]
-    visited.add(start.to_tuple())
+    info.count(expanded, generated, peak_frontier=1)
+    info.extra["accepted"] = accepted
+    return finish(current.get_path() if current.is_goal() else [], info, stats)
+
+def beam_search(start_state, width=4, heuristic="manhattan", stats=False):
+    info = SearchStats("beam_search")
+    codec = codec_for(start_state)
+    ranker = get_ranker(codec)
+    h = get_heuristic(heuristic, codec)
+    start = codec.encode(start_state)
+    visited = ranker.new_visited()
+    parent_moves = ranker.new_parent_moves()
+    visited.add(ranker.index(start))
+    frontier = [(*h.evaluate(start), start)]
+    info.mark("setup")
+    # peak: số ứng viên lớn nhất của một tầng trước khi cắt theo width
+    expanded = generated = duplicates = peak = 0
     
     while frontier:
         new_frontier = []
         
-        for node in frontier:
-            if node.is_goal():
-                return node.get_path()
+        for _, key, code in frontier:
+            if code == codec.goal:
+                info.count(expanded, generated, duplicates, peak).mark("search")
+                return finish(ranker.path_from_moves(parent_moves, start, code), info, stats, "path")
+            expanded += 1
             
             # Duyệt các trạng thái hàng xóm
-            for neighbor in node.get_neighbors():
-                state_tuple = neighbor.to_tuple()
+            children = codec.successors(code)
+            generated += len(children)
+            for direction, neighbor in children:
+                r = ranker.index(neighbor)
                 
                 # Chỉ thêm vào nếu chưa duyệt qua
-                if state_tuple not in visited:
-                    visited.add(state_tuple)
-                    new_frontier.append(neighbor)
+                if visited.add(r):
+                    parent_moves[r] = direction + 1
+                    new_frontier.append((*h.update(key, code, neighbor), neighbor))
+                else:
+                    duplicates += 1
         
         # Sắp xếp theo hàm heuristic (Manhattan Distance)
-        new_frontier.sort(key=lambda n: manhattan_distance(n.state))
+        new_frontier.sort(key=lambda item: item[0])
+        peak = max(peak, len(new_frontier))
         
         # Chỉ giữ lại số lượng trạng thái theo `width`
         frontier = new_frontier[:width]
     
-    return []
+    return finish([], info.count(expanded, generated, duplicates, peak), stats)
 
 
 # Genetic Alg
 def flatten(state):
     return [num for row in state for num in row]
 
-def unflatten(flat):
-    return [flat[i*3:(i+1)*3] for i in range(3)]
+def unflatten(flat, cols=3):
+    return [flat[i*cols:(i+1)*cols] for i in range(len(flat) // cols)]
 
-def is_solvable(state):
-    flat = flatten(state)
-    inv = 0
-    for i in range(len(flat)):
-        for j in range(i + 1, len(flat)):
-            if flat[i] and flat[j] and flat[i] > flat[j]:
-                inv += 1
-    return inv % 2 == 0
+# is_solvable: kiểm tra chẵn lẻ O(n log n) dùng chung (InstanceGenerator.py)
 
 def mutate(state):
     flat = flatten(state)
-    i, j = random.sample(range(9), 2)
+    i, j = random.sample(range(len(flat)), 2)
     flat[i], flat[j] = flat[j], flat[i]
-    return unflatten(flat)
+    return unflatten(flat, len(state[0]))
 
 def crossover(parent1, parent2):
     flat1 = flatten(parent1)
     flat2 = flatten(parent2)
-    idx = random.randint(1, 7)
+    idx = random.randint(1, len(flat1) - 2)
     child_flat = flat1[:idx] + [x for x in flat2 if x not in flat1[:idx]]
-    return unflatten(child_flat)
+    return unflatten(child_flat, len(parent1[0]))
 
 def fitness(state):
     return -manhattan_distance(state)
 
 def shuffle_state(state, steps=30):
     state = copy.deepcopy(state)
+    rows, cols = len(state), len(state[0])
     for _ in range(steps):
-        bi, bj = [(i, j) for i in range(3) for j in range(3) if state[i][j] == 0][0]
+        bi, bj = [(i, j) for i in range(rows) for j in range(cols) if state[i][j] == 0][0]
         moves = []
         for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
             ni, nj = bi + di, bj + dj
-            if 0 <= ni < 3 and 0 <= nj < 3:
+            if 0 <= ni < rows and 0 <= nj < cols:
                 moves.append((ni, nj))
         if moves:
             mi, mj = random.choice(moves)
@@ -359,25 +486,41 @@ def shuffle_state(state, steps=30):
     return state
 
 
-def genetic_algorithm(start_state, population_size=20, generations=100):
+def genetic_algorithm(start_state, population_size=20, generations=100, stats=False):
+    # Tiến hoá tới cá thể tốt nhất rồi BFS từ cá thể đó: phases "evolve" / "bfs",
+    # bộ đếm là của lần BFS, extra ghi số thế hệ và số cá thể đã tạo
+    info = SearchStats("genetic_algorithm")
     population = [start_state]
     while len(population) < population_size:
         shuffled = shuffled = shuffle_state(start_state, steps=20)
         if is_solvable(shuffled):
             population.append(shuffled)
-
-    for _ in range(generations):
+    info.mark("setup")
+    created = 0
+
+    def solve_from(best, generation):
+        info.mark("evolve")
+        info.extra["generations"] = generation
+        info.extra["children"] = created
+        path = bfs(best, stats=stats)
+        if not stats:
+            return path
+        info.count(path.stats.expanded, path.stats.generated, path.stats.duplicates, path.stats.peak_frontier)
+        return finish(path.path, info, stats, "bfs")
+
+    for generation in range(generations):
         scored = sorted([(fitness(ind), ind) for ind in population], reverse=True)
         if scored[0][0] == 0:
-            return bfs(scored[0][1])
+            return solve_from(scored[0][1], generation)
         new_population = [scored[0][1]]
         while len(new_population) < population_size:
             parents = random.choices(scored[:10], k=2)
             child = crossover(parents[0][1], parents[1][1])
             if random.random() < 0.3:
                 child = mutate(child)
+            created += 1
             if is_solvable(child):
                 new_population.append(child)
         population = new_population
     best = max(population, key=lambda s: fitness(s))
-    return bfs(best)  # fallback to BFS from best found
+    return solve_from(best, generations)  # fallback to BFS from best found
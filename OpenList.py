@@ -0,0 +1,134 @@
+import heapq
+from collections import deque
+
+# ======= OPEN LIST ======= #
+#
+# Hàng đợi ưu tiên cho greedy / ucs / astar. Mỗi phần tử là (f, g, code), peek() trả về f nhỏ nhất.
+# Cả hai cài đặt dùng xoá lười: phần tử cũ không bị xoá khi có g tốt hơn,
+# bên gọi tự bỏ qua khi pop ra (so g với best_g).
+#
+# tie_break khi cùng f:
+#   "high_g" - ưu tiên g lớn (gần đích hơn), mặc định
+#   "low_g"  - ưu tiên g nhỏ
+#   "fifo"   - vào trước ra trước
+#   "lifo"   - vào sau ra trước
+
+TIE_BREAKS = ("high_g", "low_g", "fifo", "lifo")
+
+
+class HeapOpenList:
+    def __init__(self, tie_break="high_g"):
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"Không hỗ trợ tie_break: {tie_break}")
+        self.tie_break = tie_break
+        self.heap = []
+        self.counter = 0
+
+    def push(self, f, g, code):
+        self.counter += 1
+        if self.tie_break == "high_g":
+            tie = -g
+        elif self.tie_break == "low_g":
+            tie = g
+        elif self.tie_break == "fifo":
+            tie = self.counter
+        else:
+            tie = -self.counter
+        heapq.heappush(self.heap, (f, tie, code, g))
+
+    def pop(self):
+        f, _, code, g = heapq.heappop(self.heap)
+        return f, g, code
+
+    def peek(self):
+        # f nhỏ nhất hiện có (kể cả phần tử cũ chưa bị xoá lười)
+        return self.heap[0][0]
+
+    def entries(self):
+        # (f, g, code) theo thứ tự để push lại vào list rỗng cho cùng thứ tự pop (dùng cho checkpoint)
+        items = [(f, g, code) for f, _, code, g in sorted(self.heap)]
+        return items[::-1] if self.tie_break == "lifo" else items
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class BucketOpenList:
+    # Hàng đợi Dial: f và g đều là số nguyên nhỏ nên dùng mảng bucket theo f,
+    # trong mỗi bucket lại chia theo g (hoặc một deque nếu tie_break là fifo/lifo)
+    def __init__(self, tie_break="high_g"):
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"Không hỗ trợ tie_break: {tie_break}")
+        self.tie_break = tie_break
+        self.by_g = tie_break in ("high_g", "low_g")
+        self.buckets = []
+        self.min_f = 0
+        self.count = 0
+
+    def push(self, f, g, code):
+        while len(self.buckets) <= f:
+            self.buckets.append([] if self.by_g else deque())
+        bucket = self.buckets[f]
+        if self.by_g:
+            while len(bucket) <= g:
+                bucket.append([])
+            bucket[g].append(code)
+        else:
+            bucket.append((g, code))
+        if f < self.min_f:
+            self.min_f = f
+        self.count += 1
+
+    def pop(self):
+        if not self.count:
+            raise IndexError("pop from empty open list")
+        buckets = self.buckets
+        while not buckets[self.min_f]:
+            self.min_f += 1
+        f = self.min_f
+        bucket = buckets[f]
+        self.count -= 1
+
+        if not self.by_g:
+            g, code = bucket.popleft() if self.tie_break == "fifo" else bucket.pop()
+            return f, g, code
+
+        if self.tie_break == "high_g":
+            g = len(bucket) - 1
+            code = bucket[g].pop()
+        else:
+            g = 0
+            while not bucket[g]:
+                g += 1
+            code = bucket[g].pop()
+        # Cắt các bucket g rỗng ở cuối để lần pop sau không phải quét lại
+        while bucket and not bucket[-1]:
+            bucket.pop()
+        return f, g, code
+
+    def peek(self):
+        while not self.buckets[self.min_f]:
+            self.min_f += 1
+        return self.min_f
+
+    def entries(self):
+        # Theo thứ tự bên trong các bucket: push lại lần lượt sẽ dựng lại đúng cấu trúc này
+        for f, bucket in enumerate(self.buckets):
+            if self.by_g:
+                for g, codes in enumerate(bucket):
+                    for code in codes:
+                        yield f, g, code
+            else:
+                for g, code in bucket:
+                    yield f, g, code
+
+    def __len__(self):
+        return self.count
+
+
+OPEN_LISTS = {"heap": HeapOpenList, "bucket": BucketOpenList}
+
+def make_open_list(kind="bucket", tie_break="high_g"):
+    if kind not in OPEN_LISTS:
+        raise ValueError(f"Không hỗ trợ open list: {kind}")
+    return OPEN_LISTS[kind](tie_break)
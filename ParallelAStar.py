@@ -0,0 +1,249 @@
+import multiprocessing, queue, timeit
+from BoardEncoding import codec_for, get_codec, inverse_direction
+from PermutationRank import get_ranker
+from OpenList import make_open_list
+from Heuristics import get_heuristic
+
+# ======= HDA* (HASH-DISTRIBUTED A*) ======= #
+#
+# Mỗi trạng thái thuộc về đúng một tiến trình (owner = hash(code) % workers); tiến trình đó giữ
+# open list và bảng g / hướng đi của các trạng thái mình sở hữu. Nút con sinh ra được gom thành
+# lô theo owner rồi gửi qua Queue. Khi tìm thấy đích với chi phí U, U được phát cho mọi tiến trình
+# và các nút có f >= U bị bỏ.
+#
+# Kết thúc (giữ tối ưu): tiến trình báo rảnh kèm số lô đã gửi / đã nhận; khi mọi tiến trình rảnh và
+# tổng gửi = tổng nhận, tiến trình chính hỏi lại hai lượt (probe), chỉ dừng khi hai lượt liền nhau
+# cho cùng số liệu (phương pháp bốn bộ đếm của Mattern) -> không còn lô nào đang trên đường.
+# Đường đi được dựng lại bằng cách hỏi owner của từng trạng thái hướng đi tới nó.
+
+INFINITY = float('inf')
+
+
+def owner_of(code, workers):
+    # Hash nhân (Fibonacci) để các trạng thái kề nhau rải đều các tiến trình
+    return ((code * 0x9E3779B97F4A7C15) >> 20) % workers
+
+
+def _worker(wid, workers, rows, cols, heuristic, batch_size, inboxes, results):
+    codec = get_codec(rows, cols)
+    h = get_heuristic(heuristic, codec)
+    inbox = inboxes[wid]
+    open_list = make_open_list("bucket", "high_g")
+    best_g = {}
+    parent_moves = {}
+    buffers = [[] for _ in range(workers)]
+    bound = INFINITY
+    sent = received = expanded = generated = duplicates = peak = 0
+    reported = False
+
+    def insert(g, f, code, direction):
+        nonlocal duplicates
+        if g < best_g.get(code, INFINITY):
+            best_g[code] = g
+            parent_moves[code] = direction
+            open_list.push(f, g, code)
+        else:
+            duplicates += 1
+
+    def flush():
+        nonlocal sent
+        for i, buffer in enumerate(buffers):
+            if buffer:
+                inboxes[i].put(("nodes", buffer))
+                buffers[i] = []
+                sent += 1
+
+    def has_work():
+        return len(open_list) and open_list.peek() < bound
+
+    def handle(message):
+        nonlocal bound, received, reported
+        kind = message[0]
+        if kind == "nodes":
+            received += 1
+            reported = False
+            for g, f, code, direction in message[1]:
+                if f < bound:
+                    insert(g, f, code, direction)
+        elif kind == "bound":
+            bound = min(bound, message[1])
+        elif kind == "probe":
+            idle = not has_work() and not any(buffers)
+            results.put(("status", wid, idle, sent, received, message[1]))
+        elif kind == "parent":
+            results.put(("parent", parent_moves[message[1]]))
+        elif kind == "stop":
+            results.put(("done", wid, expanded, generated, duplicates, peak))
+            return False
+        return True
+
+    while True:
+        # Xử lý hết thư đang chờ; hết việc thì gửi nốt các lô, báo rảnh rồi mới chờ thư
+        try:
+            message = inbox.get_nowait()
+        except queue.Empty:
+            message = None
+            if not has_work():
+                flush()
+                if not reported:
+                    reported = True
+                    results.put(("status", wid, True, sent, received, None))
+                message = inbox.get()
+        if message is not None:
+            if not handle(message):
+                return
+            continue
+
+        # Mở rộng một loạt nút rồi quay lại kiểm tra hộp thư (kích thước open list lấy mẫu mỗi loạt)
+        peak = max(peak, len(open_list))
+        for _ in range(256):
+            if not has_work():
+                break
+            f, g, code = open_list.pop()
+            if g != best_g[code]:
+                continue
+            if code == codec.goal:
+                bound = g
+                results.put(("goal", g))
+                continue
+            expanded += 1
+            key = f - g if h.key_is_h else h.evaluate(code)[1]
+            cost = g + 1
+            children = codec.successors(code)
+            generated += len(children)
+            for direction, child in children:
+                child_f = cost + h.update(key, code, child)[0]
+                if child_f >= bound:
+                    continue
+                owner = owner_of(child, workers)
+                if owner == wid:
+                    insert(cost, child_f, child, direction)
+                else:
+                    buffers[owner].append((cost, child_f, child, direction))
+                    if len(buffers[owner]) >= batch_size:
+                        inboxes[owner].put(("nodes", buffers[owner]))
+                        buffers[owner] = []
+                        sent += 1
+
+
+class ParallelAStar:
+    def __init__(self, start_state, workers=4, heuristic="manhattan", batch_size=64):
+        if not isinstance(heuristic, str):
+            raise ValueError("HDA* cần heuristic theo tên để gửi sang tiến trình con")
+        self.codec = codec_for(start_state)
+        self.start = self.codec.encode(start_state)
+        self.workers = workers
+        self.heuristic = heuristic
+        self.batch_size = batch_size
+        self.expanded = []
+        self.generated = self.duplicates = self.peak_frontier = 0
+        self.cost = None
+
+    def solve(self):
+        codec, workers = self.codec, self.workers
+        start = self.start
+        if start == codec.goal:
+            return [codec.decode(start)]
+        if not get_ranker(codec).is_solvable(start):
+            return []
+
+        inboxes = [multiprocessing.Queue() for _ in range(workers)]
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=_worker, args=(wid, workers, codec.rows, codec.cols, self.heuristic, self.batch_size, inboxes, results), daemon=True)
+                     for wid in range(workers)]
+        for process in processes:
+            process.start()
+
+        h = get_heuristic(self.heuristic, codec)
+        inboxes[owner_of(start, workers)].put(("nodes", [(0, h(start), start, -1)]))
+        seeded = 1
+        bound = INFINITY
+        statuses = {}
+        probe, replies, previous, probing = 0, {}, None, False
+
+        def all_quiet(reports):
+            return all(report[0] for report in reports.values()) and sum(report[1] for report in reports.values()) + seeded == sum(report[2] for report in reports.values())
+
+        def start_probe():
+            nonlocal probe, replies, probing
+            probe += 1
+            replies = {}
+            probing = True
+            for inbox in inboxes:
+                inbox.put(("probe", probe))
+
+        while True:
+            message = results.get()
+            kind = message[0]
+            if kind == "goal":
+                if message[1] < bound:
+                    bound = message[1]
+                    for inbox in inboxes:
+                        inbox.put(("bound", bound))
+            elif kind == "status" and message[5] is None:
+                statuses[message[1]] = message[2:5]
+                if len(statuses) == workers and all_quiet(statuses) and not probing:
+                    start_probe()
+            elif kind == "status" and message[5] == probe:
+                replies[message[1]] = message[2:5]
+                if len(replies) == workers:
+                    if not all_quiet(replies):
+                        previous, replies, probing = None, {}, False
+                        # Báo rảnh có thể đã tới trong lúc hỏi
+                        if len(statuses) == workers and all_quiet(statuses):
+                            start_probe()
+                    elif previous == replies:
+                        break
+                    else:
+                        previous = replies
+                        start_probe()
+
+        path = []
+        if bound < INFINITY:
+            self.cost = bound
+            code = codec.goal
+            path.append(code)
+            while code != start:
+                inboxes[owner_of(code, workers)].put(("parent", code))
+                message = results.get()
+                while message[0] != "parent":
+                    message = results.get()
+                code = codec.apply(code, inverse_direction(message[1]))
+                path.append(code)
+
+        for inbox in inboxes:
+            inbox.put(("stop",))
+        self.expanded = [0] * workers
+        done = 0
+        while done < workers:
+            message = results.get()
+            if message[0] == "done":
+                self.expanded[message[1]] = message[2]
+                self.generated += message[3]
+                self.duplicates += message[4]
+                self.peak_frontier += message[5]
+                done += 1
+        for process in processes:
+            process.join()
+        return [codec.decode(code) for code in reversed(path)]
+
+
+if __name__ == "__main__":
+    import os
+    from ObservableEnvironmet import astar
+    from FifteenPuzzle import random_instances
+
+    instances = random_instances(2, walk=100, seed=7)
+    print(f"Số CPU: {os.cpu_count()}")
+    for initial_state in instances:
+        start_time = timeit.default_timer()
+        path = astar(initial_state)
+        baseline = timeit.default_timer() - start_time
+        print(f"astar: số bước = {len(path) - 1}, thời gian = {baseline:.5f} giây")
+        for workers in [1, 2, 4, 8]:
+            search = ParallelAStar(initial_state, workers)
+            start_time = timeit.default_timer()
+            path = search.solve()
+            elapsed = timeit.default_timer() - start_time
+            print(f"  HDA* {workers} tiến trình: số bước = {len(path) - 1}, thời gian = {elapsed:.5f} giây, "
+                  f"tăng tốc = {baseline / elapsed:.2f}x, mở rộng = {sum(search.expanded)} {search.expanded}")
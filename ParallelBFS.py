@@ -0,0 +1,169 @@
+import multiprocessing, timeit
+from array import array
+from multiprocessing import shared_memory
+from BoardEncoding import get_codec
+from PermutationRank import get_ranker
+
+# ======= PARALLEL BFS ======= #
+#
+# BFS theo tầng trên nhiều tiến trình để duyệt toàn bộ không gian trạng thái.
+#   - mỗi tiến trình sở hữu một khoảng rank liên tục (bội số của 8, để mỗi byte của bitmap
+#     chỉ do một tiến trình ghi) và frontier của khoảng đó
+#   - bitmap đã thăm (và bảng độ sâu 1 byte nếu cần) nằm trong shared_memory: chỉ owner ghi,
+#     tiến trình khác chỉ đọc để bớt gửi trạng thái đã thăm
+#   - trạng thái con thuộc tiến trình khác được gom thành lô (rank, code) gửi qua Queue;
+#     hết tầng thì gửi dấu "end" tới mọi tiến trình khác, nhận đủ dấu mới xong tầng
+#   - tiến trình chính đồng bộ từng tầng và ghi stats: [(độ sâu, số trạng thái, thời gian), ...]
+
+UNKNOWN = 255
+
+
+def _worker(wid, workers, rows, cols, span, batch_size, bitmap_name, depths_name, control, inboxes, results):
+    codec = get_codec(rows, cols)
+    ranker = get_ranker(codec)
+    bitmap_memory = shared_memory.SharedMemory(name=bitmap_name)
+    bitmap = bitmap_memory.buf
+    depths_memory = shared_memory.SharedMemory(name=depths_name) if depths_name else None
+    depths = depths_memory.buf if depths_memory else None
+    inbox = inboxes[wid]
+    rank, neighbors = ranker.rank, codec.neighbors
+    frontier = array('Q')
+
+    def visit(r, code, depth, next_frontier):
+        byte, bit = r >> 3, 1 << (r & 7)
+        if bitmap[byte] & bit:
+            return
+        bitmap[byte] |= bit
+        if depths is not None:
+            depths[r] = depth
+        next_frontier.append(code)
+
+    while True:
+        command = control.get()
+        if command[0] == "seed":
+            visit(rank(command[1]), command[1], 0, frontier)
+        elif command[0] == "level":
+            depth = command[1]
+            next_frontier = array('Q')
+            out_ranks = [array('Q') for _ in range(workers)]
+            out_codes = [array('Q') for _ in range(workers)]
+            for code in frontier:
+                for child in neighbors(code):
+                    r = rank(child)
+                    owner = r // span
+                    if owner == wid:
+                        visit(r, child, depth, next_frontier)
+                    elif not bitmap[r >> 3] & (1 << (r & 7)):
+                        out_ranks[owner].append(r)
+                        out_codes[owner].append(child)
+                        if len(out_ranks[owner]) >= batch_size:
+                            inboxes[owner].put(("batch", out_ranks[owner], out_codes[owner]))
+                            out_ranks[owner], out_codes[owner] = array('Q'), array('Q')
+            for owner in range(workers):
+                if owner != wid:
+                    if out_ranks[owner]:
+                        inboxes[owner].put(("batch", out_ranks[owner], out_codes[owner]))
+                    inboxes[owner].put(("end",))
+
+            ends = 0
+            while ends < workers - 1:
+                message = inbox.get()
+                if message[0] == "end":
+                    ends += 1
+                else:
+                    for r, code in zip(message[1], message[2]):
+                        visit(r, code, depth, next_frontier)
+            frontier = next_frontier
+            results.put((wid, len(frontier)))
+        elif command[0] == "stop":
+            del bitmap, depths
+            bitmap_memory.close()
+            if depths_memory:
+                depths_memory.close()
+            results.put((wid, None))
+            return
+
+
+class ParallelBFS:
+    def __init__(self, rows=3, cols=3, workers=4, batch_size=4096, track_depths=True):
+        self.codec = get_codec(rows, cols)
+        self.ranker = get_ranker(self.codec)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.track_depths = track_depths
+        # Khoảng rank của mỗi tiến trình, làm tròn lên bội số của 8
+        self.span = ((self.ranker.size + workers - 1) // workers + 7) // 8 * 8
+        self.stats = []
+        self.depths = None
+
+    def run(self, start=None):
+        codec, ranker, workers = self.codec, self.ranker, self.workers
+        start = codec.goal if start is None else start
+        bitmap_memory = shared_memory.SharedMemory(create=True, size=(ranker.size + 7) // 8)
+        depths_memory = shared_memory.SharedMemory(create=True, size=ranker.size) if self.track_depths else None
+        try:
+            bitmap_memory.buf[:] = bytes(bitmap_memory.size)
+            if depths_memory:
+                depths_memory.buf[:ranker.size] = bytes([UNKNOWN]) * ranker.size
+            controls = [multiprocessing.Queue() for _ in range(workers)]
+            inboxes = [multiprocessing.Queue() for _ in range(workers)]
+            results = multiprocessing.Queue()
+            processes = [multiprocessing.Process(target=_worker, args=(wid, workers, codec.rows, codec.cols, self.span, self.batch_size, bitmap_memory.name,
+                                                                       depths_memory.name if depths_memory else None, controls[wid], inboxes, results), daemon=True)
+                         for wid in range(workers)]
+            for process in processes:
+                process.start()
+
+            controls[ranker.rank(start) // self.span].put(("seed", start))
+            self.stats = [(0, 1, 0.0)]
+            depth = 0
+            while True:
+                depth += 1
+                start_time = timeit.default_timer()
+                for control in controls:
+                    control.put(("level", depth))
+                count = sum(results.get()[1] for _ in range(workers))
+                if not count:
+                    break
+                self.stats.append((depth, count, timeit.default_timer() - start_time))
+
+            for control in controls:
+                control.put(("stop",))
+            for _ in range(workers):
+                results.get()
+            for process in processes:
+                process.join()
+            if depths_memory:
+                self.depths = bytes(depths_memory.buf[:ranker.size])
+        finally:
+            bitmap_memory.close()
+            bitmap_memory.unlink()
+            if depths_memory:
+                depths_memory.close()
+                depths_memory.unlink()
+        return [count for _, count, _ in self.stats]
+
+
+def parallel_state_space(rows=3, cols=3, workers=4):
+    # Số trạng thái ở từng khoảng cách tới đích, duyệt song song
+    return ParallelBFS(rows, cols, workers, track_depths=False).run()
+
+
+if __name__ == "__main__":
+    import os
+    from LevelBFS import state_space_layers
+    from DistanceDatabase import build_distances
+
+    print(f"Số CPU: {os.cpu_count()}")
+    for rows, cols in [(3, 3), (2, 4)]:
+        start_time = timeit.default_timer()
+        sizes, _ = state_space_layers(rows=rows, cols=cols)
+        baseline = timeit.default_timer() - start_time
+        print(f"== {rows}x{cols}: LevelBFS {sum(sizes)} trạng thái, thời gian = {baseline:.5f} giây ==")
+        for workers in [1, 2, 4, 8]:
+            engine = ParallelBFS(rows, cols, workers)
+            start_time = timeit.default_timer()
+            parallel_sizes = engine.run()
+            elapsed = timeit.default_timer() - start_time
+            same = parallel_sizes == sizes and engine.depths == bytes(build_distances(get_codec(rows, cols), get_ranker(get_codec(rows, cols))))
+            print(f"  {workers} tiến trình: {sum(parallel_sizes)} trạng thái, khớp = {same}, thời gian = {elapsed:.5f} giây, tăng tốc = {baseline / elapsed:.2f}x")
@@ -0,0 +1,156 @@
+import os, timeit
+from collections import deque
+from BoardEncoding import codec
+from Heuristics import Heuristic
+
+# ======= PATTERN DATABASE ======= #
+#
+# PDB cộng được (additive disjoint): chia các ô số thành các nhóm rời nhau,
+# với mỗi nhóm tính số bước tối thiểu chỉ tính các lần ô trong nhóm di chuyển
+# (ô trống đi qua ô ngoài nhóm có chi phí 0). Tổng các nhóm vẫn chấp nhận được.
+#
+# Bảng của nhóm k ô được đánh chỉ số index = pos_0 + size * pos_1 + ... + size^(k-1) * pos_(k-1),
+# mỗi phần tử 1 byte, lưu thẳng ra file nhị phân.
+
+UNKNOWN = 255
+
+DEFAULT_PARTITIONS = {
+    (3, 3): [(1, 2, 3, 4), (5, 6, 7, 8)],
+    (2, 4): [(1, 2, 5, 6), (3, 4, 7)],
+    (3, 4): [(1, 2, 5, 6, 9, 10), (3, 4, 7, 8, 11)],
+    (4, 4): [(1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15)],
+}
+
+
+def pattern_path(tiles, codec=codec, directory=None):
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    name = "-".join(str(tile) for tile in tiles)
+    return os.path.join(directory, f"pdb_{codec.rows}x{codec.cols}_{name}.bin")
+
+
+def build_pattern_table(tiles, codec=codec):
+    size = codec.size
+    k = len(tiles)
+    powers = [size ** i for i in range(k)]
+    table = bytearray([UNKNOWN]) * (size ** k)
+    distances = bytearray([UNKNOWN]) * (size ** k * size)
+
+    # Trạng thái trừu tượng: key = index * size + vị trí ô trống
+    start_index = sum((tile - 1) * powers[i] for i, tile in enumerate(tiles))
+    start = start_index * size + size - 1
+    distances[start] = 0
+    queue = deque([(0, start)])
+
+    # BFS 0-1: bước đi của ô trong nhóm tốn 1, của ô ngoài nhóm tốn 0
+    while queue:
+        d, key = queue.popleft()
+        if d != distances[key]:
+            continue
+        index, blank = divmod(key, size)
+        if d < table[index]:
+            table[index] = d
+
+        occupied = {}
+        rest = index
+        for i in range(k):
+            rest, pos = divmod(rest, size)
+            occupied[pos] = i
+
+        for _, nb, _, _, _ in codec.moves[blank]:
+            i = occupied.get(nb)
+            if i is None:
+                neighbor = index * size + nb
+                if d < distances[neighbor]:
+                    distances[neighbor] = d
+                    queue.appendleft((d, neighbor))
+            else:
+                neighbor = (index + (blank - nb) * powers[i]) * size + nb
+                if d + 1 < distances[neighbor]:
+                    distances[neighbor] = d + 1
+                    queue.append((d + 1, neighbor))
+    return table
+
+
+class PatternDatabase(Heuristic):
+    # key = (h, chỉ số của từng nhóm): ô vừa đi chỉ làm đổi chỉ số của nhóm chứa nó
+    key_is_h = False
+
+    def __init__(self, partition=None, codec=codec, directory=None):
+        self.codec = codec
+        self.patterns = [tuple(tiles) for tiles in (partition or DEFAULT_PARTITIONS[(codec.rows, codec.cols)])]
+        self.tables = []
+        self.build_time = 0.0
+        for tiles in self.patterns:
+            path = pattern_path(tiles, codec, directory)
+            if not os.path.exists(path) or os.path.getsize(path) != codec.size ** len(tiles):
+                start_time = timeit.default_timer()
+                table = build_pattern_table(tiles, codec)
+                self.build_time += timeit.default_timer() - start_time
+                with open(path, "wb") as f:
+                    f.write(table)
+            with open(path, "rb") as f:
+                self.tables.append(f.read())
+        self.file_size = sum(len(table) for table in self.tables)
+
+        # slots[tile] = (nhóm, size^i) để cập nhật chỉ số khi tile di chuyển
+        self.slots = [None] * codec.size
+        for p, tiles in enumerate(self.patterns):
+            for i, tile in enumerate(tiles):
+                self.slots[tile] = (p, codec.size ** i)
+
+    def evaluate(self, code):
+        size, bits, mask = self.codec.size, self.codec.bits, self.codec.mask
+        positions = [0] * size
+        for pos in range(size):
+            positions[code & mask] = pos
+            code >>= bits
+        total = 0
+        indices = []
+        for tiles, table in zip(self.patterns, self.tables):
+            index = 0
+            for tile in reversed(tiles):
+                index = index * size + positions[tile]
+            total += table[index]
+            indices.append(index)
+        return total, (total, tuple(indices))
+
+    def __call__(self, code):
+        return self.evaluate(code)[0]
+
+    def update(self, key, code, child):
+        tile, source, target = self.codec.moved_tile(code, child)
+        h, indices = key
+        slot = self.slots[tile]
+        if slot is None:
+            return h, key
+        p, power = slot
+        table = self.tables[p]
+        old = indices[p]
+        new = old + (target - source) * power
+        h += table[new] - table[old]
+        return h, (h, indices[:p] + (new,) + indices[p + 1:])
+
+
+if __name__ == "__main__":
+    from Heuristics import get_heuristic
+    from ObservableEnvironmet import astar
+
+    for tiles in DEFAULT_PARTITIONS[(3, 3)]:
+        path = pattern_path(tiles)
+        if os.path.exists(path):
+            os.remove(path)
+    pdb = PatternDatabase()
+    print(f"Thời gian tạo PDB: {pdb.build_time:.5f} giây")
+    print(f"Kích thước file: {pdb.file_size / 1024:.1f} KB ({len(pdb.patterns)} nhóm: {pdb.patterns})")
+
+    initial_state = [[2, 6, 5], [0, 8, 7], [4, 3, 1]]
+    for name in ["manhattan", "pdb"]:
+        heuristic = get_heuristic(name)
+        calls = [0]
+        def counted(code, heuristic=heuristic):
+            calls[0] += 1
+            return heuristic(code)
+        start_time = timeit.default_timer()
+        path = astar(initial_state, heuristic=counted)
+        end_time = timeit.default_timer()
+        print(f"{name}: số nút sinh ra = {calls[0]}, số bước = {len(path) - 1}, thời gian = {(end_time - start_time):.5f} giây")
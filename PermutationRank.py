@@ -0,0 +1,181 @@
+# ======= PERMUTATION RANK ======= #
+#
+# Đánh số hoàn hảo các trạng thái giải được: rank = blank * (m!/2) + lehmer(các ô số) // 2,
+# với m = số ô số. Hai hoán vị chỉ khác nhau ở hai ô số cuối có mã Lehmer liền kề
+# (2k, 2k+1) và khác tính chẵn lẻ, nên đúng một trong hai giải được.
+
+from BoardEncoding import codec, inverse_direction
+
+# Không gian trạng thái nhỏ hơn ngưỡng này dùng mảng theo rank (bitmap, mảng uint8);
+# lớn hơn (vd. 15-puzzle) thì dùng set / dict theo chính code của trạng thái
+DENSE_LIMIT = 1 << 25
+
+
+class Ranker:
+    def __init__(self, codec):
+        self.codec = codec
+        self.tiles = codec.size - 1
+        self.factorials = [1]
+        for i in range(1, self.tiles + 1):
+            self.factorials.append(self.factorials[-1] * i)
+        self.half = self.factorials[self.tiles] // 2
+        self.size = codec.size * self.half
+        self.dense = self.size <= DENSE_LIMIT
+        self.byte_tables = self.build_byte_tables() if self.tiles <= 8 and codec.bits == 4 else None
+
+    def build_byte_tables(self):
+        # Bảng theo (tập ô số đã gặp, byte = 2 ô liên tiếp) -> (hệ số nhân, số cộng, tập mới),
+        # để rank chỉ cần một lần tra bảng cho mỗi 2 ô thay vì vòng lặp từng ô
+        tiles = self.tiles
+        mult, add, next_used = [1] * 65536, [0] * 65536, [0] * 65536
+        for seen in range(1 << tiles):
+            for byte in range(256):
+                used = seen << 1
+                m, a = 1, 0
+                for tile in (byte & 15, byte >> 4):
+                    if tile and tile <= tiles:
+                        radix = tiles - used.bit_count()
+                        m *= radix
+                        a = a * radix + tile - 1 - (used & ((1 << tile) - 1)).bit_count()
+                        used |= 1 << tile
+                index = (seen << 8) | byte
+                mult[index], add[index], next_used[index] = m, a, used >> 1
+        return mult, add, next_used
+
+    def required_parity(self, blank):
+        # Tính chẵn lẻ số nghịch thế để trạng thái giải được (đích chuẩn, ô trống ở cuối)
+        if self.codec.cols % 2 == 1:
+            return 0
+        return (self.codec.rows - 1 - blank // self.codec.cols) % 2
+
+    def rank(self, code):
+        blank = code >> self.codec.blank_shift
+        if self.byte_tables:
+            mult, add, next_used = self.byte_tables
+            code &= self.codec.cells_mask
+            used = 0
+            lehmer = 0
+            while code:
+                index = (used << 8) | (code & 255)
+                lehmer = lehmer * mult[index] + add[index]
+                used = next_used[index]
+                code >>= 8
+            return blank * self.half + (lehmer >> 1)
+
+        bits, mask, tiles = self.codec.bits, self.codec.mask, self.tiles
+        used = 0
+        lehmer = 0
+        i = 0
+        for _ in range(self.codec.size):
+            tile = code & mask
+            code >>= bits
+            if tile:
+                lehmer = lehmer * (tiles - i) + tile - 1 - (used & ((1 << tile) - 1)).bit_count()
+                used |= 1 << tile
+                i += 1
+        return blank * self.half + (lehmer >> 1)
+
+    def unrank(self, index):
+        blank, lehmer = divmod(index, self.half)
+        lehmer <<= 1
+        digits = []
+        parity = 0
+        for i in range(self.tiles):
+            digit, lehmer = divmod(lehmer, self.factorials[self.tiles - 1 - i])
+            digits.append(digit)
+            parity += digit
+        if parity % 2 != self.required_parity(blank):
+            digits[-2] = 1
+        remaining = list(range(1, self.tiles + 1))
+        flat = [remaining.pop(digit) for digit in digits]
+        flat.insert(blank, 0)
+
+        code = 0
+        for pos, tile in enumerate(flat):
+            code |= tile << (self.codec.bits * pos)
+        return code | (blank << self.codec.blank_shift)
+
+    def is_solvable(self, code):
+        # Trạng thái không giải được được đánh số trùng với trạng thái "anh em" giải được
+        return self.unrank(self.rank(code)) == code
+
+    def index(self, code):
+        # Khoá cho các bảng trạng thái: rank nếu dùng mảng, code nếu dùng set / dict
+        return self.rank(code) if self.dense else code
+
+    def new_visited(self):
+        return VisitedBitmap(self.size) if self.dense else VisitedSet()
+
+    def new_parent_moves(self):
+        return new_parent_moves(self.size) if self.dense else SparseTable(0)
+
+    def new_table(self, default):
+        return bytearray([default]) * self.size if self.dense else SparseTable(default)
+
+    def new_g_table(self, unbounded=False):
+        # Bảng g nhỏ nhất đã gặp: bytearray (255 = chưa gặp) với bàn nhỏ; bàn lớn thì g có thể
+        # vượt 255 (vd. weighted A* epsilon lớn) nên chưa gặp = vô hạn.
+        # unbounded: chưa gặp = vô hạn cả với bàn nhỏ, cho nơi so g trực tiếp với f (ARA*)
+        if not self.dense:
+            return SparseTable(float('inf'))
+        return [float('inf')] * self.size if unbounded else bytearray([255]) * self.size
+
+    def path_from_moves(self, parent_moves, start, code):
+        # Lần ngược từ code về start theo mảng hướng đi (lưu direction + 1)
+        path = [code]
+        while code != start:
+            direction = parent_moves[self.index(code)] - 1
+            code = self.codec.apply(code, inverse_direction(direction))
+            path.append(code)
+        return [self.codec.decode(c) for c in reversed(path)]
+
+
+class VisitedBitmap:
+    def __init__(self, size):
+        self.bits = bytearray((size + 7) >> 3)
+
+    def add(self, index):
+        # Trả về True nếu index chưa có trong tập
+        byte, bit = index >> 3, 1 << (index & 7)
+        if self.bits[byte] & bit:
+            return False
+        self.bits[byte] |= bit
+        return True
+
+    def __contains__(self, index):
+        return self.bits[index >> 3] & (1 << (index & 7)) != 0
+
+
+class VisitedSet(set):
+    # Cùng giao diện với VisitedBitmap cho không gian trạng thái lớn
+    def add(self, index):
+        if index in self:
+            return False
+        set.add(self, index)
+        return True
+
+
+class SparseTable(dict):
+    # Thay cho bytearray theo rank: phần tử chưa gán trả về giá trị mặc định
+    def __init__(self, default):
+        super().__init__()
+        self.default = default
+
+    def __missing__(self, key):
+        return self.default
+
+
+def new_parent_moves(size):
+    # Mảng uint8 theo rank: 0 = chưa có cha, d + 1 = ô trống đã đi theo hướng d
+    return bytearray(size)
+
+
+_rankers = {}
+
+def get_ranker(codec=codec):
+    if (codec.rows, codec.cols) not in _rankers:
+        _rankers[(codec.rows, codec.cols)] = Ranker(codec)
+    return _rankers[(codec.rows, codec.cols)]
+
+
+ranker = get_ranker()
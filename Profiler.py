@@ -0,0 +1,332 @@
+import os, sys, copy, io, argparse, statistics, threading, time, queue, traceback
+import cProfile, pstats, tracemalloc, linecache
+import multiprocessing
+from Algorithms import ALGORITHMS, find_algorithm, get_solver, initial_state_for, parse_state
+
+try:
+    import resource
+except ImportError:
+    # Windows không có module resource: chế độ rss không dùng được
+    resource = None
+
+# ======= PROFILER ======= #
+#
+# Đo từng thuật toán trong Algorithms.py từ dòng lệnh, không cần giao diện. Mỗi chế độ chỉ bật
+# đúng công cụ đo của nó, để tracemalloc / cProfile không làm chậm và sai lệch phép đo thời gian:
+#   - time:     perf_counter (thời gian thực) và process_time (CPU), lặp nhiều lần, lấy min / trung vị
+#   - rss:      RSS đỉnh bằng resource.getrusage, chạy trong tiến trình con riêng để không lẫn với
+#               bộ nhớ của các lần chạy trước (với HDA* tính thêm các tiến trình cháu)
+#   - memory:   tracemalloc; một luồng phụ chụp snapshot mỗi khi bộ nhớ đang dùng tăng thêm
+#               SNAPSHOT_GROWTH, lấy snapshot lớn nhất trừ đi snapshot trước khi giải, rồi gán
+#               từng chỗ cấp phát cho frontier / tập đã thăm theo dòng mã nguồn đã cấp phát nó
+#   - cprofile: cProfile + pstats, ghi thêm file .prof và file stack gộp (.folded) để vẽ flame graph
+#
+#   python Profiler.py --list
+#   python Profiler.py "A Start" --mode memory --walk 60 --rows 4 --cols 4
+#   python Profiler.py ida_star --mode cprofile --output ida
+
+MODES = ["time", "rss", "memory", "cprofile"]
+DEFAULT_STATE = [[2, 6, 5], [0, 8, 7], [4, 3, 1]]
+# ru_maxrss tính theo KB trên Linux, theo byte trên macOS
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+TRACE_FRAMES = 12
+SNAPSHOT_GROWTH = 1.1
+SAMPLE_SECONDS = 0.005
+
+# Gán chỗ cấp phát cho cấu trúc dữ liệu: đi từ frame trong cùng ra ngoài, dòng mã đầu tiên chứa
+# một từ khoá quyết định nhóm. Trạng thái con vừa sinh (successors) phần lớn nằm trong frontier.
+CATEGORIES = [
+    ("frontier", ("queue", "frontier", "push", "heap", "bucket", "stack", "codes", "successors", "neighbors",
+                  "append(child", "hs.append", "keys.append", "cursors", "children")),
+    ("closed", ("visited", "closed", "seen", "best_g", "g_table", "parent", "new_table", "table[", "depths", "transposition")),
+]
+
+
+def copy_state(name, state):
+    # Một số thuật toán sửa trạng thái đầu tại chỗ: mỗi lần chạy dùng một bản sao
+    return copy.deepcopy(initial_state_for(name, state))
+
+
+def measure_time(function, *args, **kwargs):
+    # (kết quả, thời gian thực, thời gian CPU của tiến trình này)
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def profile_time(name, state, repeat=5):
+    solver = get_solver(name)
+    walls, cpus = [], []
+    for _ in range(repeat):
+        path, wall, cpu = measure_time(solver, copy_state(name, state))
+        walls.append(wall)
+        cpus.append(cpu)
+    return {"steps": len(path) - 1 if path else None, "wall": walls, "cpu": cpus}
+
+
+# ======= RSS ======= #
+
+def _rss_worker(name, state, results):
+    # Lỗi (kể cả ImportError khi thiếu thư viện) được gửi về để tiến trình chính báo lại
+    try:
+        solver = get_solver(name)
+        state = copy_state(name, state)
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        path = solver(state)
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        results.put(("ok", (len(path) - 1 if path else None, before * RSS_UNIT, after * RSS_UNIT, children * RSS_UNIT)))
+    except BaseException as error:
+        results.put(("error", (isinstance(error, ImportError), str(error), traceback.format_exc())))
+
+
+def profile_rss(name, state):
+    if resource is None:
+        raise RuntimeError("Chế độ rss cần module resource (Linux / macOS)")
+    results = multiprocessing.Queue()
+    # Không để daemon: HDA* còn tự tạo tiến trình con
+    process = multiprocessing.Process(target=_rss_worker, args=(name, state, results))
+    process.start()
+    while True:
+        try:
+            status, payload = results.get(timeout=0.5)
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                # Kết quả gửi ngay trước khi thoát có thể vẫn đang trên đường
+                try:
+                    status, payload = results.get(timeout=1.0)
+                    break
+                except queue.Empty:
+                    raise RuntimeError(f"Tiến trình đo rss thoát với mã {process.exitcode} mà không trả kết quả")
+    process.join()
+    if status == "error":
+        missing, message, details = payload
+        if missing:
+            raise ImportError(message)
+        raise RuntimeError(f"Lỗi trong tiến trình đo rss:\n{details}")
+    steps, before, after, children = payload
+    # before: RSS đỉnh sau khi import (nền); after - before là phần tăng thêm do thuật toán
+    return {"steps": steps, "baseline": before, "peak": after, "growth": after - before, "children_peak": children}
+
+
+# ======= TRACEMALLOC ======= #
+
+class PeakSampler(threading.Thread):
+    # Chụp snapshot mỗi khi bộ nhớ đang dùng vượt mức lớn nhất đã chụp SNAPSHOT_GROWTH lần
+    def __init__(self, floor):
+        super().__init__(daemon=True)
+        self.floor = floor
+        self.snapshot = None
+        self.size = 0
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(SAMPLE_SECONDS):
+            current, _ = tracemalloc.get_traced_memory()
+            if current > max(self.size * SNAPSHOT_GROWTH, self.floor):
+                self.snapshot = tracemalloc.take_snapshot()
+                self.size = current
+
+
+def classify(traceback):
+    for frame in reversed(traceback):
+        line = linecache.getline(frame.filename, frame.lineno)
+        for category, words in CATEGORIES:
+            if any(word in line for word in words):
+                return category
+    return "other"
+
+
+def allocation_site(traceback):
+    # Frame trong cùng thuộc mã của dự án (bỏ qua thư viện chuẩn)
+    here = os.path.dirname(os.path.abspath(__file__))
+    for frame in reversed(traceback):
+        if os.path.dirname(os.path.abspath(frame.filename)) == here:
+            return frame
+    return traceback[-1]
+
+
+def profile_memory(name, state, top=10):
+    solver = get_solver(name)
+    state = copy_state(name, state)
+    tracemalloc.start(TRACE_FRAMES)
+    try:
+        baseline = tracemalloc.take_snapshot()
+        floor, _ = tracemalloc.get_traced_memory()
+        sampler = PeakSampler(floor)
+        sampler.start()
+        path = solver(state)
+        sampler.done.set()
+        sampler.join()
+        _, peak = tracemalloc.get_traced_memory()
+        # Thuật toán quá nhanh để luồng phụ kịp chụp: dùng snapshot sau khi giải (gần bằng 0)
+        snapshot = sampler.snapshot or tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, threading.__file__),
+              tracemalloc.Filter(False, linecache.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+    differences = snapshot.filter_traces(ignore).compare_to(baseline.filter_traces(ignore), "traceback")
+    groups = {category: [0, 0] for category, _ in CATEGORIES}
+    groups["other"] = [0, 0]
+    sites = {}
+    for difference in differences:
+        if difference.size_diff <= 0:
+            continue
+        category = classify(difference.traceback)
+        groups[category][0] += difference.size_diff
+        groups[category][1] += difference.count_diff
+        frame = allocation_site(difference.traceback)
+        key = (category, frame.filename, frame.lineno)
+        sites[key] = sites.get(key, 0) + difference.size_diff
+    top_sites = sorted(sites.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {"steps": len(path) - 1 if path else None, "peak": peak, "sampled": sampler.size - floor,
+            "groups": groups, "sites": top_sites}
+
+
+# ======= CPROFILE ======= #
+
+def frame_label(function):
+    filename, line, name = function
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapsed_stacks(stats, min_seconds=1e-6):
+    # pstats chỉ có cạnh gọi -> bị gọi: chia thời gian của hàm cho từng đường gọi theo tỉ lệ
+    # thời gian tích luỹ của cạnh đó (cách flameprof làm); bỏ vòng đệ quy và nhánh quá nhỏ
+    callees = {}
+    for function, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((function, edge[3]))
+    stacks = {}
+
+    def walk(function, stack, share):
+        _, _, own, total, _ = stats[function]
+        stack = stack + [frame_label(function)]
+        if own * share >= min_seconds:
+            key = ";".join(stack)
+            stacks[key] = stacks.get(key, 0.0) + own * share
+        for callee, edge_total in callees.get(function, []):
+            callee_total = stats[callee][3]
+            if frame_label(callee) in stack or not callee_total:
+                continue
+            child_share = share * edge_total / callee_total
+            if callee_total * child_share >= min_seconds:
+                walk(callee, stack, child_share)
+
+    for function, (_, _, _, _, callers) in stats.items():
+        if not callers:
+            walk(function, [], 1.0)
+    return stacks
+
+
+def profile_cprofile(name, state, top=20, output=None):
+    solver = get_solver(name)
+    state = copy_state(name, state)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    path = solver(state)
+    profiler.disable()
+
+    text = io.StringIO()
+    stats = pstats.Stats(profiler, stream=text)
+    stats.sort_stats("cumulative").print_stats(top)
+    files = []
+    if output:
+        stats.dump_stats(output + ".prof")
+        with open(output + ".folded", "w") as f:
+            # Mỗi dòng: "hàm ngoài;...;hàm trong micro_giây", dùng trực tiếp với flamegraph.pl / speedscope
+            for stack, seconds in sorted(collapsed_stacks(stats.stats).items()):
+                f.write(f"{stack} {round(seconds * 1e6)}\n")
+        files = [output + ".prof", output + ".folded"]
+    return {"steps": len(path) - 1 if path else None, "report": text.getvalue(), "files": files}
+
+
+# ======= BÁO CÁO ======= #
+
+def report(name, mode, result):
+    print(f"== {name} [{mode}]: số bước = {result['steps']} ==")
+    if mode == "time":
+        for label, values in [("thời gian thực", result["wall"]), ("thời gian CPU", result["cpu"])]:
+            print(f"  {label}: min = {min(values):.5f} giây, trung vị = {statistics.median(values):.5f} giây ({len(values)} lần)")
+    elif mode == "rss":
+        print(f"  RSS nền = {result['baseline'] / 1024 ** 2:.2f} MB, RSS đỉnh = {result['peak'] / 1024 ** 2:.2f} MB, "
+              f"tăng thêm = {result['growth'] / 1024 ** 2:.2f} MB")
+        if result["children_peak"]:
+            print(f"  RSS đỉnh của tiến trình con = {result['children_peak'] / 1024 ** 2:.2f} MB")
+    elif mode == "memory":
+        print(f"  tracemalloc: đỉnh = {result['peak'] / 1024 ** 2:.3f} MB, snapshot lớn nhất = {result['sampled'] / 1024 ** 2:.3f} MB")
+        for category, (size, count) in result["groups"].items():
+            print(f"  {category:>8}: {size / 1024 ** 2:9.3f} MB, {count:>9} khối")
+        for (category, filename, line), size in result["sites"]:
+            print(f"    {size / 1024:10.1f} KB  {category:>8}  {os.path.basename(filename)}:{line}  {linecache.getline(filename, line).strip()}")
+    elif mode == "cprofile":
+        print(result["report"].rstrip())
+        for path in result["files"]:
+            print(f"  Đã ghi {path}")
+
+
+def profile(name, mode, state, repeat=5, top=20, output=None):
+    name = find_algorithm(name)
+    if mode == "time":
+        return profile_time(name, state, repeat)
+    if mode == "rss":
+        return profile_rss(name, state)
+    if mode == "memory":
+        return profile_memory(name, state, top)
+    if mode == "cprofile":
+        return profile_cprofile(name, state, top, output)
+    raise ValueError(f"Không có chế độ đo: {mode}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo thời gian / bộ nhớ / profile từng thuật toán, không cần giao diện")
+    parser.add_argument("algorithm", nargs="*", help="tên hiển thị hoặc tên hàm; bỏ trống để chạy mọi thuật toán")
+    parser.add_argument("--mode", choices=MODES + ["all"], default="time")
+    parser.add_argument("--state", help='trạng thái đầu, ví dụ "2 6 5 0 8 7 4 3 1"')
+    parser.add_argument("--rows", type=int)
+    parser.add_argument("--cols", type=int)
+    parser.add_argument("--walk", type=int, help="tạo trạng thái bằng số bước đi ngẫu nhiên từ đích")
+    parser.add_argument("--seed", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", help="tiền tố file .prof / .folded cho chế độ cprofile")
+    parser.add_argument("--list", action="store_true", help="liệt kê các thuật toán")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for display, (module, function, _) in ALGORITHMS.items():
+            print(f"{display:<42} {module}.{function}")
+        return
+    if args.state:
+        try:
+            state = parse_state(args.state, args.rows, args.cols)
+        except ValueError as error:
+            parser.error(str(error))
+    elif args.walk is not None:
+        from FifteenPuzzle import random_instances
+        state = random_instances(1, args.walk, args.seed, args.rows or 3, args.cols or 3)[0]
+    else:
+        state = DEFAULT_STATE
+    try:
+        names = [find_algorithm(name) for name in args.algorithm] or list(ALGORITHMS)
+    except KeyError as error:
+        parser.error(f"{error.args[0]} (có: {', '.join(function for _, function, _ in ALGORITHMS.values())})")
+    modes = MODES if args.mode == "all" else [args.mode]
+    for name in names:
+        for mode in modes:
+            output = f"{args.output}_{ALGORITHMS[name][1]}" if args.output and len(names) > 1 else args.output
+            try:
+                result = profile(name, mode, state, args.repeat, args.top, output)
+            except ImportError as error:
+                # Thuật toán cần thư viện chưa cài (graphviz, numpy): bỏ qua, không dừng cả lượt
+                print(f"== {name} [{mode}]: bỏ qua, thiếu thư viện ({error}) ==")
+                break
+            report(name, mode, result)
+
+
+if __name__ == "__main__":
+    main()
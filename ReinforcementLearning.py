@@ -1,6 +1,8 @@
 import numpy as np
-import random
+import random, timeit
 from collections import defaultdict
+from BoardEncoding import codec_for
+from SearchStats import SearchStats, finish
 
 class Puzzle:
     def __init__(self, state):
@@ -8,8 +10,8 @@ class Puzzle:
         self.blank_pos = self.find_blank()
 
     def find_blank(self):
-        for i in range(3):
-            for j in range(3):
+        for i in range(len(self.state)):
+            for j in range(len(self.state[0])):
                 if self.state[i][j] == 0:
                     return (i, j)
         return None
@@ -19,7 +21,7 @@ class Puzzle:
         bi, bj = self.blank_pos
         for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
             ni, nj = bi + di, bj + dj
-            if 0 <= ni < 3 and 0 <= nj < 3:
+            if 0 <= ni < len(self.state) and 0 <= nj < len(self.state[0]):
                 actions.append((di, dj))
         return actions
 
@@ -34,20 +36,16 @@ class Puzzle:
         return tuple(tuple(row) for row in self.state)
 
     def is_goal(self):
-        return self.state == [[1, 2, 3], [4, 5, 6], [7, 8, 0]]
+        return self.state == codec_for(self.state).goal_state
 
     def calculate_manhattan_distance(self):
-        goal = {
-            1: (0, 0), 2: (0, 1), 3: (0, 2),
-            4: (1, 0), 5: (1, 1), 6: (1, 2),
-            7: (2, 0), 8: (2, 1), 0: (2, 2)
-        }
+        rows, cols = len(self.state), len(self.state[0])
         distance = 0
-        for i in range(3):
-            for j in range(3):
+        for i in range(rows):
+            for j in range(cols):
                 value = self.state[i][j]
                 if value != 0:
-                    goal_x, goal_y = goal[value]
+                    goal_x, goal_y = divmod(value - 1, cols)
                     distance += abs(goal_x - i) + abs(goal_y - j)
         return distance
 
@@ -59,6 +57,10 @@ class QLearningSolver:
         self.epsilon_decay = epsilon_decay
         self.q_table = defaultdict(lambda: defaultdict(float))
         self.visited_states = set()
+        # Số liệu huấn luyện, cộng dồn qua các lần train
+        self.episodes = 0
+        self.updates = 0
+        self.train_seconds = 0.0
 
     def choose_action(self, state, actions):
         if random.uniform(0, 1) < self.epsilon:
@@ -74,6 +76,8 @@ class QLearningSolver:
         self.q_table[state][action] += self.alpha * (reward + self.gamma * max_next_q - current_q)
 
     def train(self, state, episodes=500):
+        start_time = timeit.default_timer()
+        updates = 0
         puzzle = Puzzle(state)
         for episode in range(episodes):
             state = puzzle.to_tuple()
@@ -104,6 +108,7 @@ class QLearningSolver:
                 # Cập nhật Q-value
                 next_actions = next_puzzle.get_actions()
                 self.update_q(state, action, reward, next_state, next_actions)
+                updates += 1
 
                 # Theo dõi các trạng thái đã thăm
                 self.visited_states.add(next_state)
@@ -119,19 +124,36 @@ class QLearningSolver:
             # Thêm thông báo tiến trình sau mỗi 50 tập để theo dõi quá trình huấn luyện
             if episode % 50 == 0:
                 print(f"Hoàn thành tập {episode}/{episodes}")
-
-
-    def get_solution_path(self, state):
+        self.episodes += episodes
+        self.updates += updates
+        self.train_seconds += timeit.default_timer() - start_time
+
+    def get_solution_path(self, state, stats=False):
+        # stats: phases "train" (thời gian các lần train trước đó) và "extract"; expanded = số bước đi theo Q
+        info = SearchStats("q_learning")
+        info.phases["train"] = self.train_seconds
+        info.extra.update(episodes=self.episodes, updates=self.updates, q_states=len(self.q_table))
+        expanded = generated = 0
         puzzle = Puzzle(state)
         path = []
         while not puzzle.is_goal():
             state = puzzle.to_tuple()
             actions = puzzle.get_actions()
+            expanded += 1
+            generated += len(actions)
             best_action = self.choose_action(state, actions)
             path.append(puzzle.state)
             puzzle = puzzle.move(best_action)
         path.append(puzzle.state)
-        return path
+        info.count(expanded, generated, peak_frontier=1)
+        return finish(path, info, stats, "extract")
+
+
+def q_learning_solve(initial_state, episodes=500, stats=False):
+    # Huấn luyện trên chính trạng thái đầu rồi đi theo Q-table
+    q_solver = QLearningSolver()
+    q_solver.train(initial_state, episodes=episodes)
+    return q_solver.get_solution_path(initial_state, stats=stats)
 
 if __name__ == "__main__":
     initial_state = [[1, 2, 3], [4, 0, 6], [7, 5, 8]]
@@ -0,0 +1,209 @@
+import heapq, timeit
+from BoardEncoding import codec_for
+from PermutationRank import get_ranker
+from Heuristics import get_heuristic
+
+# ======= SMA* (MEMORY-BOUNDED A*) ======= #
+#
+# A* trên cây tìm kiếm với số nút giữ trong bộ nhớ không vượt quá max_nodes
+# (hoặc max_bytes / NODE_BYTES). Nút lá được mở rộng theo f nhỏ nhất, sâu nhất.
+# Khi vượt ngân sách: bỏ nút lá tệ nhất (f lớn nhất, nông nhất), cha nhớ lại f của nó
+# (forgotten) và lại được xếp vào hàng đợi để sinh lại con đó khi cần; f của nút cha luôn được cập nhật ngược lên
+# (backup) = min f của các con, kể cả con đã bị bỏ.
+# Nếu bộ nhớ đủ chứa đường đi tối ưu thì kết quả vẫn tối ưu.
+
+INFINITY = float('inf')
+
+# Ước lượng bộ nhớ của một nút (đối tượng _Node + code + mục trong hai heap, kể cả mục cũ
+# chưa dọn), đo bằng tracemalloc trên 15-puzzle (~850 byte) rồi làm tròn lên
+NODE_BYTES = 1024
+
+
+class _Node:
+    __slots__ = ("code", "g", "f", "depth", "parent", "children", "forgotten", "open", "stamp")
+
+    def __init__(self, code, g, f, parent):
+        self.code = code
+        self.g = g
+        self.f = f
+        self.depth = parent.depth + 1 if parent else 0
+        self.parent = parent
+        self.children = []
+        self.forgotten = None
+        self.open = False
+        self.stamp = 0
+
+
+class SMAStar:
+    def __init__(self, start_state, heuristic="manhattan", max_nodes=50000, max_bytes=None):
+        self.codec = codec_for(start_state)
+        self.ranker = get_ranker(self.codec)
+        self.h = get_heuristic(heuristic, self.codec)
+        self.start = self.codec.encode(start_state)
+        if max_bytes is not None:
+            max_nodes = max_bytes // NODE_BYTES
+        if max_nodes < 2:
+            raise ValueError("Ngân sách bộ nhớ quá nhỏ cho SMA*")
+        self.max_nodes = max_nodes
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.dropped = 0
+        self.peak_nodes = 0
+
+    @property
+    def peak_frontier(self):
+        return self.peak_nodes
+
+    def pop_valid(self, heap, leaves_only=False):
+        while heap:
+            entry = heap[0]
+            node = entry[4]
+            if node.open and entry[3] == node.stamp and not (leaves_only and node.children):
+                return node
+            heapq.heappop(heap)
+        return None
+
+    def compact(self):
+        # Mục cũ trong heap giữ tham chiếu tới nút đã bỏ: dọn khi chiếm quá nửa
+        if len(self.best) > 2 * self.open_nodes + 64:
+            self.best = [entry for entry in self.best if entry[4].open and entry[3] == entry[4].stamp]
+            self.worst = [entry for entry in self.worst if entry[4].open and entry[3] == entry[4].stamp and not entry[4].children]
+            heapq.heapify(self.best)
+            heapq.heapify(self.worst)
+
+    def set_open(self, node):
+        # Nút còn mở rộng được: nút lá (theo f), hoặc nút có con đã bị bỏ (theo f nhỏ nhất đã nhớ).
+        # Chỉ nút lá mới nằm trong heap worst để bị bỏ
+        if not node.open:
+            self.open_nodes += 1
+        node.open = True
+        node.stamp += 1
+        self.counter += 1
+        if node.children:
+            heapq.heappush(self.best, (min(node.forgotten.values()), -node.depth, self.counter, node.stamp, node))
+        else:
+            heapq.heappush(self.best, (node.f, -node.depth, self.counter, node.stamp, node))
+            heapq.heappush(self.worst, (-node.f, node.depth, self.counter, node.stamp, node))
+
+    def set_closed(self, node):
+        if node.open:
+            self.open_nodes -= 1
+        node.open = False
+
+    def backup(self, node):
+        # f(n) = min f của các con (trong bộ nhớ và đã bị bỏ), lan ngược lên gốc
+        while node is not None and (node.children or node.forgotten):
+            f = min([child.f for child in node.children] + (list(node.forgotten.values()) if node.forgotten else []))
+            if f == node.f:
+                break
+            node.f = f
+            if node.open:
+                self.set_open(node)
+            node = node.parent
+
+    def drop_worst(self):
+        worst = self.pop_valid(self.worst, leaves_only=True)
+        if worst is None or worst.parent is None:
+            return False
+        parent = worst.parent
+        self.set_closed(worst)
+        parent.children.remove(worst)
+        if parent.forgotten is None:
+            parent.forgotten = {}
+        parent.forgotten[worst.code] = worst.f
+        worst.parent = None
+        self.nodes -= 1
+        self.dropped += 1
+        # Cha có con bị bỏ nên lại mở rộng được (f của cha không đổi vì đã tính cả con này)
+        self.set_open(parent)
+        return True
+
+    def expand(self, node):
+        # Sinh các con chưa có trong bộ nhớ (tất cả nếu là nút lá, các con đã bị bỏ nếu không)
+        codec, h = self.codec, self.h
+        key = h.evaluate(node.code)[1]
+        forgotten = node.forgotten or {}
+        in_memory = {child.code for child in node.children}
+        grandparent = node.parent.code if node.parent else None
+        cost = node.g + 1
+        for child_code in codec.neighbors(node.code):
+            if child_code == grandparent or child_code in in_memory:
+                self.duplicates += 1
+                continue
+            if node.depth + 1 >= self.max_nodes - 1 and child_code != codec.goal:
+                # Đường đi dài hơn ngân sách không thể giữ trọn trong bộ nhớ
+                f = INFINITY
+            else:
+                f = max(node.f, cost + h.update(key, node.code, child_code)[0], forgotten.get(child_code, 0))
+            child = _Node(child_code, cost, f, node)
+            self.generated += 1
+            node.children.append(child)
+            self.nodes += 1
+            self.set_open(child)
+        node.forgotten = None
+        if not node.children:
+            # Ngõ cụt: giữ làm nút lá với f vô cùng, sẽ bị bỏ đầu tiên
+            node.f = INFINITY
+            self.set_open(node)
+            self.backup(node.parent)
+            return
+        self.set_closed(node)
+        self.backup(node)
+
+    def solve(self):
+        codec = self.codec
+        # Không giải được thì SMA* sinh lại các nút bị bỏ mãi, không bao giờ dừng
+        if not self.ranker.is_solvable(self.start):
+            return []
+        root = _Node(self.start, 0, self.h(self.start), None)
+        self.best, self.worst = [], []
+        self.counter = 0
+        self.open_nodes = 0
+        self.nodes = 1
+        self.set_open(root)
+
+        while True:
+            node = self.pop_valid(self.best)
+            if node is None or node.f == INFINITY:
+                return []
+            if node.code == codec.goal:
+                path = []
+                while node is not None:
+                    path.append(codec.decode(node.code))
+                    node = node.parent
+                return path[::-1]
+
+            self.expand(node)
+            self.expanded += 1
+            while self.nodes > self.max_nodes:
+                if not self.drop_worst():
+                    break
+            self.peak_nodes = max(self.peak_nodes, self.nodes)
+            self.compact()
+
+
+if __name__ == "__main__":
+    import tracemalloc
+    from ObservableEnvironmet import astar
+    from FifteenPuzzle import random_instances
+
+    instances = [[[2, 6, 5], [0, 8, 7], [4, 3, 1]], [[8, 6, 7], [2, 5, 4], [3, 0, 1]]] + random_instances(2, walk=40)
+    for initial_state in instances:
+        tracemalloc.start()
+        path = astar(initial_state)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"astar: số bước = {len(path) - 1}, bộ nhớ tối đa = {peak_memory / 1024:.1f} KB")
+        for max_bytes in [400 * 1024, 1024 * 1024, 4 * 1024 * 1024]:
+            search = SMAStar(initial_state, max_bytes=max_bytes)
+            search.h(search.start)
+            # Bảng của heuristic không tính vào ngân sách của SMA*
+            tracemalloc.start()
+            start_time = timeit.default_timer()
+            path = search.solve()
+            end_time = timeit.default_timer()
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"  SMA* ngân sách {max_bytes / 1024:.0f} KB: số bước = {len(path) - 1}, bộ nhớ tối đa = {peak_memory / 1024:.1f} KB, "
+                  f"mở rộng = {search.expanded}, bỏ = {search.dropped}, thời gian = {(end_time - start_time):.5f} giây")
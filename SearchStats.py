@@ -0,0 +1,106 @@
+import math, timeit
+
+# ======= SEARCH STATS ======= #
+#
+# Số liệu công việc của một lần giải. Mọi thuật toán nhận stats=False: bật lên thì trả về
+# SearchResult (vẫn là list các trạng thái như đường đi cũ, kèm .stats), tắt thì trả về đường đi.
+# Bộ đếm là biến int cục bộ trong vòng lặp (hoặc thuộc tính có sẵn của engine), chỉ được gom vào
+# SearchStats khi kết thúc, nên bật hay tắt đều gần như không tốn gì thêm.
+#   - expanded: số nút đã sinh con          - generated: số nút con sinh ra
+#   - duplicates: nút con bị bỏ vì đã gặp / không tốt hơn
+#   - peak_frontier: kích thước lớn nhất của open list / tầng / ngăn xếp
+#   - phases: {tên giai đoạn: giây}, ghi bằng mark() ở ranh giới các giai đoạn
+#   - extra: số liệu riêng của thuật toán (số lượt, số episode, ...)
+
+
+class SearchStats:
+    def __init__(self, algorithm=""):
+        self.algorithm = algorithm
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.peak_frontier = 0
+        self.depth = None
+        self.phases = {}
+        self.extra = {}
+        self.last = timeit.default_timer()
+
+    def mark(self, phase):
+        # Cộng thời gian từ lần mark trước vào giai đoạn phase
+        now = timeit.default_timer()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def count(self, expanded=0, generated=0, duplicates=0, peak_frontier=0):
+        self.expanded += expanded
+        self.generated += generated
+        self.duplicates += duplicates
+        self.peak_frontier = max(self.peak_frontier, peak_frontier)
+        return self
+
+    def absorb(self, engine):
+        # Lấy bộ đếm có sẵn của engine (expanded là list theo tiến trình với HDA*)
+        expanded = engine.expanded
+        return self.count(sum(expanded) if isinstance(expanded, list) else expanded, getattr(engine, "generated", 0),
+                          getattr(engine, "duplicates", 0), getattr(engine, "peak_frontier", 0))
+
+    def branching_factor(self):
+        # b* của Russell & Norvig: generated + 1 = 1 + b + b^2 + ... + b^d, giải bằng chia đôi
+        d, n = self.depth, self.generated
+        if not d or n <= 0:
+            return None
+
+        def total(b):
+            if b == 1.0:
+                return d
+            if d * math.log(b) > 700:
+                return math.inf
+            return b * (b ** d - 1) / (b - 1)
+
+        low, high = 0.0, max(1.0, float(n))
+        for _ in range(100):
+            middle = (low + high) / 2
+            if total(middle) < n:
+                low = middle
+            else:
+                high = middle
+        return (low + high) / 2
+
+    def total_time(self):
+        return sum(self.phases.values())
+
+    def as_dict(self):
+        return {"algorithm": self.algorithm, "expanded": self.expanded, "generated": self.generated,
+                "duplicates": self.duplicates, "peak_frontier": self.peak_frontier, "depth": self.depth,
+                "branching_factor": self.branching_factor(), "phases": dict(self.phases), **self.extra}
+
+    def report(self):
+        line = (f"{self.algorithm}: số bước = {self.depth}, mở rộng = {self.expanded}, sinh ra = {self.generated}, "
+                f"trùng bị bỏ = {self.duplicates}, frontier lớn nhất = {self.peak_frontier}")
+        b = self.branching_factor()
+        if b is not None:
+            line += f", b* = {b:.3f}"
+        lines = [line, "    " + ", ".join(f"{name} = {seconds:.5f} giây" for name, seconds in self.phases.items())]
+        if self.extra:
+            lines.append("    " + ", ".join(f"{name} = {value}" for name, value in self.extra.items()))
+        return "\n".join(lines)
+
+
+class SearchResult(list):
+    # Đường đi (list trạng thái) kèm số liệu: dùng được ở mọi chỗ đang dùng đường đi
+    def __init__(self, path, stats):
+        super().__init__(path)
+        self.stats = stats
+
+    @property
+    def path(self):
+        return list(self)
+
+
+def finish(path, info, stats, phase="search"):
+    # Kết thúc giai đoạn cuối; stats=True thì trả về SearchResult
+    if not stats:
+        return path
+    info.mark(phase)
+    info.depth = len(path) - 1 if path else None
+    return SearchResult(path or [], info)
@@ -0,0 +1,278 @@
+import sys, json, time, sqlite3, argparse
+from collections import OrderedDict
+from BoardEncoding import codec_for
+from Algorithms import FILL_ALGORITHMS, ALGORITHMS, find_algorithm, get_solver
+from SearchStats import SearchStats, finish
+
+# ======= SOLUTION CACHE ======= #
+#
+# Bộ nhớ đệm lời giải đặt trước mọi thuật toán: khoá = thuật toán + tham số + mã bàn cờ (BoardEncoding).
+#   - tầng 1: LRU trong bộ nhớ (OrderedDict, tối đa max_entries khoá)
+#   - tầng 2 (tuỳ chọn): sqlite, dùng chung giữa các lần chạy và giữa các tiến trình (WAL)
+#   - chỉ lưu dãy hướng đi của ô trống ("UDLR", giống BatchSolve.py), đường đi dựng lại bằng
+#     codec.apply; lời giải rỗng (không tìm được) cũng được lưu
+#   - đối xứng: với bàn vuông, chuyển vị rồi đánh số lại các ô (ô ở vị trí đích (r, c) thành ô ở
+#     vị trí đích (c, r)) giữ nguyên đích và đổi U <-> L, D <-> R. Với thuật toán tối ưu (SYMMETRIC),
+#     hai bàn chuyển vị của nhau dùng chung một khoá (mã nhỏ hơn): lời giải tối ưu của bàn này suy ra
+#     lời giải tối ưu của bàn kia bằng cách đổi hướng đi. Thuật toán không tối ưu (DFS, Greedy, leo
+#     đồi, ...) có thể cho kết quả khác trên bàn chuyển vị nên dùng khoá riêng cho từng bàn; SMA* cũng
+#     vậy vì chỉ tối ưu khi ngân sách bộ nhớ đủ lớn
+#   - thuật toán ngẫu nhiên / phụ thuộc thời gian và bài toán điền số không qua bộ đệm (UNCACHED),
+#     tham số không ghi được ra JSON (hàm heuristic, đối tượng checkpoint) cũng vậy
+#   - stats=True khi trúng bộ đệm trả về CachedStats: không có lần tìm kiếm nên không có bộ đếm
+#
+#   cache = SolutionCache(path="solutions.sqlite")
+#   solver = get_solver("astar", cache=cache)      # hoặc cache.solver("astar")
+#   solver(state); print(cache.report())
+
+MOVE_LETTERS = "UDLR"
+# Hướng tương ứng sau khi chuyển vị: lên <-> trái, xuống <-> phải
+TRANSPOSED_DIRECTION = [2, 3, 0, 1]
+UNCACHED = {"Stochastic", "Simulated Annealing", "Genetic Algorithm", "Q Learning", "ARA Start",
+            "No Observable", "Partially Observable"} | FILL_ALGORITHMS
+SYMMETRIC = {"BFS", "UCS", "IDS", "A Start", "IDA Start", "Bidirectional BFS", "Bidirectional A Start",
+             "HDA Start", "Distance Database"}
+MISS = object()
+
+
+class CachedStats(SearchStats):
+    # Lời giải lấy từ bộ đệm: không có lần tìm kiếm nào nên các bộ đếm là None chứ không phải 0
+    def __init__(self, algorithm, source):
+        super().__init__(algorithm)
+        self.expanded = self.generated = self.duplicates = self.peak_frontier = None
+        self.extra["cache"] = source
+
+    def branching_factor(self):
+        return None
+
+    def report(self):
+        return f"{self.algorithm}: lấy từ bộ đệm ({self.extra['cache']}), số bước = {self.depth}, tra {self.total_time():.5f} giây"
+
+
+def options_key(options):
+    # Tham số dạng JSON cho khoá; None nếu không ghi được (không dùng bộ đệm cho lần gọi đó)
+    try:
+        return json.dumps(options or {}, sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+
+
+class SolutionCache:
+    def __init__(self, max_entries=10000, path=None, symmetry=True):
+        self.max_entries = max_entries
+        self.symmetry = symmetry
+        self.memory = OrderedDict()
+        self.path = path
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, moves TEXT)")
+        self.relabel = {}
+        self.memory_hits = self.disk_hits = self.misses = 0
+        self.symmetric_hits = self.evictions = self.stores = self.bypassed = 0
+        self.lookup_seconds = self.lookup_max = 0.0
+        self.last = None
+
+    # ----- khoá ----- #
+
+    def transposed(self, codec, code):
+        # Mã của bàn chuyển vị + đánh số lại; bảng đổi nhãn tính một lần cho mỗi kích thước
+        n = codec.rows
+        if n not in self.relabel:
+            self.relabel[n] = [0] + [(tile - 1) % n * n + (tile - 1) // n + 1 for tile in range(1, n * n)]
+        labels = self.relabel[n]
+        state = codec.decode(code)
+        return codec.encode([[labels[state[i][j]] for i in range(n)] for j in range(n)])
+
+    def key(self, name, state, options):
+        # (khoá, codec, bàn có phải là bản chuyển vị của bàn trong khoá không); options đã qua options_key
+        codec = codec_for(state)
+        code = codec.encode(state)
+        flipped = False
+        if self.symmetry and name in SYMMETRIC and codec.rows == codec.cols:
+            other = self.transposed(codec, code)
+            if other < code:
+                code, flipped = other, True
+        _, function, _ = ALGORITHMS[name]
+        return f"{function}|{options}|{codec.rows}x{codec.cols}|{code}", codec, flipped
+
+    # ----- đọc / ghi ----- #
+
+    def lookup(self, key):
+        moves = self.memory.get(key, MISS)
+        if moves is not MISS:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            self.last = "memory"
+            return moves
+        if self.db is not None:
+            row = self.db.execute("SELECT moves FROM solutions WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.disk_hits += 1
+                self.last = "disk"
+                self.remember(key, row[0])
+                return row[0]
+        self.misses += 1
+        self.last = "miss"
+        return MISS
+
+    def remember(self, key, moves):
+        self.memory[key] = moves
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, name, state, options=None):
+        # Đường đi (list trạng thái, [] nếu lần giải trước không tìm được) hoặc MISS
+        start_time = time.perf_counter()
+        options = options_key(options)
+        if options is None:
+            return MISS
+        key, codec, flipped = self.key(find_algorithm(name), state, options)
+        moves = self.lookup(key)
+        if moves is not MISS:
+            if flipped:
+                self.symmetric_hits += 1
+            path = self.replay(codec, state, moves, flipped)
+        else:
+            path = MISS
+        elapsed = time.perf_counter() - start_time
+        self.lookup_seconds += elapsed
+        self.lookup_max = max(self.lookup_max, elapsed)
+        return path
+
+    def put(self, name, state, options, path):
+        options = options_key(options)
+        if options is None:
+            return False
+        key, codec, flipped = self.key(find_algorithm(name), state, options)
+        moves = self.moves_of(codec, state, path, flipped) if path else None
+        if moves is MISS:
+            return False
+        self.remember(key, moves)
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO solutions (key, moves) VALUES (?, ?)", (key, moves))
+        self.stores += 1
+        return True
+
+    def moves_of(self, codec, state, path, flipped):
+        # Hướng đi theo bàn của khoá; MISS nếu đường đi không phải dãy nước đi hợp lệ từ state
+        # (không lưu được, ví dụ GA bắt đầu từ cá thể tốt nhất chứ không phải từ state)
+        code = codec.encode(state)
+        if codec.encode(path[0]) != code:
+            return MISS
+        letters = []
+        for next_state in path[1:]:
+            child = codec.encode(next_state)
+            direction = next((d for d, c in codec.successors(code) if c == child), None)
+            if direction is None:
+                return MISS
+            letters.append(MOVE_LETTERS[TRANSPOSED_DIRECTION[direction] if flipped else direction])
+            code = child
+        return "".join(letters)
+
+    def replay(self, codec, state, moves, flipped):
+        if moves is None:
+            return []
+        code = codec.encode(state)
+        path = [codec.decode(code)]
+        for letter in moves:
+            direction = MOVE_LETTERS.index(letter)
+            code = codec.apply(code, TRANSPOSED_DIRECTION[direction] if flipped else direction)
+            path.append(codec.decode(code))
+        return path
+
+    # ----- bọc thuật toán ----- #
+
+    def solver(self, name):
+        # Cùng cách gọi với get_solver: solver(state, **options), stats=True vẫn trả về SearchResult
+        name = find_algorithm(name)
+        solve = get_solver(name)
+
+        def bypass(state, **options):
+            self.bypassed += 1
+            self.last = "bypass"
+            return solve(state, **options)
+        if name in UNCACHED:
+            return bypass
+
+        _, function, _ = ALGORITHMS[name]
+
+        def cached(state, stats=False, **options):
+            if options_key(options) is None:
+                return bypass(state, stats=stats, **options)
+            info = CachedStats(function, None)
+            path = self.get(name, state, options)
+            if path is not MISS:
+                info.extra["cache"] = self.last
+                return finish(path, info, stats, "cache")
+            path = solve(state, stats=stats, **options)
+            self.put(name, state, options, path)
+            return path
+        return cached
+
+    # ----- số liệu ----- #
+
+    def lookups(self):
+        return self.memory_hits + self.disk_hits + self.misses
+
+    def hit_rate(self):
+        lookups = self.lookups()
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def as_dict(self):
+        lookups = self.lookups()
+        return {"lookups": lookups, "memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "hit_rate": self.hit_rate(), "symmetric_hits": self.symmetric_hits, "evictions": self.evictions,
+                "stores": self.stores, "bypassed": self.bypassed, "entries": len(self.memory),
+                "lookup_mean": self.lookup_seconds / lookups if lookups else None, "lookup_max": self.lookup_max}
+
+    def report(self):
+        lookups = self.lookups()
+        line = (f"Bộ đệm: {lookups} lần tra, trúng {self.hit_rate():.1%} (bộ nhớ {self.memory_hits}, đĩa {self.disk_hits}, "
+                f"đối xứng {self.symmetric_hits}), trượt {self.misses}, loại bỏ {self.evictions}, "
+                f"{len(self.memory)}/{self.max_entries} khoá")
+        if lookups:
+            line += f", tra trung bình {self.lookup_seconds / lookups * 1e6:.1f} µs, lớn nhất {self.lookup_max * 1e6:.1f} µs"
+        if self.bypassed:
+            line += f", không qua bộ đệm {self.bypassed}"
+        return line
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+def main(argv=None):
+    from Algorithms import parse_state
+
+    parser = argparse.ArgumentParser(description="Xem / xoá bộ đệm lời giải trên đĩa")
+    parser.add_argument("path", help="file sqlite")
+    parser.add_argument("--clear", action="store_true")
+    parser.add_argument("--lookup", nargs=2, metavar=("ALGORITHM", "STATE"), help='ví dụ: astar "2 6 5 0 8 7 4 3 1"')
+    args = parser.parse_args(argv)
+
+    cache = SolutionCache(path=args.path)
+    try:
+        if args.clear:
+            cache.db.execute("DELETE FROM solutions")
+            print("Đã xoá bộ đệm")
+        if args.lookup:
+            path = cache.get(args.lookup[0], parse_state(args.lookup[1]))
+            print("Không có trong bộ đệm" if path is MISS else f"{len(path) - 1} bước" if path else "Đã lưu: không tìm được lời giải")
+        count, = cache.db.execute("SELECT COUNT(*) FROM solutions").fetchone()
+        print(f"{args.path}: {count} lời giải")
+        for function, total in cache.db.execute(
+                "SELECT substr(key, 1, instr(key, '|') - 1), COUNT(*) FROM solutions GROUP BY 1 ORDER BY 2 DESC"):
+            print(f"    {function}: {total}")
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,395 @@
+import sys, json, math, time, signal, asyncio, argparse, itertools, multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from Algorithms import ALGORITHMS, FILL_ALGORITHMS, find_algorithm, get_solver
+from BatchSolve import install_alarm, run_job
+from InstanceGenerator import check_state
+from SolutionCache import SolutionCache
+
+# ======= SOLVER SERVICE ======= #
+#
+# Dịch vụ giải cục bộ cho các tiến trình khác trên máy: HTTP/JSON qua TCP hoặc Unix socket,
+# chỉ dùng asyncio (không cần thư viện web). Thuật toán chạy trong ProcessPoolExecutor, vòng lặp
+# sự kiện chỉ nhận / trả yêu cầu.
+#   - POST /solve   {"algorithm": "astar", "state": [[...]], "timeout": 5, "options": {...}, "id": "..."}
+#   - POST /cancel  {"id": "..."}
+#   - GET  /stats   độ trễ p50 / p90 / p99, độ sâu hàng đợi, số yêu cầu gộp
+#   - GET  /algorithms
+#   - các yêu cầu cùng thuật toán + bảng + tham số + timeout đang chạy được gộp vào một lần tính
+#     (hạn của lần tính là hạn của yêu cầu đầu tiên, không muộn hơn hạn của các yêu cầu gộp vào);
+#     lần tính chỉ bị huỷ khi mọi yêu cầu đang chờ nó đều huỷ / ngắt kết nối
+#   - timeout là ngân sách cho cả yêu cầu (chờ hàng đợi + giải); phần còn lại khi tới lượt được
+#     chuyển cho tiến trình con (SIGALRM như BatchSolve.py), nên bảng quá hạn không giữ tiến trình
+#   - yêu cầu huỷ khi còn trong hàng đợi thì không bao giờ được gửi tới tiến trình con; đang chạy
+#     thì tiến trình con vẫn chạy tới hết ngân sách, kết quả bị bỏ
+#   - --cache [FILE]: SolutionCache trong mỗi tiến trình con (FILE sqlite dùng chung); /stats có tỉ lệ trúng
+#
+#   python SolverService.py --port 8765 --workers 4
+#   curl -s localhost:8765/solve -d '{"algorithm": "ida_star", "state": [[2,6,5],[0,8,7],[4,3,1]]}'
+#   curl -s localhost:8765/stats
+
+DEFAULT_TIMEOUT = 10.0
+MAX_TIMEOUT = 120.0
+# Thời gian thêm cho việc gửi / nhận kết quả từ tiến trình con sau khi hết ngân sách
+GRACE_SECONDS = 0.5
+MAX_BODY = 1024 ** 2
+HEADER_SECONDS = 10.0
+LATENCY_HISTORY = 10000
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+_solvers = {}
+_cache = None
+
+
+def _init_worker(cache):
+    # cache: (file sqlite hoặc None, số khoá trong bộ nhớ), None = không dùng bộ đệm
+    global _cache
+    install_alarm()
+    if cache is not None:
+        _cache = SolutionCache(cache[1], cache[0])
+
+
+def _solve(name, state, options, timeout, full_path):
+    # Chạy trong tiến trình con; giữ lại hàm giải đã import cho các lần sau
+    if name not in _solvers:
+        # Import lỗi (thiếu numpy, graphviz): trả về như lỗi của run_job thay vì làm hỏng yêu cầu
+        try:
+            _solvers[name] = get_solver(name, cache=_cache)
+        except Exception as error:
+            return {"status": "error", "error": repr(error), "seconds": 0.0}
+    solver = _solvers[name]
+    if _cache is None:
+        return run_job(lambda start_state: solver(start_state, **options), state, timeout, full_path)
+    _cache.last = None
+    result = run_job(lambda start_state: solver(start_state, **options), state, timeout, full_path)
+    if _cache.last:
+        result["cache"] = _cache.last
+    return result
+
+
+def percentile(values, p):
+    # values đã sắp xếp; nearest-rank
+    if not values:
+        return None
+    return values[max(0, min(len(values) - 1, math.ceil(p / 100 * len(values)) - 1))]
+
+
+class RequestError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class SolverService:
+    def __init__(self, workers=None, default_timeout=DEFAULT_TIMEOUT, max_timeout=MAX_TIMEOUT, max_queue=1000, cache=None):
+        # spawn: tiến trình con không thừa hưởng socket đang nghe / vòng lặp sự kiện của tiến trình chính,
+        # nên không giữ cổng khi tiến trình chính bị tắt
+        self.pool = ProcessPoolExecutor(workers, multiprocessing.get_context("spawn"), _init_worker, (cache,))
+        self.cache = cache
+        self.workers = self.pool._max_workers
+        self.slots = asyncio.Semaphore(self.workers)
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout
+        self.max_queue = max_queue
+        self.computations = {}      # khoá (thuật toán, bảng, tham số, timeout) -> [task, số yêu cầu đang chờ]
+        self.active = {}            # id yêu cầu -> task
+        self.ids = itertools.count(1)
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+        self.counts = {}
+        self.coalesced = 0
+        self.cache_counts = {}
+        self.waiting = 0
+        self.running = 0
+        self.started = time.time()
+
+    # ----- tính toán ----- #
+
+    async def compute(self, name, state, options, deadline, full_path):
+        loop = asyncio.get_running_loop()
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            self.slots.release()
+            return {"status": "timeout", "seconds": 0.0}
+        self.running += 1
+        future = loop.run_in_executor(self.pool, _solve, name, state, options, remaining, full_path)
+
+        def release(_):
+            self.running -= 1
+            self.slots.release()
+        # Chỗ trong pool chỉ trả lại khi tiến trình con thật sự xong, kể cả khi yêu cầu đã bị huỷ
+        future.add_done_callback(release)
+        return await asyncio.shield(future)
+
+    async def solve(self, name, state, options, budget, full_path):
+        loop = asyncio.get_running_loop()
+        key = (name, tuple(map(tuple, state)), json.dumps(options, sort_keys=True), full_path, budget)
+        entry = self.computations.get(key)
+        coalesced = entry is not None
+        if coalesced:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self.compute(name, state, options, loop.time() + budget, full_path))
+            entry = self.computations[key] = [task, 0]
+            task.add_done_callback(lambda _: self.computations.pop(key) if self.computations.get(key) is entry else None)
+        entry[1] += 1
+        try:
+            result = await asyncio.wait_for(asyncio.shield(entry[0]), budget + GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            result = {"status": "timeout", "seconds": budget}
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not entry[0].done():
+                entry[0].cancel()
+        return result, coalesced
+
+    # ----- các endpoint ----- #
+
+    def parse_solve(self, body):
+        try:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("nội dung phải là object JSON")
+            name = find_algorithm(str(request["algorithm"]))
+        except (ValueError, KeyError) as error:
+            raise RequestError(400, f"Yêu cầu không hợp lệ: {error}")
+        if name in FILL_ALGORITHMS:
+            raise RequestError(400, f"{name} luôn bắt đầu từ bảng rỗng")
+        try:
+            state = check_state(request.get("state"))
+            budget = float(request.get("timeout", self.default_timeout))
+        except (ValueError, TypeError) as error:
+            raise RequestError(400, str(error))
+        # NaN / inf / <= 0 làm hỏng hạn chờ và khoá gộp yêu cầu (NaN không bằng chính nó)
+        if not math.isfinite(budget) or budget <= 0:
+            raise RequestError(400, f"timeout phải là số dương hữu hạn: {request.get('timeout')}")
+        budget = min(budget, self.max_timeout)
+        options = request.get("options") or {}
+        if not isinstance(options, dict):
+            raise RequestError(400, "options phải là object")
+        return request, name, state, budget, options
+
+    async def handle_solve(self, body, reader):
+        request, name, state, budget, options = self.parse_solve(body)
+        request_id = str(request.get("id") or next(self.ids))
+        if request_id in self.active:
+            raise RequestError(409, f"Yêu cầu {request_id} đang chạy")
+        if self.waiting >= self.max_queue:
+            raise RequestError(503, "Hàng đợi đầy")
+        start_time = time.perf_counter()
+        task = asyncio.ensure_future(self.solve(name, state, options, budget, bool(request.get("full_path"))))
+        self.active[request_id] = task
+        # Kết nối đóng (đọc được EOF) trước khi có kết quả -> huỷ yêu cầu
+        closed = asyncio.ensure_future(reader.read(1))
+        try:
+            done, _ = await asyncio.wait({task, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if closed in done and not task.done() and (closed.exception() or not closed.result()):
+                task.cancel()
+            try:
+                result, coalesced = await task
+            except asyncio.CancelledError:
+                result, coalesced = {"status": "cancelled"}, False
+        finally:
+            closed.cancel()
+            self.active.pop(request_id, None)
+        latency = time.perf_counter() - start_time
+        self.latencies.append(latency)
+        self.counts[result["status"]] = self.counts.get(result["status"], 0) + 1
+        if "cache" in result and not coalesced:
+            self.cache_counts[result["cache"]] = self.cache_counts.get(result["cache"], 0) + 1
+        return {"id": request_id, "algorithm": name, **result, "coalesced": coalesced, "latency": round(latency, 6)}
+
+    def handle_cancel(self, body):
+        try:
+            request_id = str(json.loads(body or b"{}")["id"])
+        except (ValueError, KeyError, TypeError, IndexError) as error:
+            raise RequestError(400, f"Yêu cầu không hợp lệ: {error}")
+        task = self.active.get(request_id)
+        if task is None or task.done():
+            return {"id": request_id, "cancelled": False}
+        task.cancel()
+        return {"id": request_id, "cancelled": True}
+
+    def cache_stats(self):
+        lookups = sum(count for outcome, count in self.cache_counts.items() if outcome != "bypass")
+        hits = self.cache_counts.get("memory", 0) + self.cache_counts.get("disk", 0)
+        return {**self.cache_counts, "hit_rate": round(hits / lookups, 4) if lookups else None}
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "uptime": round(time.time() - self.started, 3),
+            "workers": self.workers,
+            "requests": sum(self.counts.values()),
+            "status": self.counts,
+            "coalesced": self.coalesced,
+            **({"cache": self.cache_stats()} if self.cache is not None else {}),
+            "queue_depth": self.waiting,
+            "running": self.running,
+            "computations": len(self.computations),
+            "active_requests": len(self.active),
+            "latency": {
+                "count": len(latencies),
+                "mean": round(sum(latencies) / len(latencies), 6) if latencies else None,
+                **{f"p{p}": round(percentile(latencies, p), 6) if latencies else None for p in (50, 90, 99)},
+                "max": round(latencies[-1], 6) if latencies else None,
+            },
+        }
+
+    async def dispatch(self, method, path, body, reader):
+        path = path.split("?", 1)[0].rstrip("/")
+        routes = {"/solve": "POST", "/cancel": "POST", "/stats": "GET", "/algorithms": "GET"}
+        if path not in routes:
+            raise RequestError(404, f"Không có đường dẫn: {path}")
+        if method != routes[path]:
+            raise RequestError(405, f"{path} chỉ nhận {routes[path]}")
+        if path == "/solve":
+            return await self.handle_solve(body, reader)
+        if path == "/cancel":
+            return self.handle_cancel(body)
+        if path == "/stats":
+            return self.stats()
+        return [{"name": display, "function": function} for display, (_, function, _) in ALGORITHMS.items()
+                if display not in FILL_ALGORITHMS]
+
+    # ----- HTTP ----- #
+
+    async def read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, path, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise RequestError(400, "Dòng yêu cầu không hợp lệ")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise RequestError(400, "Content-Length không hợp lệ")
+        if length > MAX_BODY:
+            raise RequestError(413, "Nội dung quá lớn")
+        return method.upper(), path, await reader.readexactly(length)
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                request = await asyncio.wait_for(self.read_request(reader), HEADER_SECONDS)
+                if request is None:
+                    return
+                code, payload = 200, await self.dispatch(*request, reader)
+            except RequestError as error:
+                code, payload = error.code, {"error": str(error)}
+            except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                raise
+            except Exception as error:
+                code, payload = 500, {"error": repr(error)}
+            body = json.dumps(payload, ensure_ascii=False).encode()
+            writer.write(f"HTTP/1.1 {code} {REASONS[code]}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix=None):
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, unix)
+            where = unix
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            where = ", ".join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets)
+        print(f"Dịch vụ giải chạy tại {where}, {self.workers} tiến trình", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def post(port, path, payload):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status, _, rest = (await reader.read()).partition(b"\r\n")
+    writer.close()
+    return int(status.split()[1]), json.loads(rest.partition(b"\r\n\r\n")[2])
+
+
+async def self_check():
+    # Thuật toán import lỗi (thiếu thư viện) vẫn phải có phản hồi HTTP với status "error"
+    import importlib
+    missing = []
+    for name in ["Q Learning", "And Or Search"]:
+        try:
+            importlib.import_module(ALGORITHMS[name][0])
+        except ImportError:
+            missing.append(name)
+    service = SolverService(1)
+    server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        code, result = await post(port, "/solve", {"algorithm": "astar", "state": [[1, 2, 3], [4, 5, 6], [7, 0, 8]]})
+        assert code == 200 and result["status"] == "ok" and result["steps"] == 1, result
+        for name in missing:
+            code, result = await post(port, "/solve", {"algorithm": name, "state": [[1, 2, 3], [4, 5, 6], [7, 0, 8]]})
+            assert code == 200 and result["status"] == "error", result
+            print(f"{name}: {result['error']}")
+        if not missing:
+            print("Mọi thuật toán import được, bỏ qua kiểm tra import lỗi")
+    finally:
+        server.close()
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dịch vụ giải 8-puzzle cục bộ (HTTP/JSON)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="đường dẫn Unix socket (thay cho host / port)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="ngân sách mặc định mỗi yêu cầu (giây)")
+    parser.add_argument("--max-timeout", type=float, default=MAX_TIMEOUT)
+    parser.add_argument("--max-queue", type=int, default=1000)
+    parser.add_argument("--cache", nargs="?", const="", metavar="FILE", help="dùng bộ đệm lời giải; kèm FILE để lưu vào sqlite")
+    parser.add_argument("--cache-size", type=int, default=10000, help="số lời giải giữ trong bộ nhớ mỗi tiến trình")
+    parser.add_argument("--self-check", action="store_true", help="chạy thử trên cổng tạm rồi thoát")
+    args = parser.parse_args(argv)
+    if args.self_check:
+        asyncio.run(self_check())
+        return 0
+
+    async def run():
+        service = SolverService(args.workers, args.timeout, args.max_timeout, args.max_queue,
+                                None if args.cache is None else (args.cache or None, args.cache_size))
+        # SIGTERM dừng như Ctrl+C: đóng pool để các tiến trình con thoát theo
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except (NotImplementedError, AttributeError):
+            pass
+        try:
+            await service.serve(args.host, args.port, args.unix)
+        finally:
+            service.close()
+    try:
+        asyncio.run(run())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import tracemalloc, timeit
+import tracemalloc
 from PIL import Image
 import os
 import matplotlib.pyplot as plt
-from ObservableEnvironmet import bfs, dfs, dls, ucs, ids, greedy, astar, ida_star, simple_hill_climbing, steepest_ascent_hill_climbing, stochastic_hill_climbing, simulated_annealing, beam_search, genetic_algorithm
-from And_OrSearch import and_or_search_solution
-from Backtracking import backtracking_solve, backtracking_solve_with_forward_checking
-from Fill_CSP import backtracking_fill, forward_checking_fill, min_conflict_fill
-from PartiallyObservable import bfs_partially_observable
-from NoObservable import bfs_no_observable
-from ReinforcementLearning import QLearningSolver
+from Algorithms import ALGORITHMS, FILL_ALGORITHMS, get_solver, initial_state_for
+from InstanceGenerator import random_state, is_solvable
+from Profiler import measure_time
+from SearchStats import SearchResult
+from SolutionCache import SolutionCache
 
 class PuzzleSolverGUI(tk.Tk):
     def __init__(self):
@@ -32,7 +30,7 @@ class PuzzleSolverGUI(tk.Tk):
         # Dropdown Menu for Algorithms
         self.algorithm_label = tk.Label(self.right_frame, text="Thuật Toán:", fg="#61AFEF", bg="#2C2C2C", font=("Helvetica", 14, "bold"))
         self.algorithm_label.pack(pady=(20, 10))
-        self.algorithm_options = ["BFS", "DFS", "DLS", "UCS", "IDS", "Greedy", "A Start", "IDA Start", "Simple Hill Climbing", "Steepest Ascent", "Stochastic", "Simulated Annealing", "Beam Search", "Genetic Algorithm", "And Or Search", "No Observable" ,"Partially Observable", "Backtracking", "Backtracking with Forward Checking", "Fill Backtracking", "Fill Backtracking with Forward Checking", "Min Conflict", "And Or Search", "Q Learning"]
+        self.algorithm_options = list(ALGORITHMS)
         self.algorithm_var = tk.StringVar()
         self.algorithm_menu = ttk.Combobox(self.right_frame, textvariable=self.algorithm_var, values=self.algorithm_options)
         self.algorithm_menu.pack(pady=10, fill="x", padx=20)
@@ -44,6 +42,12 @@ class PuzzleSolverGUI(tk.Tk):
         self.randomize_button.pack(pady=10, fill="x", padx=20)
         self.randomize_simple_button = tk.Button(self.right_frame, text="Tạo trạng thái đơn giản", command=self.simple_initial_puzzle, bg="#61AFEF", fg="#282C34", font=("Helvetica", 10, "bold"))
         self.randomize_simple_button.pack(pady=10, fill="x", padx=20)
+        self.randomize_uniform_button = tk.Button(self.right_frame, text="Tạo trạng thái ngẫu nhiên", command=self.random_puzzle, bg="#61AFEF", fg="#282C34", font=("Helvetica", 10, "bold"))
+        self.randomize_uniform_button.pack(pady=10, fill="x", padx=20)
+        # Đo bộ nhớ đỉnh bằng tracemalloc (tuỳ chọn, làm thời gian đo được chậm hơn nhiều lần)
+        self.measure_memory = tk.BooleanVar(value=False)
+        self.memory_check = tk.Checkbutton(self.right_frame, text="Đo bộ nhớ (tracemalloc)", variable=self.measure_memory, fg="#61AFEF", bg="#1F1F1F", selectcolor="#2C2C2C", activebackground="#1F1F1F", font=("Helvetica", 10))
+        self.memory_check.pack(pady=(10, 0), padx=20, anchor="w")
         self.start_button = tk.Button(self.right_frame, text="Bắt đầu giải", command=self.solve_puzzle, bg="#98C379", fg="#282C34", font=("Helvetica", 10, "bold"))
         self.start_button.pack(pady=10, fill="x", padx=20)
 
@@ -53,6 +57,8 @@ class PuzzleSolverGUI(tk.Tk):
         # Initial Puzzle State
         self.puzzle_state = [[2, 6, 5], [0, 8, 7], [4, 3, 1]]
         self.path = []
+        # Bấm giải lại cùng bàn cờ / thuật toán thì lấy lời giải từ bộ đệm
+        self.cache = SolutionCache()
         self.draw_puzzle()
 
     def initial_puzzle(self):
@@ -63,8 +69,13 @@ class PuzzleSolverGUI(tk.Tk):
         self.puzzle_state = [[1, 2, 3], [0, 4, 5], [7, 8, 6]]
         self.draw_puzzle()
 
+    def random_puzzle(self):
+        # Chọn đều trong mọi trạng thái giải được (InstanceGenerator.py)
+        self.puzzle_state = random_state(len(self.puzzle_state), len(self.puzzle_state[0]))
+        self.draw_puzzle()
+
     def move_tile(self, i, j):
-        bi, bj = [(x, y) for x in range(3) for y in range(3) if self.puzzle_state[x][y] == 0][0]
+        bi, bj = [(x, y) for x in range(len(self.puzzle_state)) for y in range(len(self.puzzle_state[0])) if self.puzzle_state[x][y] == 0][0]
         if (abs(bi - i) == 1 and bj == j) or (abs(bj - j) == 1 and bi == i):
             self.puzzle_state[bi][bj], self.puzzle_state[i][j] = self.puzzle_state[i][j], self.puzzle_state[bi][bj]
             self.draw_puzzle()
@@ -84,8 +95,8 @@ class PuzzleSolverGUI(tk.Tk):
         plt.imshow([[1 if cell == 0 else 0.8 for cell in row] for row in state], cmap='Blues', vmin=0, vmax=1)
         
         # Đặt số với màu đen và có độ đậm
-        for i in range(3):
-            for j in range(3):
+        for i in range(len(state)):
+            for j in range(len(state[0])):
                 plt.text(j, i, str(state[i][j]), ha='center', va='center', fontsize=16, color='white', fontweight='bold')
         
         plt.title(f"Step: {step}", fontsize=18, fontweight='bold', color='black')
@@ -118,72 +129,35 @@ class PuzzleSolverGUI(tk.Tk):
             return
 
         self.path = []
-        tracemalloc.start()
-        start_time = timeit.default_timer()
-
-        if algorithm == 'BFS':
-            self.path = bfs(self.puzzle_state)
-        elif algorithm == 'DFS':
-            self.path = dfs(self.puzzle_state)
-        elif algorithm == 'DLS':
-            self.path = dls(self.puzzle_state)
-        elif algorithm == 'UCS':
-            self.path = ucs(self.puzzle_state)
-        elif algorithm == 'IDS':
-            self.path = ids(self.puzzle_state)
-        elif algorithm == 'Greedy':
-            self.path = greedy(self.puzzle_state)
-        elif algorithm == 'A Start':
-            self.path = astar(self.puzzle_state)
-        elif algorithm == 'IDA Start':
-            self.path = ida_star(self.puzzle_state)
-        elif algorithm == 'Simple Hill Climbing':
-            self.path = simple_hill_climbing(self.puzzle_state)
-        elif algorithm == 'Steepest Ascent':
-            self.path = steepest_ascent_hill_climbing(self.puzzle_state)
-        elif algorithm == 'Stochastic':
-            self.path = stochastic_hill_climbing(self.puzzle_state)
-        elif algorithm == 'Simulated Annealing':
-            self.path = simulated_annealing(self.puzzle_state)
-        elif algorithm == 'Beam Search':
-            self.path = beam_search(self.puzzle_state)
-        elif algorithm == 'Genetic Algorithm':
-            self.path = genetic_algorithm(self.puzzle_state)
-        elif algorithm == 'No Observable':
-            self.path = bfs_no_observable(self.puzzle_state)
-        elif algorithm == 'Partially Observable':
-            self.path = bfs_partially_observable(self.puzzle_state)
-        elif algorithm == 'Backtracking':
-            self.path = backtracking_solve(self.puzzle_state)
-        elif algorithm == 'Backtracking with Forward Checking':
-            self.path = backtracking_solve_with_forward_checking(self.puzzle_state)
-        elif algorithm == 'Fill Backtracking':
-            self.puzzle_state = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
-            self.path = backtracking_fill(self.puzzle_state)
-        elif algorithm == 'Fill Backtracking with Forward Checking':
-            self.puzzle_state = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
-            self.path = forward_checking_fill(self.puzzle_state)
-        elif algorithm == 'Min Conflict':
-            self.puzzle_state = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
-            self.path = min_conflict_fill(self.puzzle_state)
-        elif algorithm == 'And Or Search':
-            self.path = and_or_search_solution(self.puzzle_state)
-        elif algorithm == 'Q Learning':
-            q_solver = QLearningSolver()
-            q_solver.train(self.puzzle_state, episodes=500)
-            self.path = q_solver.get_solution_path(self.puzzle_state)
-        else:
+        if algorithm not in ALGORITHMS:
             messagebox.showerror("Error", "Thuật toán không được hỗ trợ")
             return
-        
-        end_time = timeit.default_timer()
-        memory_used, peak_memory = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
 
-        print(f"Thời gian thực thi thuật toán: {(end_time - start_time):.5f} giây")
-        print(f"Bộ nhớ sử dụng: {memory_used / (1024 ** 2):.5f} MB")
-        print(f"Bộ nhớ tối đa: {peak_memory / (1024 ** 2):.5f} MB")
-        
+        # Mặc định chỉ đo thời gian: tracemalloc làm chậm thuật toán nhiều lần và sai lệch thời gian đo được.
+        # Bật "Đo bộ nhớ" để có bộ nhớ đỉnh như trước; đo riêng từng thứ bằng Profiler.py (--mode rss / memory)
+        if algorithm not in FILL_ALGORITHMS and not is_solvable(self.puzzle_state):
+            messagebox.showerror("Lỗi", "Trạng thái không giải được")
+            return
+
+        solver = get_solver(algorithm, cache=self.cache)
+        self.puzzle_state = initial_state_for(algorithm, self.puzzle_state)
+        measure_memory = self.measure_memory.get()
+        if measure_memory:
+            tracemalloc.start()
+        try:
+            self.path, wall, cpu = measure_time(solver, self.puzzle_state, stats=True)
+        finally:
+            if measure_memory:
+                memory_used, peak_memory = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+        print(f"Thời gian thực thi thuật toán: {wall:.5f} giây (CPU {cpu:.5f} giây)")
+        if measure_memory:
+            print(f"Bộ nhớ sử dụng: {memory_used / (1024 ** 2):.5f} MB")
+            print(f"Bộ nhớ tối đa: {peak_memory / (1024 ** 2):.5f} MB")
+        if isinstance(self.path, SearchResult):
+            print(self.path.stats.report())
+        print(self.cache.report())
 
         if self.path == []:
             messagebox.showinfo("Info", "Không tìm được lời giải")